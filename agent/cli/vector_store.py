@@ -3,6 +3,7 @@
 from __future__ import annotations
 
 import argparse
+import os
 from pathlib import Path
 from typing import Sequence
 
@@ -21,13 +22,8 @@ DEFAULT_OUTPUT = ROOT / "state" / "vector_store.json"
 
 
 def _parse_paths(values: Sequence[str]) -> list[Path]:
-    paths: list[Path] = []
-    for raw in values:
-        path = Path(raw)
-        if not path.is_absolute():
-            path = ROOT / path
-        paths.append(path)
-    return paths
+    root = ROOT
+    return [Path(raw) if os.path.isabs(raw) else root / raw for raw in values]
 
 
 def cmd_rebuild(args: argparse.Namespace) -> int:
@@ -38,6 +34,7 @@ def cmd_rebuild(args: argparse.Namespace) -> int:
         include=include,
         chunk_size=args.chunk_size,
         overlap=args.overlap,
+        max_workers=args.workers,
     )
     print(f"Rebuilt vector store with {len(indexed)} files and {sum(indexed.values())} chunks.")
     return 0
@@ -87,6 +84,12 @@ def build_parser() -> argparse.ArgumentParser:
         default=DEFAULT_CHUNK_OVERLAP,
         help="Number of characters to overlap between chunks",
     )
+    rebuild_parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Threads used to read and chunk files (default: one per CPU)",
+    )
     rebuild_parser.set_defaults(func=cmd_rebuild)
 
     refresh_parser = subparsers.add_parser(
@@ -115,9 +118,14 @@ def build_parser() -> argparse.ArgumentParser:
     return parser
 
 
+_PARSER: argparse.ArgumentParser | None = None
+
+
 def main(argv: Sequence[str] | None = None) -> int:
-    parser = build_parser()
-    args = parser.parse_args(argv)
+    global _PARSER
+    if _PARSER is None:
+        _PARSER = build_parser()
+    args = _PARSER.parse_args(argv)
     return args.func(args)
 
 
@@ -0,0 +1,100 @@
+"""Append-only JSONL checkpoints for completed pipeline stages.
+
+When ``PIPELINE_CHECKPOINT_PATH`` is set, every completed stage is appended to
+that file keyed by a hash of its inputs, so a crashed run can resume from the
+last finished stage instead of paying for every model call again.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import pathlib
+import threading
+from typing import Any, Dict, Optional
+
+try:  # pragma: no cover - optional dependency
+    import orjson  # type: ignore
+except Exception:  # pragma: no cover - fallback when orjson is unavailable
+    orjson = None  # type: ignore
+
+CHECKPOINT_ENV = "PIPELINE_CHECKPOINT_PATH"
+
+_INDEX: Dict[pathlib.Path, Dict[str, Dict[str, Any]]] = {}
+_LOCK = threading.Lock()
+
+
+def checkpoint_path() -> Optional[pathlib.Path]:
+    """Return the configured checkpoint file, or ``None`` when disabled."""
+    value = os.environ.get(CHECKPOINT_ENV, "").strip()
+    return pathlib.Path(value) if value else None
+
+
+def make_key(stage: str, model: str, system_prompt: str, user_prompt: str) -> str:
+    digest = hashlib.sha256()
+    digest.update(f"{stage}\0{model}\0{system_prompt}\0{user_prompt}".encode("utf-8"))
+    return digest.hexdigest()
+
+
+def checkpoint_load(key: str) -> Optional[Dict[str, Any]]:
+    """Return the record stored for *key*, reading the file on first use."""
+    path = checkpoint_path()
+    if path is None:
+        return None
+    with _LOCK:
+        return _index_for(path).get(key)
+
+
+def checkpoint_save(key: str, record: Dict[str, Any]) -> None:
+    """Append *record* under *key*; later records for a key win on reload."""
+    path = checkpoint_path()
+    if path is None:
+        return
+    line = _dumps_line({"key": key, **record})
+    with _LOCK:
+        index = _index_for(path)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with path.open("ab") as handle:
+                handle.write(line)
+        except OSError:
+            # Checkpointing is best effort and must not fail the stage.
+            return
+        index[key] = record
+
+
+def _dumps_line(entry: Dict[str, Any]) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(entry, option=orjson.OPT_APPEND_NEWLINE)
+    return (json.dumps(entry, ensure_ascii=False) + "\n").encode("utf-8")
+
+
+def _loads(data: bytes) -> Any:
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _index_for(path: pathlib.Path) -> Dict[str, Dict[str, Any]]:
+    """Return the in-memory index for *path*; callers must hold ``_LOCK``."""
+    index = _INDEX.get(path)
+    if index is not None:
+        return index
+    index = {}
+    try:
+        with path.open("rb") as handle:
+            for line in handle:
+                try:
+                    entry = _loads(line)
+                except ValueError:
+                    # A crash can leave a torn final line behind.
+                    continue
+                if isinstance(entry, dict) and isinstance(entry.get("key"), str):
+                    index[entry.pop("key")] = entry
+    except OSError:
+        pass
+    _INDEX[path] = index
+    return index
+
+
+__all__ = ["CHECKPOINT_ENV", "checkpoint_load", "checkpoint_path", "checkpoint_save", "make_key"]
@@ -1,47 +1,308 @@
 """Persistent event log utilities for orchestrator runs."""
 from __future__ import annotations
 
+import atexit
+import functools
 import json
 import os
 import pathlib
-from datetime import datetime, timezone
-from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence
+import queue
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Iterator, List, Mapping, Optional, Sequence, Set, Tuple, Union
+
+try:  # pragma: no cover - optional dependency
+    import orjson  # type: ignore
+except Exception:  # pragma: no cover - fallback when orjson is unavailable
+    orjson = None  # type: ignore
 
 ROOT = pathlib.Path(__file__).resolve().parents[2]
-DEFAULT_LOG_PATH = ROOT / "docs" / "run_events.json"
+DEFAULT_LOG_PATH = ROOT / "docs" / "run_events.jsonl"
 MAX_EVENTS = 200
+# The JSONL log is append-only; it is compacted back down to MAX_EVENTS lines
+# once it grows past this many lines.
+COMPACT_THRESHOLD = 2 * MAX_EVENTS
+
+# In-memory mirror of the on-disk tail for each log path, populated lazily on
+# first use so reads never have to re-parse the file.
+_EVENT_CACHE: Dict[pathlib.Path, Deque[Dict[str, Any]]] = {}
+_CACHE_LOCK = threading.Lock()
+
+# Serialised lines are handed to a single background writer which coalesces
+# everything queued within FLUSH_INTERVAL seconds into one write per file.
+FLUSH_INTERVAL = 0.05
+# A ``threading.Event`` payload asks the writer to clear that path and set the
+# event (see clear_events), so the removal is ordered with every queued line.
+_WRITE_QUEUE: "queue.Queue[Tuple[pathlib.Path, Union[bytes, threading.Event]]]" = queue.Queue()
+_WRITER: Optional[threading.Thread] = None
+_WRITER_LOCK = threading.Lock()
+# Parent directories already created by the writer thread.
+_ENSURED_PARENTS: Set[pathlib.Path] = set()
+# Line counts per log file, maintained by the writer so deciding whether to
+# compact never requires re-reading the file.  Guarded by _LINE_COUNTS_LOCK.
+_LINE_COUNTS: Dict[pathlib.Path, int] = {}
+_LINE_COUNTS_LOCK = threading.Lock()
 
 
 def _resolve_log_path(path: Optional[pathlib.Path] = None) -> pathlib.Path:
     """Return the path where events should be persisted."""
     if path is not None:
         return path
-    override = os.environ.get("AGENT_EVENT_LOG_PATH")
+    return _resolve_from_env(os.environ.get("AGENT_EVENT_LOG_PATH"))
+
+
+@functools.lru_cache(maxsize=8)
+def _resolve_from_env(override: Optional[str]) -> pathlib.Path:
     if override:
         return pathlib.Path(override)
     return DEFAULT_LOG_PATH
 
 
+# Opt-in threshold: events below this level are dropped before their details
+# are built.  The default records every event.
+LOG_LEVEL_ENV = "AGENT_EVENT_LOG_LEVEL"
+DEFAULT_LOG_LEVEL = "debug"
+_LEVEL_RANKS: Dict[str, int] = {"debug": 10, "info": 20, "warning": 30, "error": 40, "critical": 50}
+
+
+@functools.lru_cache(maxsize=8)
+def _threshold_from_env(value: Optional[str]) -> int:
+    name = (value or DEFAULT_LOG_LEVEL).strip().lower()
+    return _LEVEL_RANKS.get(name, _LEVEL_RANKS[DEFAULT_LOG_LEVEL])
+
+
+def is_enabled_for(level: str) -> bool:
+    """Return True when events at *level* pass the ``AGENT_EVENT_LOG_LEVEL`` threshold.
+
+    Unknown level names are always recorded.
+    """
+    rank = _LEVEL_RANKS.get(level)
+    if rank is None:
+        return True
+    return rank >= _threshold_from_env(os.environ.get(LOG_LEVEL_ENV))
+
+
+def _dumps_line(entry: Mapping[str, Any]) -> bytes:
+    """Serialise *entry* as a compact, newline-terminated UTF-8 JSON line."""
+    if orjson is not None:
+        return orjson.dumps(entry, option=orjson.OPT_APPEND_NEWLINE | orjson.OPT_NON_STR_KEYS)
+    return (json.dumps(entry, ensure_ascii=False) + "\n").encode("utf-8")
+
+
+def _loads(data: bytes) -> Any:
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
 def load_events(path: Optional[pathlib.Path] = None) -> List[Dict[str, Any]]:
-    """Load all stored events, returning an empty list on failure."""
+    """Load the most recent stored events, returning an empty list on failure.
+
+    Events are served from an in-process ring buffer that mirrors the tail of
+    the log file; the file itself is only parsed the first time a path is read.
+    """
     log_path = _resolve_log_path(path)
-    if not log_path.exists():
-        return []
+    with _CACHE_LOCK:
+        return list(_get_cache(log_path))
+
+
+def iter_events(path: Optional[pathlib.Path] = None) -> Iterator[Dict[str, Any]]:
+    """Stream every event persisted in the log, oldest first.
+
+    Unlike :func:`load_events` this is not capped at ``MAX_EVENTS`` and never
+    holds the whole file in memory; wrap it in ``deque(..., maxlen=k)`` to keep
+    only the last *k* entries.  Pending background writes are flushed first.
+    """
+    log_path = _resolve_log_path(path)
+    flush_events()
+    return _read_events(log_path)
+
+
+def _read_events(log_path: pathlib.Path) -> Iterator[Dict[str, Any]]:
+    """Stream the events stored in *log_path*, skipping malformed lines."""
     try:
-        data = json.loads(log_path.read_text(encoding="utf-8"))
-    except Exception:
-        return []
-    if isinstance(data, list):
-        return [event for event in data if isinstance(event, dict)]
-    return []
+        with log_path.open("rb") as handle:
+            for line in handle:
+                if not line.strip():
+                    continue
+                try:
+                    event = _loads(line)
+                except ValueError:
+                    continue
+                if isinstance(event, dict):
+                    yield event
+    except OSError:
+        return
+
+
+def _get_cache(log_path: pathlib.Path) -> Deque[Dict[str, Any]]:
+    """Return the ring buffer for *log_path*; callers must hold ``_CACHE_LOCK``."""
+    cache = _EVENT_CACHE.get(log_path)
+    if cache is None:
+        cache = deque(_read_events(log_path), maxlen=MAX_EVENTS)
+        _EVENT_CACHE[log_path] = cache
+    return cache
+
+
+def _ensure_writer() -> None:
+    global _WRITER
+    with _WRITER_LOCK:
+        if _WRITER is None or not _WRITER.is_alive():
+            _WRITER = threading.Thread(target=_flush_loop, name="event-log-writer", daemon=True)
+            _WRITER.start()
+
+
+def _flush_loop() -> None:
+    while True:
+        batch = [_WRITE_QUEUE.get()]
+        deadline = time.monotonic() + FLUSH_INTERVAL
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(_WRITE_QUEUE.get(timeout=remaining))
+            except queue.Empty:
+                break
+        try:
+            _write_batch(batch)
+        finally:
+            for _ in batch:
+                _WRITE_QUEUE.task_done()
+
+
+def _write_batch(batch: Sequence[Tuple[pathlib.Path, Union[bytes, threading.Event]]]) -> None:
+    """Append each path's queued lines with a single write call.
+
+    A clear request drops the lines queued for its path before it and removes
+    the file; lines queued after it start the new file.
+    """
+    grouped: Dict[pathlib.Path, List[bytes]] = {}
+    for log_path, line in batch:
+        if isinstance(line, threading.Event):
+            grouped.pop(log_path, None)
+            try:
+                _remove_log(log_path)
+            finally:
+                line.set()
+            continue
+        grouped.setdefault(log_path, []).append(line)
+    for log_path, lines in grouped.items():
+        try:
+            with _LINE_COUNTS_LOCK:
+                count = _LINE_COUNTS.get(log_path)
+            if count is None:
+                count = _count_lines(log_path)
+            _append_lines(log_path, b"".join(lines))
+            count += len(lines)
+            if count > COMPACT_THRESHOLD and log_path.is_file():
+                count = _compact(log_path)
+            with _LINE_COUNTS_LOCK:
+                _LINE_COUNTS[log_path] = count
+        except OSError:
+            # Logging must never take the orchestrator down.
+            continue
+
+
+def _remove_log(log_path: pathlib.Path) -> None:
+    with _LINE_COUNTS_LOCK:
+        _LINE_COUNTS.pop(log_path, None)
+    try:
+        log_path.unlink(missing_ok=True)
+    except OSError:
+        # Ignore removal errors to avoid blocking the orchestrator.
+        pass
+
+
+def _append_lines(log_path: pathlib.Path, data: bytes) -> None:
+    parent = log_path.parent
+    if parent not in _ENSURED_PARENTS:
+        parent.mkdir(parents=True, exist_ok=True)
+        _ENSURED_PARENTS.add(parent)
+    try:
+        handle = log_path.open("ab")
+    except FileNotFoundError:
+        # The directory vanished since we last created it; recreate once.
+        parent.mkdir(parents=True, exist_ok=True)
+        handle = log_path.open("ab")
+    with handle:
+        handle.write(data)
+
+
+def flush_events() -> None:
+    """Block until every queued event has been written to disk."""
+    _WRITE_QUEUE.join()
+
+
+atexit.register(flush_events)
 
 
-def _truncate(events: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
-    """Keep only the most recent MAX_EVENTS entries."""
-    events_list = [event for event in events if isinstance(event, dict)]
-    if len(events_list) <= MAX_EVENTS:
-        return events_list
-    return events_list[-MAX_EVENTS:]
+def _count_lines(log_path: pathlib.Path) -> int:
+    try:
+        with log_path.open("rb") as handle:
+            return sum(1 for _ in handle)
+    except OSError:
+        return 0
+
+
+def _compact(log_path: pathlib.Path) -> int:
+    """Rewrite *log_path* with only its last MAX_EVENTS lines, returning the line count."""
+    try:
+        data = log_path.read_bytes()
+    except OSError:
+        return 0
+    lines = [line for line in data.splitlines(keepends=True) if line.strip()]
+    if len(lines) <= MAX_EVENTS:
+        return len(lines)
+    kept = lines[-MAX_EVENTS:]
+    try:
+        _atomic_write(log_path, b"".join(kept))
+    except OSError:
+        return len(lines)
+    return len(kept)
+
+
+def _atomic_write(path: pathlib.Path, data: bytes) -> None:
+    """Replace *path* with *data* so a crash never leaves a half-written log."""
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        try:
+            view = memoryview(data)
+            while view:
+                view = view[os.write(fd, view):]
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+        os.replace(tmp_path, path)
+    except OSError:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+# (epoch second, "YYYY-MM-DDTHH:MM:SS") for the most recently formatted second.
+# Swapped as a whole tuple so concurrent writers never see a torn pair.
+_LAST_SECOND: Tuple[int, str] = (0, "")
+
+
+def _timestamp() -> str:
+    """Return the current UTC time in ``datetime.isoformat`` layout.
+
+    The date/time prefix only changes once per second, so it is formatted once
+    and reused for every event logged within that second.
+    """
+    global _LAST_SECOND
+    now = time.time()
+    second = int(now)
+    cached = _LAST_SECOND
+    if cached[0] != second:
+        cached = (second, time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(second)))
+        _LAST_SECOND = cached
+    return f"{cached[1]}.{int((now - second) * 1_000_000):06d}+00:00"
 
 
 def append_event(
@@ -50,28 +311,56 @@ def append_event(
     source: str,
     message: str,
     details: Optional[Dict[str, Any]] = None,
+    details_factory: Optional[Callable[[], Dict[str, Any]]] = None,
     path: Optional[pathlib.Path] = None,
 ) -> Dict[str, Any]:
-    """Append an event to the persistent log and return the stored entry."""
-    log_path = _resolve_log_path(path)
-    log_path.parent.mkdir(parents=True, exist_ok=True)
+    """Append an event to the persistent log and return the stored entry.
 
+    The entry is visible to :func:`load_events` immediately; the disk write
+    happens on the background writer (see :func:`flush_events`).  When
+    ``AGENT_EVENT_LOG_LEVEL`` is raised above *level* the entry is returned
+    without being stored, and *details_factory* (an alternative to *details*)
+    is never called.
+    """
     entry: Dict[str, Any] = {
-        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "timestamp": _timestamp(),
         "level": level,
         "source": source,
         "message": message,
     }
+    if not is_enabled_for(level):
+        return entry
+    if details is None and details_factory is not None:
+        details = details_factory()
+    log_path = _resolve_log_path(path)
+
     if details:
         entry["details"] = details
 
-    events = load_events(log_path)
-    events.append(entry)
-    events = _truncate(events)
-    log_path.write_text(json.dumps(events, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+    line = _dumps_line(entry)
+    with _CACHE_LOCK:
+        _get_cache(log_path).append(entry)
+        _WRITE_QUEUE.put((log_path, line))
+    _ensure_writer()
     return entry
 
 
+def normalise_admin_requests(
+    requests: Sequence[Mapping[str, Any]] | Sequence[Any] | None,
+) -> List[Dict[str, Any]]:
+    """Return the mapping entries of *requests* as dicts, dropping anything else."""
+
+    if not requests:
+        return []
+    # Plain dicts are passed through, so only foreign mappings need to be
+    # copied into a dict first.
+    return [
+        item if type(item) is dict else dict(item)
+        for item in requests
+        if isinstance(item, Mapping)
+    ]
+
+
 def log_admin_requests(
     requests: Sequence[Mapping[str, Any]] | Sequence[Any],
     *,
@@ -84,14 +373,7 @@ def log_admin_requests(
     unexpected scalars while still surfacing the relevant metadata.
     """
 
-    if not requests:
-        return None
-
-    normalised: List[Dict[str, Any]] = []
-    for item in requests:
-        if isinstance(item, Mapping):
-            normalised.append(dict(item))
-
+    normalised = normalise_admin_requests(requests)
     if not normalised:
         return None
 
@@ -106,14 +388,22 @@ def log_admin_requests(
 
 
 def clear_events(path: Optional[pathlib.Path] = None) -> None:
-    """Remove all stored events."""
+    """Remove all stored events.
+
+    The file is removed by the writer thread, in queue order: events appended
+    before this call are discarded, events appended after it are kept.
+    """
     log_path = _resolve_log_path(path)
-    try:
-        if log_path.exists():
-            log_path.unlink()
-    except OSError:
-        # Ignore removal errors to avoid blocking the orchestrator.
-        pass
+    cleared = threading.Event()
+    with _CACHE_LOCK:
+        # Appends enqueue under the same lock, so the cache reset and the
+        # clear request land at the same point in the write order.
+        _EVENT_CACHE[log_path] = deque(maxlen=MAX_EVENTS)
+        _WRITE_QUEUE.put((log_path, cleared))
+    _ensure_writer()
+    # Wait for this request only; flush_events() could block indefinitely
+    # while other threads keep appending.
+    cleared.wait()
 
 
 def log_stage_transition(
@@ -177,3 +467,23 @@ def log_quota_snapshot(
         message="openai_quota",
         details=details,
     )
+
+
+__all__ = [
+    "COMPACT_THRESHOLD",
+    "DEFAULT_LOG_LEVEL",
+    "DEFAULT_LOG_PATH",
+    "LOG_LEVEL_ENV",
+    "MAX_EVENTS",
+    "append_event",
+    "clear_events",
+    "flush_events",
+    "is_enabled_for",
+    "iter_events",
+    "load_events",
+    "log_admin_requests",
+    "log_quota_snapshot",
+    "log_stage_transition",
+    "log_token_usage",
+    "normalise_admin_requests",
+]
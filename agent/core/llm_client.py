@@ -0,0 +1,114 @@
+"""Factories for OpenAI SDK clients with tuned HTTP connection pools."""
+from __future__ import annotations
+
+import os
+import threading
+from typing import TYPE_CHECKING, Any, Optional, Union
+
+if TYPE_CHECKING:  # pragma: no cover - the SDK is imported lazily below
+    import httpx
+    from openai import AsyncOpenAI, OpenAI
+
+try:  # pragma: no cover - optional dependency
+    import h2  # type: ignore  # noqa: F401
+except Exception:  # pragma: no cover - fallback when h2 is unavailable
+    h2 = None  # type: ignore
+
+MAX_CONNECTIONS_ENV = "OPENAI_MAX_CONNECTIONS"
+MAX_KEEPALIVE_ENV = "OPENAI_MAX_KEEPALIVE_CONNECTIONS"
+# The SDK defaults to 1000/100; fan-out stages keep many more requests alive.
+DEFAULT_MAX_CONNECTIONS = 1024
+DEFAULT_MAX_KEEPALIVE_CONNECTIONS = 256
+
+_SHARED_CLIENT: Optional[Union["OpenAI", "AsyncOpenAI"]] = None
+_SHARED_LOCK = threading.Lock()
+
+
+def _env_int(name: str, default: int) -> int:
+    value = os.environ.get(name)
+    if value is None:
+        return default
+    try:
+        return max(1, int(value))
+    except ValueError:
+        return default
+
+
+def connection_limits() -> "httpx.Limits":
+    """Return the connection-pool limits configured via the environment."""
+    import httpx
+
+    return httpx.Limits(
+        max_connections=_env_int(MAX_CONNECTIONS_ENV, DEFAULT_MAX_CONNECTIONS),
+        max_keepalive_connections=_env_int(MAX_KEEPALIVE_ENV, DEFAULT_MAX_KEEPALIVE_CONNECTIONS),
+    )
+
+
+def http2_enabled() -> bool:
+    """Return True when httpx can negotiate HTTP/2 (the ``h2`` extra is installed).
+
+    With HTTP/2 the create and poll requests of concurrent calls multiplex
+    over one kept-alive connection instead of each holding its own.
+    """
+    return h2 is not None
+
+
+def create_client(api_key: Optional[str] = None, **kwargs: Any) -> "OpenAI":
+    """Build a sync ``OpenAI`` client sharing one pooled ``httpx.Client``."""
+    import openai
+
+    http_client = openai.DefaultHttpxClient(limits=connection_limits(), http2=http2_enabled())
+    return openai.OpenAI(api_key=api_key, http_client=http_client, **kwargs)
+
+
+def create_async_client(api_key: Optional[str] = None, **kwargs: Any) -> "AsyncOpenAI":
+    """Build an ``AsyncOpenAI`` client, preferring the aiohttp transport.
+
+    httpx's own async transport stops scaling well past a few dozen concurrent
+    requests, so the SDK's aiohttp-backed client is used when the ``aiohttp``
+    extra is installed; otherwise a pooled ``httpx.AsyncClient`` is used.
+    """
+    import openai
+
+    limits = connection_limits()
+    try:
+        http_client = openai.DefaultAioHttpClient(limits=limits)
+    except RuntimeError:
+        # Raised by the SDK when httpx-aiohttp is not installed.
+        http_client = openai.DefaultAsyncHttpxClient(limits=limits, http2=http2_enabled())
+    return openai.AsyncOpenAI(api_key=api_key, http_client=http_client, **kwargs)
+
+
+def get_client() -> Union["OpenAI", "AsyncOpenAI"]:
+    """Return the process-wide client, building it on first use.
+
+    The default is a sync client: its pool is thread-safe and, unlike an
+    ``AsyncOpenAI`` pool, is not bound to the event loop that created it, so
+    it survives the ``asyncio.run`` in each blocking ``run_*`` wrapper.
+    """
+    global _SHARED_CLIENT
+    with _SHARED_LOCK:
+        if _SHARED_CLIENT is None:
+            _SHARED_CLIENT = create_client()
+        return _SHARED_CLIENT
+
+
+def set_client(client: Optional[Union["OpenAI", "AsyncOpenAI"]]) -> None:
+    """Replace the process-wide client (``None`` rebuilds it lazily)."""
+    global _SHARED_CLIENT
+    with _SHARED_LOCK:
+        _SHARED_CLIENT = client
+
+
+__all__ = [
+    "DEFAULT_MAX_CONNECTIONS",
+    "DEFAULT_MAX_KEEPALIVE_CONNECTIONS",
+    "MAX_CONNECTIONS_ENV",
+    "MAX_KEEPALIVE_ENV",
+    "connection_limits",
+    "create_async_client",
+    "create_client",
+    "get_client",
+    "http2_enabled",
+    "set_client",
+]
@@ -1,15 +1,37 @@
 """Helpers for retrieving OpenAI account usage and rate-limit information."""
 from __future__ import annotations
 
+import asyncio
 import datetime as _dt
+import inspect
+import itertools
 import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
-from typing import Any, Dict, Mapping, Optional
-
-from openai import OpenAI
+from typing import TYPE_CHECKING, Any, Dict, Mapping, Optional, Tuple
 
 from .event_log import append_event
 
+if TYPE_CHECKING:  # pragma: no cover - the SDK is only needed by callers
+    from openai import OpenAI
+
+# Usage totals drift slowly and limits almost never change, so successive
+# stages can share a recent snapshot instead of re-querying the endpoints.
+USAGE_CACHE_TTL = 30.0
+LIMITS_CACHE_TTL = 300.0
+
+# Keyed on ``id(client)``; each entry keeps the client alive so the id cannot
+# be recycled by another object while the entry is cached.
+_CacheEntry = Tuple[Any, float, Optional[Dict[str, Any]]]
+_USAGE_CACHE: Dict[int, _CacheEntry] = {}
+_LIMITS_CACHE: Dict[int, _CacheEntry] = {}
+_CACHE_LOCK = threading.Lock()
+
+# Only the first few entries of a usage/limits page are worth surfacing.
+_MAX_SUMMARY_ITEMS = 5
+
 
 @dataclass
 class QuotaSnapshot:
@@ -37,31 +59,159 @@ def capture_quota_snapshot(
     call lets us surface quota/limit information alongside the usual token
     accounting, which helps operators diagnose throttling or budgeting
     problems before a stage runs.
+
+    Results are cached per client for ``USAGE_CACHE_TTL`` (usage) and
+    ``LIMITS_CACHE_TTL`` (limits) seconds so back-to-back stages share one
+    snapshot; call :func:`invalidate_quota_cache` to force a refetch.
     """
 
-    usage: Optional[Dict[str, Any]] = None
-    limits: Optional[Dict[str, Any]] = None
+    fetch_usage, fetch_limits, usage, limits = _cached_parts(client, include_usage, include_limits)
+    usage_options, limits_options = _request_options(request_timeout)
+
+    usage_payload: Optional[Mapping[str, Any]] = None
+    limits_payload: Optional[Mapping[str, Any]] = None
+    if fetch_usage and fetch_limits:
+        # The endpoints are independent, so overlap their network round-trips.
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            usage_future = executor.submit(
+                _safe_get_json, client, path="/usage", options=usage_options
+            )
+            limits_future = executor.submit(
+                _safe_get_json, client, path="/limits", options=limits_options
+            )
+            usage_payload = usage_future.result()
+            limits_payload = limits_future.result()
+    elif fetch_usage:
+        usage_payload = _safe_get_json(client, path="/usage", options=usage_options)
+    elif fetch_limits:
+        limits_payload = _safe_get_json(client, path="/limits", options=limits_options)
+
+    if fetch_usage:
+        usage = _summarise_usage_payload(usage_payload)
+    if fetch_limits:
+        limits = _summarise_limits_payload(limits_payload)
+    _store_parts(client, usage if fetch_usage else _MISSING, limits if fetch_limits else _MISSING)
+    return QuotaSnapshot(usage=usage, limits=limits)
 
-    if include_usage:
-        today = _dt.date.today().isoformat()
-        usage = _safe_get_json(
-            client,
-            path="/usage",
-            options={"timeout": request_timeout, "params": {"date": today}},
-        )
-        usage = _summarise_usage_payload(usage)
 
-    if include_limits:
-        limits = _safe_get_json(
+async def acapture_quota_snapshot(
+    client: Any,
+    *,
+    request_timeout: float,
+    include_usage: bool = True,
+    include_limits: bool = True,
+) -> QuotaSnapshot:
+    """Async counterpart of :func:`capture_quota_snapshot`.
+
+    ``AsyncOpenAI`` clients are queried directly on the running loop; sync
+    clients are handed to a worker thread so the loop is never blocked.  Both
+    paths share the same per-client cache.
+    """
+
+    if not inspect.iscoroutinefunction(getattr(client, "get", None)):
+        return await asyncio.to_thread(
+            capture_quota_snapshot,
             client,
-            path="/limits",
-            options={"timeout": request_timeout},
+            request_timeout=request_timeout,
+            include_usage=include_usage,
+            include_limits=include_limits,
         )
-        limits = _summarise_limits_payload(limits)
 
+    fetch_usage, fetch_limits, usage, limits = _cached_parts(client, include_usage, include_limits)
+    usage_options, limits_options = _request_options(request_timeout)
+
+    usage_payload, limits_payload = await asyncio.gather(
+        _asafe_get_json(client, path="/usage", options=usage_options) if fetch_usage else _none(),
+        _asafe_get_json(client, path="/limits", options=limits_options) if fetch_limits else _none(),
+    )
+
+    if fetch_usage:
+        usage = _summarise_usage_payload(usage_payload)
+    if fetch_limits:
+        limits = _summarise_limits_payload(limits_payload)
+    _store_parts(client, usage if fetch_usage else _MISSING, limits if fetch_limits else _MISSING)
     return QuotaSnapshot(usage=usage, limits=limits)
 
 
+def invalidate_quota_cache(client: Optional[OpenAI] = None) -> None:
+    """Drop cached snapshots for *client*, or for every client when omitted.
+
+    Callers that just received a 429 should invalidate so the next snapshot
+    reflects the throttled state instead of a stale cached one.
+    """
+
+    with _CACHE_LOCK:
+        if client is None:
+            _USAGE_CACHE.clear()
+            _LIMITS_CACHE.clear()
+            return
+        key = id(client)
+        _USAGE_CACHE.pop(key, None)
+        _LIMITS_CACHE.pop(key, None)
+
+
+def _cache_hit(
+    cache: Dict[int, _CacheEntry],
+    key: int,
+    client: Any,
+    now: float,
+    ttl: float,
+) -> bool:
+    cached = cache.get(key)
+    return cached is not None and cached[0] is client and now - cached[1] < ttl
+
+
+_MISSING: Any = object()
+
+
+def _cached_parts(
+    client: Any,
+    include_usage: bool,
+    include_limits: bool,
+) -> Tuple[bool, bool, Optional[Dict[str, Any]], Optional[Dict[str, Any]]]:
+    """Return ``(fetch_usage, fetch_limits, usage, limits)`` from the cache."""
+    key = id(client)
+    now = time.monotonic()
+    usage: Optional[Dict[str, Any]] = None
+    limits: Optional[Dict[str, Any]] = None
+    with _CACHE_LOCK:
+        fetch_usage = include_usage and not _cache_hit(_USAGE_CACHE, key, client, now, USAGE_CACHE_TTL)
+        fetch_limits = include_limits and not _cache_hit(
+            _LIMITS_CACHE, key, client, now, LIMITS_CACHE_TTL
+        )
+        if include_usage and not fetch_usage:
+            usage = _USAGE_CACHE[key][2]
+        if include_limits and not fetch_limits:
+            limits = _LIMITS_CACHE[key][2]
+    return fetch_usage, fetch_limits, usage, limits
+
+
+def _store_parts(client: Any, usage: Any, limits: Any) -> None:
+    """Cache freshly fetched summaries; ``_MISSING`` parts are left untouched."""
+    if usage is _MISSING and limits is _MISSING:
+        return
+    key = id(client)
+    fetched_at = time.monotonic()
+    with _CACHE_LOCK:
+        if usage is not _MISSING:
+            _USAGE_CACHE[key] = (client, fetched_at, usage)
+        if limits is not _MISSING:
+            _LIMITS_CACHE[key] = (client, fetched_at, limits)
+
+
+def _request_options(request_timeout: float) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    usage_options: Dict[str, Any] = {
+        "timeout": request_timeout,
+        "params": {"date": _dt.date.today().isoformat()},
+    }
+    limits_options: Dict[str, Any] = {"timeout": request_timeout}
+    return usage_options, limits_options
+
+
+async def _none() -> None:
+    return None
+
+
 def format_quota_snapshot_for_console(
     stage: str,
     snapshot: QuotaSnapshot,
@@ -114,6 +264,28 @@ def _safe_get_json(
     return None
 
 
+async def _asafe_get_json(
+    client: Any,
+    *,
+    path: str,
+    options: Mapping[str, Any],
+) -> Optional[Mapping[str, Any]]:
+    try:
+        response = await client.get(path, cast_to=dict, options=dict(options))
+    except Exception as exc:  # pragma: no cover - defensive logging only
+        append_event(
+            level="warning",
+            source="openai_quota",
+            message="request_failed",
+            details={"path": path, "error": str(exc)},
+        )
+        return None
+
+    if isinstance(response, Mapping):
+        return response
+    return None
+
+
 def _summarise_usage_payload(payload: Optional[Mapping[str, Any]]) -> Optional[Dict[str, Any]]:
     if not isinstance(payload, Mapping):
         return None
@@ -129,7 +301,7 @@ def _summarise_usage_payload(payload: Optional[Mapping[str, Any]]) -> Optional[D
         summary["credits"] = _extract_numeric_blocks(credits)
 
     operations = []
-    for entry in payload.get("data", []):
+    for entry in itertools.islice(payload.get("data") or (), _MAX_SUMMARY_ITEMS):
         if not isinstance(entry, Mapping):
             continue
         item: Dict[str, Any] = {}
@@ -142,8 +314,6 @@ def _summarise_usage_payload(payload: Optional[Mapping[str, Any]]) -> Optional[D
             item["metrics"] = metrics
         if item:
             operations.append(item)
-        if len(operations) >= 5:
-            break
     if operations:
         summary["operations"] = operations
 
@@ -160,7 +330,7 @@ def _summarise_limits_payload(payload: Optional[Mapping[str, Any]]) -> Optional[
         summary["object"] = payload["object"]
 
     entries = []
-    for entry in payload.get("data", []):
+    for entry in itertools.islice(payload.get("data") or (), _MAX_SUMMARY_ITEMS):
         if not isinstance(entry, Mapping):
             continue
         item: Dict[str, Any] = {}
@@ -173,8 +343,6 @@ def _summarise_limits_payload(payload: Optional[Mapping[str, Any]]) -> Optional[
             item["metrics"] = metrics
         if item:
             entries.append(item)
-        if len(entries) >= 5:
-            break
 
     if entries:
         summary["limits"] = entries
@@ -182,13 +350,24 @@ def _summarise_limits_payload(payload: Optional[Mapping[str, Any]]) -> Optional[
     return summary or None
 
 
-def _extract_numeric_blocks(block: Mapping[str, Any]) -> Dict[str, Any]:
+def _extract_numeric_blocks(
+    block: Mapping[str, Any],
+    _is: Any = isinstance,
+    _num: Tuple[type, ...] = (int, float),
+    _map: type = Mapping,
+) -> Dict[str, Any]:
+    """Return the numeric values of *block*, descending one level into mappings.
+
+    Booleans are skipped even though they subclass ``int``.  The defaults bind
+    the builtins as locals because this runs for every usage/limit entry.
+    """
     numeric: Dict[str, Any] = {}
     for key, value in block.items():
-        if isinstance(value, (int, float)):
-            numeric[key] = value
-        elif isinstance(value, Mapping):
-            nested = {k: v for k, v in value.items() if isinstance(v, (int, float))}
+        if _is(value, _num):
+            if not _is(value, bool):
+                numeric[key] = value
+        elif _is(value, _map):
+            nested = {k: v for k, v in value.items() if _is(v, _num) and not _is(v, bool)}
             if nested:
                 numeric[key] = nested
     return numeric
@@ -1,13 +1,43 @@
 """LLM execution pipeline for multi-stage orchestration."""
 from __future__ import annotations
 
+import asyncio
+import hashlib
+import inspect
 import json
 import os
+import random
+import re
+import sys
+import threading
 import time
+import weakref
+from collections import OrderedDict
 from dataclasses import dataclass, field
-from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+from functools import lru_cache
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Coroutine,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    TypeVar,
+)
+
+try:  # pragma: no cover - optional dependency
+    import orjson  # type: ignore
+except Exception:  # pragma: no cover - fallback when orjson is unavailable
+    orjson = None  # type: ignore
 
-from openai import OpenAI
+try:  # pragma: no cover - optional dependency
+    import ijson  # type: ignore
+except Exception:  # pragma: no cover - fallback when ijson is unavailable
+    ijson = None  # type: ignore
 
 from agent.core.event_log import (
     append_event,
@@ -15,8 +45,18 @@ from agent.core.event_log import (
     log_stage_transition,
     log_token_usage,
 )
+from agent.core import checkpoint, llm_client, prompt_compress, rate_limit, response_cache
 from agent.core.vector_store import QueryResult, VectorStore
-from agent.core.openai_quota import capture_quota_snapshot, format_quota_snapshot_for_console
+from agent.core.openai_quota import (
+    acapture_quota_snapshot,
+    format_quota_snapshot_for_console,
+    invalidate_quota_cache,
+)
+
+if TYPE_CHECKING:  # pragma: no cover - the SDK is only needed by callers
+    from openai import AsyncOpenAI, OpenAI
+
+FieldCallback = Callable[[str, Any], None]
 
 
 DEFAULT_MODEL = "gpt-5-codex"
@@ -26,10 +66,26 @@ DEFAULT_API_MAX_RETRIES = 2
 DEFAULT_API_POLL_INTERVAL = 1.5
 DEFAULT_API_REQUEST_TIMEOUT = 30.0
 ERROR_MESSAGE_MAX_LENGTH = 240
+RETRY_BASE_DELAY = 1.0
+RETRY_MAX_DELAY = 30.0
+RETRY_JITTER = 0.5
+# Polls start fast and grow geometrically up to OPENAI_API_POLL_INTERVAL.
+POLL_MIN_INTERVAL = 0.1
+POLL_BACKOFF_FACTOR = 1.7
+POLL_EMA_ALPHA = 0.3
 
 CONTEXT_MODEL_ENV = "CONTEXT_MODEL"
 RETRIEVAL_MODEL_ENV = "RETRIEVAL_MODEL"
 EXECUTION_MODEL_ENV = "EXECUTION_MODEL"
+# Stage results drop the decoded payload unless this is set (or keep_raw=True).
+KEEP_RAW_ENV = "PIPELINE_KEEP_RAW"
+# Submit stage calls through the asynchronous Batch API (non-interactive runs).
+BATCH_API_ENV = "AGENT_USE_BATCH_API"
+BATCH_COMPLETION_WINDOW = "24h"
+BATCH_POLL_MAX_INTERVAL = 60.0
+# Seconds to wait for a submitted batch before cancelling it.
+BATCH_TIMEOUT_ENV = "AGENT_BATCH_API_TIMEOUT"
+DEFAULT_BATCH_TIMEOUT = 3600.0
 
 
 class LLMCallError(RuntimeError):
@@ -55,7 +111,7 @@ class LLMCallError(RuntimeError):
         super().__init__(message)
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class StageUsage:
     """Normalised token accounting for an LLM stage."""
 
@@ -74,7 +130,7 @@ class StageUsage:
         }
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class ContextClue:
     """Context snippet derived during the summarisation stage."""
 
@@ -84,7 +140,7 @@ class ContextClue:
     content: str
 
 
-@dataclass
+@dataclass(slots=True)
 class ContextSummary:
     """Structured result for the context-summarisation stage."""
 
@@ -94,7 +150,7 @@ class ContextSummary:
     raw: Optional[Dict[str, Any]] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class RetrievalBrief:
     """Structured retrieval hand-off for the execution stage."""
 
@@ -108,7 +164,7 @@ class RetrievalBrief:
     raw: Optional[Dict[str, Any]] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class ExecutionPlan:
     """Final plan returned by the code-generation stage."""
 
@@ -162,12 +218,45 @@ _STAGE_MODEL_ENV: Dict[str, str] = {
 }
 
 
+def _reload_env() -> None:
+    """Re-read the env-derived settings, which are otherwise cached.
+
+    Covers the ``OPENAI_API_*`` tunables, ``PIPELINE_KEEP_RAW``,
+    ``AGENT_USE_BATCH_API``, ``AGENT_BATCH_API_TIMEOUT`` and the per-stage
+    model variables.
+    """
+    global _API_TIMEOUT, _API_MAX_RETRIES, _API_POLL_INTERVAL, _API_REQUEST_TIMEOUT, _KEEP_RAW
+    global _USE_BATCH_API, _BATCH_TIMEOUT
+    _API_TIMEOUT = _env_float("OPENAI_API_TIMEOUT", DEFAULT_API_TIMEOUT)
+    _API_MAX_RETRIES = max(1, _env_int("OPENAI_API_MAX_RETRIES", DEFAULT_API_MAX_RETRIES))
+    _API_POLL_INTERVAL = max(0.2, _env_float("OPENAI_API_POLL_INTERVAL", DEFAULT_API_POLL_INTERVAL))
+    _API_REQUEST_TIMEOUT = max(
+        1.0, _env_float("OPENAI_API_REQUEST_TIMEOUT", DEFAULT_API_REQUEST_TIMEOUT)
+    )
+    _KEEP_RAW = os.environ.get(KEEP_RAW_ENV, "").strip().lower() in ("1", "true", "yes", "on")
+    _USE_BATCH_API = os.environ.get(BATCH_API_ENV, "").strip().lower() in ("1", "true", "yes", "on")
+    _BATCH_TIMEOUT = max(1.0, _env_float(BATCH_TIMEOUT_ENV, DEFAULT_BATCH_TIMEOUT))
+    _stage_model_from_env.cache_clear()
+
+
+def _retained_raw(payload: Dict[str, Any], keep_raw: Optional[bool]) -> Optional[Dict[str, Any]]:
+    """Return *payload* for a result's ``raw`` field only when asked to keep it."""
+    keep = _KEEP_RAW if keep_raw is None else keep_raw
+    return payload if keep else None
+
+
 def _resolve_stage_model(stage: str, override: Optional[str]) -> Tuple[str, str]:
     if override:
         candidate = override.strip()
         if candidate:
             return candidate, "parameter"
 
+    return _stage_model_from_env(stage)
+
+
+@lru_cache(maxsize=None)
+def _stage_model_from_env(stage: str) -> Tuple[str, str]:
+    """Resolve *stage*'s model from the environment; cleared by :func:`_reload_env`."""
     env_var = _STAGE_MODEL_ENV.get(stage)
     if env_var:
         candidate = os.environ.get(env_var, "").strip()
@@ -177,6 +266,9 @@ def _resolve_stage_model(stage: str, override: Optional[str]) -> Tuple[str, str]
     return DEFAULT_MODEL, "default"
 
 
+_reload_env()
+
+
 def _log_model_selection(stage: str, model: str, source: str) -> None:
     details = {"stage": stage, "model": model, "source": source}
     append_event(
@@ -188,33 +280,46 @@ def _log_model_selection(stage: str, model: str, source: str) -> None:
 
 
 def _extract_response_text(parts: Optional[Iterable[object]]) -> str:
+    """Join the ``output_text`` segments of a Responses API ``output`` list.
+
+    Items are either all SDK objects or all plain dicts (e.g. Batch API
+    output), so one specialised loop is picked from the first item instead
+    of dispatching on the type of every item and segment.
+    """
     if not parts:
         return ""
-    chunks: List[str] = []
-    for item in parts:
-        if isinstance(item, dict):
-            item_type = item.get("type")
-            content = item.get("content")
-        else:
-            item_type = getattr(item, "type", None)
-            content = getattr(item, "content", None)
+    items = parts if isinstance(parts, (list, tuple)) else list(parts)
+    if not items:
+        return ""
+    if isinstance(items[0], dict):
+        return _text_from_dict_parts(items)
+    return _text_from_object_parts(items)
+
+
+def _text_from_dict_parts(items: Sequence[Any]) -> str:
+    texts: List[str] = []
+    for item in items:
+        item_type = item.get("type")
         if item_type == "message":
-            if not content:
-                continue
-            for segment in content:
-                if isinstance(segment, dict):
-                    segment_type = segment.get("type")
-                    text = segment.get("text", "")
-                else:
-                    segment_type = getattr(segment, "type", None)
-                    text = getattr(segment, "text", "")
-                if segment_type == "output_text" and text:
-                    chunks.append(text)
+            for segment in item.get("content") or ():
+                if segment.get("type") == "output_text":
+                    texts.append(segment.get("text") or "")
         elif item_type == "output_text":
-            text = item.get("text", "") if isinstance(item, dict) else getattr(item, "text", "")
-            if text:
-                chunks.append(text)
-    return "".join(chunks)
+            texts.append(item.get("text") or "")
+    return "".join(texts)
+
+
+def _text_from_object_parts(items: Sequence[Any]) -> str:
+    texts: List[str] = []
+    for item in items:
+        item_type = getattr(item, "type", None)
+        if item_type == "message":
+            for segment in getattr(item, "content", None) or ():
+                if getattr(segment, "type", None) == "output_text":
+                    texts.append(getattr(segment, "text", None) or "")
+        elif item_type == "output_text":
+            texts.append(getattr(item, "text", None) or "")
+    return "".join(texts)
 
 
 def _normalise_text(value: Any) -> str:
@@ -225,30 +330,59 @@ def _normalise_text(value: Any) -> str:
     return str(value).strip()
 
 
+@lru_cache(maxsize=256)
 def _truncate_message(message: str, *, limit: int = ERROR_MESSAGE_MAX_LENGTH) -> str:
+    # Cached because retry loops log the same error text on every attempt.
     if limit <= 0:
         return ""
     if len(message) <= limit:
         return message
-    if limit == 1:
-        return message[:1]
-    return message[: limit - 1] + "…"
+    if limit <= 3:
+        return message[:limit]
+    # An ASCII ellipsis keeps the JSON event line free of escaped code points.
+    return message[: limit - 3] + "..."
+
+
+_INTERN_MAX_LENGTH = 200
+_WHITESPACE_RE = re.compile(r"\s")
 
 
-def _ensure_str_list(value: Any) -> List[str]:
+def _intern_identifier(text: str) -> str:
+    """Intern short whitespace-free strings such as ids and file paths.
+
+    The same paths recur across focus lists, selected ids and context clues on
+    every run, so sharing one object per value saves memory and lets equality
+    checks short-circuit on identity.  Prose is left alone.
+    """
+    if len(text) < _INTERN_MAX_LENGTH and _WHITESPACE_RE.search(text) is None:
+        return sys.intern(text)
+    return text
+
+
+def _coerce_items(value: Any, *, intern: bool = False) -> List[str]:
+    """Return the non-empty stripped strings in *value* (a string or a sequence).
+
+    ``intern=True`` interns identifier-like items via :func:`_intern_identifier`.
+    """
     if value is None:
         return []
     if isinstance(value, str):
-        text = value.strip()
-        return [text] if text else []
-    if isinstance(value, Sequence):
-        items: List[str] = []
-        for entry in value:
-            text = _normalise_text(entry)
-            if text:
-                items.append(text)
-        return items
-    return []
+        items = [value.strip()]
+    elif isinstance(value, Sequence):
+        normalise = _normalise_text
+        items = [normalise(entry) for entry in value]
+    else:
+        return []
+    if intern:
+        return [_intern_identifier(text) for text in items if text]
+    return [text for text in items if text]
+
+
+def _coerce_dicts(value: Any) -> List[Dict[str, Any]]:
+    """Return the mapping entries of a JSON array, dropping anything else."""
+    if not value or not isinstance(value, list):
+        return []
+    return [item for item in value if isinstance(item, dict)]
 
 
 def _normalise_context_clues(raw: Any) -> List[ContextClue]:
@@ -259,8 +393,8 @@ def _normalise_context_clues(raw: Any) -> List[ContextClue]:
         raw = [raw]
     for index, item in enumerate(raw, start=1):
         if isinstance(item, dict):
-            identifier = _normalise_text(item.get("id")) or f"clue-{index}"
-            path = _normalise_text(item.get("path")) or None
+            identifier = _intern_identifier(_normalise_text(item.get("id")) or f"clue-{index}")
+            path = _intern_identifier(_normalise_text(item.get("path"))) or None
             rationale = _normalise_text(item.get("rationale")) or _normalise_text(
                 item.get("reason")
             )
@@ -287,56 +421,421 @@ def _extract_usage(response: Any) -> StageUsage:
         usage = response.get("usage")
     if usage is None:
         return StageUsage()
+    if isinstance(usage, dict):
+        return _usage_from_dict(usage)
+    return _usage_from_obj(usage)
+
+
+def _usage_from_obj(usage: Any) -> StageUsage:
+    input_tokens = getattr(usage, "input_tokens", None)
+    if input_tokens is None:
+        input_tokens = getattr(usage, "prompt_tokens", None)
+    output_tokens = getattr(usage, "output_tokens", None)
+    if output_tokens is None:
+        output_tokens = getattr(usage, "completion_tokens", None)
+    return StageUsage(
+        input_tokens=_usage_int(input_tokens),
+        output_tokens=_usage_int(output_tokens),
+        total_tokens=_usage_int(getattr(usage, "total_tokens", None)),
+    )
 
-    def _get(attr: str) -> int:
-        if isinstance(usage, dict):
-            value = usage.get(attr)
-        else:
-            value = getattr(usage, attr, None)
-        if value is None and attr == "input_tokens":
-            if isinstance(usage, dict):
-                value = usage.get("prompt_tokens")
-            else:
-                value = getattr(usage, "prompt_tokens", None)
-        if value is None and attr == "output_tokens":
-            if isinstance(usage, dict):
-                value = usage.get("completion_tokens")
-            else:
-                value = getattr(usage, "completion_tokens", None)
-        if isinstance(value, (int, float)):
-            return int(value)
-        try:
-            return int(value)  # type: ignore[arg-type]
-        except Exception:
-            return 0
 
+def _usage_from_dict(usage: Dict[str, Any]) -> StageUsage:
+    input_tokens = usage.get("input_tokens")
+    if input_tokens is None:
+        input_tokens = usage.get("prompt_tokens")
+    output_tokens = usage.get("output_tokens")
+    if output_tokens is None:
+        output_tokens = usage.get("completion_tokens")
     return StageUsage(
-        input_tokens=_get("input_tokens"),
-        output_tokens=_get("output_tokens"),
-        total_tokens=_get("total_tokens"),
+        input_tokens=_usage_int(input_tokens),
+        output_tokens=_usage_int(output_tokens),
+        total_tokens=_usage_int(usage.get("total_tokens")),
+    )
+
+
+def _usage_int(value: Any) -> int:
+    if type(value) is int:
+        return value
+    try:
+        return int(value or 0)
+    except Exception:
+        return 0
+
+
+def _classify_error(exc: BaseException) -> str:
+    """Classify *exc* for the retry loop.
+
+    Returns ``rate_limit``, ``timeout``, ``connection``, ``server`` or
+    ``unknown`` for errors worth retrying, and ``terminal`` for client errors
+    (bad request, auth, not found) that will fail the same way again.
+    """
+    if isinstance(exc, TimeoutError):
+        return "timeout"
+    status = getattr(exc, "status_code", None)
+    if isinstance(status, int):
+        if status == 429:
+            return "rate_limit"
+        if status == 408:
+            return "timeout"
+        if status == 409 or status >= 500:
+            return "server"
+        if 400 <= status < 500:
+            return "terminal"
+    try:
+        import openai
+    except Exception:  # pragma: no cover - the SDK is installed alongside a client
+        return "unknown"
+    if isinstance(exc, openai.APITimeoutError):
+        return "timeout"
+    if isinstance(exc, openai.APIConnectionError):
+        return "connection"
+    return "unknown"
+
+
+def _retry_after_seconds(exc: BaseException) -> Optional[float]:
+    response = getattr(exc, "response", None)
+    headers = getattr(response, "headers", None)
+    if headers is None:
+        return None
+    value = headers.get("retry-after")
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        return None
+
+
+def _retry_delay(attempt: int, exc: BaseException) -> float:
+    """Return the pause before retry *attempt* + 1, honouring ``Retry-After``."""
+    retry_after = _retry_after_seconds(exc)
+    if retry_after is not None:
+        return min(retry_after, RETRY_MAX_DELAY)
+    delay = min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** (attempt - 1))
+    # Full jitter keeps concurrent callers from retrying in lock-step.
+    return delay * (1 + random.uniform(-RETRY_JITTER, RETRY_JITTER))
+
+
+# Exponential moving average of background completion times, in seconds.
+_COMPLETION_EMA: Optional[float] = None
+
+
+def _record_completion_time(elapsed: float) -> None:
+    global _COMPLETION_EMA
+    if _COMPLETION_EMA is None:
+        _COMPLETION_EMA = elapsed
+    else:
+        _COMPLETION_EMA += POLL_EMA_ALPHA * (elapsed - _COMPLETION_EMA)
+
+
+def _initial_poll_delay(poll_interval: float) -> float:
+    if _COMPLETION_EMA is None:
+        return POLL_MIN_INTERVAL
+    return max(POLL_MIN_INTERVAL, 0.5 * _COMPLETION_EMA)
+
+
+def _canonical_message(text: str) -> str:
+    """Normalise line endings and trailing whitespace.
+
+    Server-side prompt caching matches on exact bytes, so equivalent prompts
+    built on different platforms or with stray trailing newlines must
+    serialise identically.
+    """
+    return text.replace("\r\n", "\n").rstrip()
+
+
+def _compress_prompts(
+    system_prompt: str,
+    user_prompt: str,
+    stage: Optional[str],
+) -> Tuple[str, str]:
+    level = prompt_compress.resolve_level()
+    if level == "off":
+        return system_prompt, user_prompt
+    compressed_system = prompt_compress.compress(system_prompt, level)
+    compressed_user = prompt_compress.compress(user_prompt, level)
+    before = len(system_prompt) + len(user_prompt)
+    after = len(compressed_system) + len(compressed_user)
+    if after < before:
+        details: Dict[str, Any] = {
+            "level": level,
+            "tokens_before": prompt_compress.estimate_tokens(system_prompt + user_prompt),
+            "tokens_after": prompt_compress.estimate_tokens(compressed_system + compressed_user),
+        }
+        if stage:
+            details["stage"] = stage
+        append_event(
+            level="info",
+            source="pipeline",
+            message="prompt_compressed",
+            details=details,
+        )
+    return compressed_system, compressed_user
+
+
+_FENCE_RE = re.compile(r"^```(?:json)?\s*\n(.*?)\n```\s*$", re.DOTALL | re.IGNORECASE)
+
+
+def _strip_fence(text: str) -> str:
+    """Return the body of a fully fenced ```` ```json ```` block, else *text*."""
+    stripped = text.strip()
+    if not stripped.startswith("```"):
+        return text
+    match = _FENCE_RE.match(stripped)
+    return match.group(1) if match else text
+
+
+def _loads_json(text: str) -> Any:
+    """Parse a model response; ``orjson`` is much faster on large patch payloads."""
+    if orjson is not None:
+        return orjson.loads(text)
+    return json.loads(text)
+
+
+def _dumps_json(value: Any, *, indent: bool = False) -> str:
+    """Serialise prompt payloads, via ``orjson`` when available.
+
+    Output is compact by default; ``indent=True`` matches ``json.dumps(indent=2)``.
+    """
+    if orjson is not None:
+        option = orjson.OPT_INDENT_2 if indent else 0
+        return orjson.dumps(value, option=option).decode("utf-8")
+    if indent:
+        return json.dumps(value, ensure_ascii=False, indent=2)
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+
+
+def _prompt_cache_key(stage: str, system_prompt: str) -> str:
+    """Return a server prompt-cache key for *stage* that changes with its system prompt."""
+    digest = hashlib.blake2b(system_prompt.encode("utf-8"), digest_size=6).hexdigest()
+    return f"{stage}-{digest}"
+
+
+async def _invoke(method: Any, /, *args: Any, **kwargs: Any) -> Any:
+    """Await *method* on async clients; run sync SDK calls on a worker thread."""
+    if inspect.iscoroutinefunction(method):
+        return await method(*args, **kwargs)
+    return await asyncio.to_thread(method, *args, **kwargs)
+
+
+_SCALAR_EVENTS = frozenset({"string", "number", "boolean", "null"})
+
+
+def _iter_scalar_fields(value: Any, prefix: str = "") -> Iterable[Tuple[str, Any]]:
+    """Yield ``(path, value)`` for every scalar in *value* using ijson's prefixes."""
+    if isinstance(value, dict):
+        for key, item in value.items():
+            yield from _iter_scalar_fields(item, f"{prefix}.{key}" if prefix else str(key))
+    elif isinstance(value, list):
+        item_prefix = f"{prefix}.item" if prefix else "item"
+        for item in value:
+            yield from _iter_scalar_fields(item, item_prefix)
+    else:
+        yield prefix, value
+
+
+class _FieldFeed:
+    """Report JSON scalars to a callback as streamed text arrives.
+
+    With ``ijson`` installed fields are reported while the response is still
+    generating; otherwise (or after a parse error) the remaining fields are
+    reported once the full payload has been parsed.
+    """
+
+    def __init__(self, on_field: FieldCallback) -> None:
+        self._on_field = on_field
+        self._emitted = 0
+        self._events: Optional[List[Tuple[str, str, Any]]] = None
+        self._parser: Any = None
+        if ijson is not None:
+            self._events = ijson.sendable_list()
+            self._parser = ijson.parse_coro(self._events, use_float=True)
+
+    def feed(self, delta: str) -> None:
+        if self._parser is None or not delta:
+            return
+        try:
+            self._parser.send(delta.encode("utf-8"))
+        except Exception:
+            # Not plain JSON (e.g. fenced); leave the rest to finish().
+            self._parser = None
+        self._drain()
+
+    def finish(self, payload: Dict[str, Any]) -> None:
+        if self._parser is not None:
+            try:
+                self._parser.close()
+            except Exception:
+                pass
+            self._parser = None
+            self._drain()
+        # Document order is identical, so skip what was already reported.
+        for index, (path, value) in enumerate(_iter_scalar_fields(payload)):
+            if index >= self._emitted:
+                self._on_field(path, value)
+
+    def _drain(self) -> None:
+        if not self._events:
+            return
+        for prefix, event, value in self._events:
+            if event in _SCALAR_EVENTS:
+                self._emitted += 1
+                self._on_field(prefix, value)
+        del self._events[:]
+
+
+async def _stream_response(client: Any, feed: Optional[_FieldFeed], **request: Any) -> Any:
+    """Run ``responses.stream`` and return the final response.
+
+    Text deltas are forwarded to *feed* as they arrive.  Sync clients consume
+    the stream on a worker thread, so callbacks run on that thread.
+    """
+
+    def _forward(event: Any) -> None:
+        if feed is not None and getattr(event, "type", None) == "response.output_text.delta":
+            feed.feed(getattr(event, "delta", "") or "")
+
+    manager = client.responses.stream(**request)
+    if hasattr(manager, "__aenter__"):
+        async with manager as stream:
+            async for event in stream:
+                _forward(event)
+            return await stream.get_final_response()
+
+    def _consume() -> Any:
+        with manager as stream:
+            for event in stream:
+                _forward(event)
+            return stream.get_final_response()
+
+    return await asyncio.to_thread(_consume)
+
+
+_T = TypeVar("_T")
+
+
+def _run_sync(coro: Coroutine[Any, Any, _T]) -> _T:
+    """Run *coro* to completion for the blocking ``run_*`` wrappers.
+
+    ``asyncio.run`` cannot start inside a running event loop (Jupyter, async
+    hosts), so that case raises a clear error naming the coroutine to await.
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+    name = coro.__qualname__
+    coro.close()
+    raise RuntimeError(
+        f"Blocking pipeline wrappers cannot run inside an event loop; await {name}() instead."
     )
 
 
 def _call_model_json(
-    client: OpenAI,
+    client: OpenAI | AsyncOpenAI | None = None,
     *,
     system_prompt: str,
     user_prompt: str,
     model: str = DEFAULT_MODEL,
     stage: Optional[str] = None,
+    background: bool = False,
+    stream: bool = False,
+    on_field: Optional[FieldCallback] = None,
+    prompt_cache_key: Optional[str] = None,
 ) -> Tuple[Dict[str, Any], StageUsage]:
-    timeout = _env_float("OPENAI_API_TIMEOUT", DEFAULT_API_TIMEOUT)
-    max_retries = max(1, _env_int("OPENAI_API_MAX_RETRIES", DEFAULT_API_MAX_RETRIES))
-    poll_interval = max(0.2, _env_float("OPENAI_API_POLL_INTERVAL", DEFAULT_API_POLL_INTERVAL))
-    request_timeout = max(1.0, _env_float("OPENAI_API_REQUEST_TIMEOUT", DEFAULT_API_REQUEST_TIMEOUT))
+    """Blocking wrapper around :func:`_acall_model_json` for sync callers."""
+    return _run_sync(
+        _acall_model_json(
+            client,
+            system_prompt=system_prompt,
+            user_prompt=user_prompt,
+            model=model,
+            stage=stage,
+            background=background,
+            stream=stream,
+            on_field=on_field,
+            prompt_cache_key=prompt_cache_key,
+        )
+    )
+
+
+async def _acall_model_json(
+    client: OpenAI | AsyncOpenAI | None = None,
+    *,
+    system_prompt: str,
+    user_prompt: str,
+    model: str = DEFAULT_MODEL,
+    stage: Optional[str] = None,
+    background: bool = False,
+    stream: bool = False,
+    on_field: Optional[FieldCallback] = None,
+    prompt_cache_key: Optional[str] = None,
+) -> Tuple[Dict[str, Any], StageUsage]:
+    """Run one JSON-producing model call without blocking the event loop.
+
+    Accepts either an ``AsyncOpenAI`` client, whose coroutines are awaited
+    directly, or a sync ``OpenAI`` client, whose calls are moved off the loop
+    so several stages can still be in flight at once.
+
+    By default the response is awaited on the create request itself.  Pass
+    ``background=True`` for calls that may outlive a single HTTP request; the
+    response is then queued server-side and polled until it completes.
+
+    ``stream=True`` reads the response through ``responses.stream`` instead,
+    falling back to a buffered request when streaming is rejected.
+    ``on_field(path, value)`` is called for every scalar in the JSON payload
+    (paths use ijson's ``plan.item`` notation) as early as the mode allows.
+
+    ``prompt_cache_key`` is forwarded so the server routes calls sharing a
+    system prompt to the same prefix cache (see :func:`_prompt_cache_key`).
+
+    ``client=None`` uses the shared client from :func:`llm_client.get_client`.
+    """
+    timeout = _API_TIMEOUT
+    max_retries = _API_MAX_RETRIES
+    poll_interval = _API_POLL_INTERVAL
+    request_timeout = _API_REQUEST_TIMEOUT
 
     last_error: Optional[Exception] = None
     attempt_count = 0
     current_model = model
 
+    system_prompt, user_prompt = _compress_prompts(
+        _canonical_message(system_prompt), _canonical_message(user_prompt), stage
+    )
+
+    cache_key: Optional[str] = None
+    if response_cache.cache_ttl() > 0:
+        cache_key = response_cache.make_key(model, system_prompt, user_prompt)
+        cached_payload, cache_layer = response_cache.lookup(
+            cache_key,
+            model=model,
+            system_prompt=system_prompt,
+            user_prompt=user_prompt,
+        )
+        if cached_payload is not None:
+            append_event(
+                level="info",
+                source="pipeline",
+                message="model_call_cached",
+                details={
+                    "model": model,
+                    "layer": cache_layer,
+                    **({"stage": stage} if stage else {}),
+                },
+            )
+            if on_field is not None:
+                _FieldFeed(on_field).finish(cached_payload)
+            # No tokens were spent on a cache hit.
+            return cached_payload, StageUsage()
+
+    if client is None:
+        # Resolved after the cache lookup so cache hits never build a client.
+        client = llm_client.get_client()
     stage_label = stage or "unknown"
     try:
-        quota_snapshot = capture_quota_snapshot(
+        quota_snapshot = await acapture_quota_snapshot(
             client,
             request_timeout=request_timeout,
         )
@@ -358,34 +857,105 @@ def _call_model_json(
         console_summary = format_quota_snapshot_for_console(stage_label, quota_snapshot)
         if console_summary:
             print(console_summary)
+    request_options: Dict[str, Any]
+    if background:
+        request_options = {"background": True, "timeout": min(request_timeout, timeout)}
+    else:
+        # Foreground calls hold the request open until the model finishes.
+        request_options = {"timeout": timeout}
+    cache_options = {"prompt_cache_key": prompt_cache_key} if prompt_cache_key else {}
+    request_options.update(cache_options)
+    use_stream = stream and hasattr(client.responses, "stream")
+    # Input tokens drawn from the OPENAI_TPM budget on every attempt.
+    estimated_tokens = prompt_compress.estimate_tokens(system_prompt)
+    estimated_tokens += prompt_compress.estimate_tokens(user_prompt)
+    request_input = [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": user_prompt},
+    ]
     for attempt in range(1, max_retries + 1):
         try:
             attempt_count = attempt
-            deadline = time.monotonic() + timeout
-            response = client.responses.create(
-                model=current_model,
-                input=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt},
-                ],
-                background=True,
-                timeout=min(request_timeout, timeout),
-            )
+            waited = await rate_limit.acquire(estimated_tokens)
+            if waited > 0:
+                append_event(
+                    level="debug",
+                    source="pipeline",
+                    message="rate_limit_wait",
+                    details={"seconds": round(waited, 3), **({"stage": stage} if stage else {})},
+                )
+            started = time.monotonic()
+            deadline = started + timeout
+            feed = _FieldFeed(on_field) if on_field is not None else None
+            response = None
+            if use_stream:
+                try:
+                    response = await _stream_response(
+                        client,
+                        feed,
+                        model=current_model,
+                        input=request_input,
+                        timeout=timeout,
+                        **cache_options,
+                    )
+                except Exception as exc:
+                    if _classify_error(exc) != "terminal":
+                        raise
+                    # Streaming was rejected outright; buffer this and later attempts.
+                    use_stream = False
+                    append_event(
+                        level="warning",
+                        source="pipeline",
+                        message="model_stream_unsupported",
+                        details={
+                            "model": current_model,
+                            "error_type": type(exc).__name__,
+                            **({"stage": stage} if stage else {}),
+                        },
+                    )
+            if response is None:
+                response = await _invoke(
+                    client.responses.create,
+                    model=current_model,
+                    input=request_input,
+                    **request_options,
+                )
 
             response_id = getattr(response, "id", None)
             status = getattr(response, "status", None)
+            polled = False
+            # The first poll waits about half the typical completion time (or
+            # POLL_MIN_INTERVAL before any is known); later polls back off
+            # towards poll_interval and restart from the minimum whenever the
+            # status changes.
+            delay = _initial_poll_delay(poll_interval)
+            # No single retrieve may outlast the whole call's budget.
+            retrieve_timeout = min(request_timeout, timeout)
+            now = time.monotonic
             while status in (None, "queued", "in_progress"):
-                remaining = deadline - time.monotonic()
+                remaining = deadline - now()
                 if remaining <= 0:
                     raise TimeoutError("LLM call exceeded configured timeout")
-                time.sleep(min(poll_interval, remaining))
+                pause = delay if delay < remaining else remaining
+                await asyncio.sleep(pause)
                 if not response_id:
                     break
-                response = client.responses.retrieve(
+                polled = True
+                # The retrieve gets whatever budget the pause left over.
+                left = remaining - pause
+                response = await _invoke(
+                    client.responses.retrieve,
                     response_id,
-                    timeout=min(request_timeout, max(remaining, 0.1)),
+                    timeout=retrieve_timeout if retrieve_timeout < left else max(left, 0.1),
                 )
-                status = getattr(response, "status", None)
+                previous_status, status = status, getattr(response, "status", None)
+                if status != previous_status:
+                    delay = POLL_MIN_INTERVAL
+                else:
+                    delay = min(delay * POLL_BACKOFF_FACTOR, poll_interval)
+
+            if polled and status == "completed":
+                _record_completion_time(time.monotonic() - started)
 
             if status == "completed":
                 text = getattr(response, "output_text", None)
@@ -394,7 +964,8 @@ def _call_model_json(
                 payload: Dict[str, Any]
                 if text:
                     try:
-                        payload = json.loads(text)
+                        # Models sometimes wrap the object in a ```json fence.
+                        payload = _loads_json(_strip_fence(text))
                     except Exception as exc:
                         details = {
                             "attempt": attempt,
@@ -412,11 +983,21 @@ def _call_model_json(
                         payload = {}
                 else:
                     payload = {}
+                if feed is not None and payload:
+                    feed.finish(payload)
+                if cache_key is not None:
+                    response_cache.store(
+                        cache_key,
+                        payload,
+                        model=model,
+                        system_prompt=system_prompt,
+                        user_prompt=user_prompt,
+                    )
                 append_event(
                     level="info",
                     source="pipeline",
                     message="model_call_completed",
-                    details={
+                    details_factory=lambda: {
                         "model": current_model,
                         **({"stage": stage} if stage else {}),
                         "attempts": attempt,
@@ -433,10 +1014,12 @@ def _call_model_json(
         except Exception as exc:  # pragma: no cover - defensive logging
             last_error = exc
             error_message = _truncate_message(str(exc))
+            error_class = _classify_error(exc)
             details = {
                 "attempt": attempt,
                 "model": current_model,
                 "error_type": type(exc).__name__,
+                "error_class": error_class,
                 "error": error_message,
             }
             if stage:
@@ -447,8 +1030,18 @@ def _call_model_json(
                 message="LLM call attempt failed",
                 details=details,
             )
+            error_message = str(exc).lower()
+            if (
+                error_class == "rate_limit"
+                or "quota" in error_message
+                or "rate limit" in error_message
+            ):
+                # The cached snapshot predates the throttling; refetch next time.
+                invalidate_quota_cache(client)
+            if error_class == "terminal":
+                # Bad requests and auth failures will not succeed on a retry.
+                break
             if attempt < max_retries:
-                error_message = str(exc).lower()
                 if (
                     "exceeded your current quota" in error_message
                     and current_model == DEFAULT_MODEL
@@ -463,8 +1056,7 @@ def _call_model_json(
                             "model": current_model,
                         },
                     )
-                sleep_seconds = min(2 ** (attempt - 1), 5)
-                time.sleep(sleep_seconds)
+                await asyncio.sleep(_retry_delay(attempt, exc))
 
     if last_error:
         error_message = _truncate_message(str(last_error))
@@ -473,6 +1065,7 @@ def _call_model_json(
             "attempts": attempts,
             "model": current_model,
             "error_type": type(last_error).__name__,
+            "error_class": _classify_error(last_error),
             "error": error_message,
         }
         if stage:
@@ -492,35 +1085,391 @@ def _call_model_json(
     return {}, StageUsage()
 
 
-def run_context_summary(
-    client: OpenAI,
+async def _acall_stage(
+    client: OpenAI | AsyncOpenAI | None = None,
+    *,
+    system_prompt: str,
+    user_prompt: str,
+    model: str,
+    stage: str,
+    background: bool = False,
+    stream: bool = False,
+    on_field: Optional[FieldCallback] = None,
+) -> Tuple[Dict[str, Any], StageUsage, bool]:
+    """Return ``(payload, usage, restored)`` for *stage*, resuming from a checkpoint.
+
+    ``restored`` is true when the result came from the checkpoint file, in
+    which case its tokens were already logged by the run that produced it.
+    With ``AGENT_USE_BATCH_API`` set the call is submitted to the Batch API
+    (no streaming; ``on_field`` sees the finished payload).
+    """
+    key = None
+    if checkpoint.checkpoint_path() is not None:
+        key = checkpoint.make_key(stage, model, system_prompt, user_prompt)
+        record = checkpoint.checkpoint_load(key)
+        if record is not None and isinstance(record.get("raw"), dict):
+            usage_fields = record.get("usage") or {}
+            append_event(
+                level="info",
+                source="pipeline",
+                message="stage_restored_from_checkpoint",
+                details={"stage": stage, "model": model},
+            )
+            if on_field is not None:
+                _FieldFeed(on_field).finish(record["raw"])
+            return record["raw"], StageUsage(**usage_fields), True
+    if _USE_BATCH_API:
+        payload, usage = await _acall_batch_stage(
+            client, system_prompt=system_prompt, user_prompt=user_prompt, model=model, stage=stage
+        )
+        if on_field is not None:
+            _FieldFeed(on_field).finish(payload)
+    else:
+        payload, usage = await _acall_model_json(
+            client,
+            system_prompt=system_prompt,
+            user_prompt=user_prompt,
+            model=model,
+            stage=stage,
+            background=background,
+            stream=stream,
+            on_field=on_field,
+            prompt_cache_key=_prompt_cache_key(stage, system_prompt),
+        )
+    if key is not None and payload:
+        checkpoint.checkpoint_save(
+            key, {"stage": stage, "model": model, "usage": usage.as_dict(), "raw": payload}
+        )
+    return payload, usage, False
+
+
+def _build_context_summary(
+    payload: Dict[str, Any],
+    usage: Optional[StageUsage],
+    keep_raw: Optional[bool] = None,
+) -> ContextSummary:
+    return ContextSummary(
+        summary=_normalise_text(payload.get("summary") or payload.get("context_summary")),
+        context_clues=_normalise_context_clues(payload.get("context_clues")),
+        usage=usage,
+        raw=_retained_raw(payload, keep_raw),
+    )
+
+
+def _build_retrieval_brief(
+    payload: Dict[str, Any],
+    usage: Optional[StageUsage],
+    keep_raw: Optional[bool] = None,
+) -> RetrievalBrief:
+    return RetrievalBrief(
+        brief=_normalise_text(payload.get("brief") or payload.get("retrieval_brief")),
+        selected_context_ids=_coerce_items(
+            payload.get("selected_context_ids") or payload.get("context_ids"), intern=True
+        ),
+        focus_paths=_coerce_items(
+            payload.get("focus_paths") or payload.get("target_files"), intern=True
+        ),
+        handoff_notes=_normalise_text(payload.get("handoff_notes")),
+        open_questions=_coerce_items(payload.get("open_questions")),
+        usage=usage,
+        raw=_retained_raw(payload, keep_raw),
+    )
+
+
+async def _acall_batch_api(
+    client: Any,
+    *,
+    stage: str,
+    system_prompt: str,
+    user_prompts: Sequence[str],
+    model: str,
+) -> Tuple[List[Dict[str, Any]], StageUsage]:
+    """Run one ``/v1/responses`` request per prompt through the Batch API.
+
+    Returns the parsed payloads in input order (``{}`` for failed entries)
+    and the usage summed over the batch.  Batches can take up to the
+    completion window, so this is only meant for non-interactive runs; a
+    batch still pending after ``AGENT_BATCH_API_TIMEOUT`` seconds is cancelled
+    and :class:`LLMCallError` is raised.
+    """
+    if client is None:
+        client = llm_client.get_client()
+    system_prompt = _canonical_message(system_prompt)
+    lines = []
+    for index, user_prompt in enumerate(user_prompts):
+        system_text, user_text = _compress_prompts(
+            system_prompt, _canonical_message(user_prompt), stage
+        )
+        body = {
+            "model": model,
+            "input": [
+                {"role": "system", "content": system_text},
+                {"role": "user", "content": user_text},
+            ],
+            "prompt_cache_key": _prompt_cache_key(stage, system_text),
+        }
+        lines.append(
+            _dumps_json(
+                {"custom_id": str(index), "method": "POST", "url": "/v1/responses", "body": body}
+            )
+        )
+    upload = await _invoke(
+        client.files.create,
+        file=(f"{stage}-batch.jsonl", ("\n".join(lines) + "\n").encode("utf-8")),
+        purpose="batch",
+    )
+    batch = await _invoke(
+        client.batches.create,
+        input_file_id=upload.id,
+        endpoint="/v1/responses",
+        completion_window=BATCH_COMPLETION_WINDOW,
+    )
+    append_event(
+        level="info",
+        source="pipeline",
+        message="batch_api_submitted",
+        details={"stage": stage, "batch_id": batch.id, "requests": len(lines)},
+    )
+    delay = _API_POLL_INTERVAL
+    deadline = time.monotonic() + _BATCH_TIMEOUT
+    while getattr(batch, "status", None) not in ("completed", "failed", "expired", "cancelled"):
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            await _cancel_batch(client, batch.id, stage)
+            raise LLMCallError(
+                stage=stage,
+                attempts=1,
+                model=model,
+                error=TimeoutError(
+                    f"Batch {batch.id} still {batch.status} after {_BATCH_TIMEOUT:g}s"
+                ),
+            )
+        await asyncio.sleep(min(delay, remaining))
+        delay = min(delay * POLL_BACKOFF_FACTOR, BATCH_POLL_MAX_INTERVAL)
+        batch = await _invoke(client.batches.retrieve, batch.id)
+
+    output_file_id = getattr(batch, "output_file_id", None)
+    if not output_file_id:
+        raise LLMCallError(
+            stage=stage,
+            attempts=1,
+            model=model,
+            error=RuntimeError(f"Batch {batch.id} ended with status {batch.status}"),
+        )
+    content = await _invoke(client.files.content, output_file_id)
+    rows: List[Dict[str, Any]] = [{} for _ in user_prompts]
+    total = StageUsage()
+    for line in content.text.splitlines():
+        if not line.strip():
+            continue
+        try:
+            entry = _loads_json(line)
+        except ValueError:
+            continue
+        if not isinstance(entry, dict):
+            continue
+        body = ((entry.get("response") or {}).get("body")) or {}
+        try:
+            index = int(entry.get("custom_id"))
+        except (TypeError, ValueError):
+            continue
+        if not 0 <= index < len(rows) or body.get("status") != "completed":
+            continue
+        usage = _extract_usage(body)
+        total = StageUsage(
+            input_tokens=total.input_tokens + usage.input_tokens,
+            output_tokens=total.output_tokens + usage.output_tokens,
+            total_tokens=total.total_tokens + usage.total_tokens,
+        )
+        text = _extract_response_text(body.get("output"))
+        try:
+            payload = _loads_json(_strip_fence(text)) if text else {}
+        except ValueError:
+            payload = {}
+        rows[index] = payload if isinstance(payload, dict) else {}
+    append_event(
+        level="info",
+        source="pipeline",
+        message="batch_api_completed",
+        details={"stage": stage, "batch_id": batch.id, "status": batch.status},
+    )
+    return rows, total
+
+
+async def _cancel_batch(client: Any, batch_id: str, stage: str) -> None:
+    """Best-effort cancel of a timed-out batch so it stops accruing work."""
+    try:
+        await _invoke(client.batches.cancel, batch_id)
+    except Exception as exc:
+        append_event(
+            level="warning",
+            source="pipeline",
+            message="batch_api_cancel_failed",
+            details={"stage": stage, "batch_id": batch_id, "error": _truncate_message(str(exc))},
+        )
+        return
+    append_event(
+        level="warning",
+        source="pipeline",
+        message="batch_api_cancelled",
+        details={"stage": stage, "batch_id": batch_id, "reason": "timeout"},
+    )
+
+
+async def _acall_batch_stage(
+    client: OpenAI | AsyncOpenAI | None,
+    *,
+    system_prompt: str,
+    user_prompt: str,
+    model: str,
+    stage: str,
+) -> Tuple[Dict[str, Any], StageUsage]:
+    rows, usage = await _acall_batch_api(
+        client,
+        stage=stage,
+        system_prompt=system_prompt,
+        user_prompts=[user_prompt],
+        model=model,
+    )
+    if not rows[0]:
+        raise LLMCallError(
+            stage=stage,
+            attempts=1,
+            model=model,
+            error=RuntimeError("Batch API returned no usable result"),
+        )
+    return rows[0], usage
+
+
+async def arun_context_summary(
+    client: OpenAI | AsyncOpenAI | None = None,
     *,
     system_prompt: str,
     user_prompt: str,
     model_override: Optional[str] = None,
+    keep_raw: Optional[bool] = None,
 ) -> ContextSummary:
     stage_name = "context_summary"
     log_stage_transition(stage_name, "start")
     model_name, source = _resolve_stage_model(stage_name, model_override)
     _log_model_selection(stage_name, model_name, source)
-    payload, usage = _call_model_json(
+    payload, usage, restored = await _acall_stage(
         client,
         system_prompt=system_prompt,
         user_prompt=user_prompt,
         model=model_name,
         stage=stage_name,
     )
-    summary = _normalise_text(payload.get("summary") or payload.get("context_summary"))
-    clues = _normalise_context_clues(payload.get("context_clues"))
-    result = ContextSummary(summary=summary, context_clues=clues, usage=usage, raw=payload)
-    log_stage_transition(stage_name, "complete", metadata={"context_clues": len(clues)})
-    if usage and not usage.is_empty():
+    result = _build_context_summary(payload, usage, keep_raw)
+    log_stage_transition(
+        stage_name, "complete", metadata={"context_clues": len(result.context_clues)}
+    )
+    if usage and not restored and not usage.is_empty():
         log_token_usage(stage_name, usage=usage.as_dict())
     return result
 
 
-def run_retrieval_brief(
-    client: OpenAI,
+def run_context_summary(
+    client: OpenAI | AsyncOpenAI | None = None,
+    *,
+    system_prompt: str,
+    user_prompt: str,
+    model_override: Optional[str] = None,
+    keep_raw: Optional[bool] = None,
+) -> ContextSummary:
+    """Blocking wrapper around :func:`arun_context_summary`."""
+    return _run_sync(
+        arun_context_summary(
+            client,
+            system_prompt=system_prompt,
+            user_prompt=user_prompt,
+            model_override=model_override,
+            keep_raw=keep_raw,
+        )
+    )
+
+
+# Recent vector-store results keyed by (store id, store revision, compression
+# level, sha256 of the search text, top_k).  Entries hold a weak reference to
+# the store so a recycled ``id`` can never serve another store's results.
+SNIPPET_CACHE_SIZE = 256
+_SNIPPET_CACHE: "OrderedDict[Tuple[int, int, str, str, int], Tuple[weakref.ref, List[QueryResult]]]" = (
+    OrderedDict()
+)
+# Lookups run on ``asyncio.to_thread`` workers, so every access takes this lock.
+_SNIPPET_CACHE_LOCK = threading.Lock()
+
+
+def clear_snippet_cache() -> None:
+    """Forget cached vector-store results (e.g. after an index rebuild)."""
+    with _SNIPPET_CACHE_LOCK:
+        _SNIPPET_CACHE.clear()
+
+
+def _query_snippets(
+    vector_store: VectorStore,
+    search_basis: str,
+    max_snippets: int,
+) -> List[QueryResult]:
+    if not search_basis:
+        return []
+    revision = getattr(vector_store, "revision", None)
+    if not isinstance(revision, int):
+        # Stores without a revision counter cannot tell us when to invalidate.
+        return _search_snippets(vector_store, search_basis, max_snippets) or []
+    key = (
+        id(vector_store),
+        revision,
+        prompt_compress.resolve_level(),
+        hashlib.sha256(search_basis.encode("utf-8")).hexdigest(),
+        max_snippets,
+    )
+    with _SNIPPET_CACHE_LOCK:
+        cached = _SNIPPET_CACHE.get(key)
+        if cached is not None and cached[0]() is vector_store:
+            _SNIPPET_CACHE.move_to_end(key)
+            return list(cached[1])
+    # The search itself runs unlocked; a concurrent miss on the same key just
+    # stores an equal result twice.
+    snippets = _search_snippets(vector_store, search_basis, max_snippets)
+    if snippets is None:
+        return []
+    with _SNIPPET_CACHE_LOCK:
+        _SNIPPET_CACHE[key] = (weakref.ref(vector_store), snippets)
+        if len(_SNIPPET_CACHE) > SNIPPET_CACHE_SIZE:
+            _SNIPPET_CACHE.popitem(last=False)
+    return list(snippets)
+
+
+def _search_snippets(
+    vector_store: VectorStore,
+    search_basis: str,
+    max_snippets: int,
+) -> Optional[List[QueryResult]]:
+    """Query *vector_store*, returning ``None`` when the query fails."""
+    try:
+        snippets = vector_store.query_text(search_basis, top_k=max_snippets)
+    except Exception as exc:  # pragma: no cover - defensive path
+        append_event(
+            level="warning",
+            source="pipeline",
+            message="Vector store query failed",
+            details={"error": str(exc)},
+        )
+        return None
+    if prompt_compress.resolve_level() == "full":
+        # Prose snippets are trimmed to the sentences relevant to the search;
+        # code and test files are kept verbatim.
+        for snippet in snippets:
+            if (snippet.path or "").endswith((".md", ".txt", ".rst")):
+                snippet.content = prompt_compress.select_relevant_sentences(
+                    snippet.content, search_basis
+                )
+    return snippets
+
+
+async def arun_retrieval_brief(
+    client: OpenAI | AsyncOpenAI | None = None,
     *,
     system_prompt: str,
     user_prompt: str,
@@ -528,129 +1477,157 @@ def run_retrieval_brief(
     query_text: Optional[str] = None,
     max_snippets: int = 3,
     model_override: Optional[str] = None,
+    keep_raw: Optional[bool] = None,
 ) -> RetrievalBrief:
     stage_name = "retrieval_brief"
     log_stage_transition(stage_name, "start")
     model_name, source = _resolve_stage_model(stage_name, model_override)
     _log_model_selection(stage_name, model_name, source)
-    payload, usage = _call_model_json(
+    model_call = _acall_stage(
         client,
         system_prompt=system_prompt,
         user_prompt=user_prompt,
         model=model_name,
         stage=stage_name,
     )
-    brief = _normalise_text(payload.get("brief") or payload.get("retrieval_brief"))
-    selected_ids = _ensure_str_list(
-        payload.get("selected_context_ids") or payload.get("context_ids")
-    )
-    focus_paths = _ensure_str_list(payload.get("focus_paths") or payload.get("target_files"))
-    handoff_notes = _normalise_text(payload.get("handoff_notes"))
-    open_questions = _ensure_str_list(payload.get("open_questions"))
-    snippets: List[QueryResult] = []
-    search_basis = query_text or brief
-    if vector_store and search_basis:
-        try:
-            snippets = vector_store.query_text(search_basis, top_k=max_snippets)
-        except Exception as exc:  # pragma: no cover - defensive path
-            append_event(
-                level="warning",
-                source="pipeline",
-                message="Vector store query failed",
-                details={"error": str(exc)},
-            )
-            snippets = []
-
-    result = RetrievalBrief(
-        brief=brief,
-        selected_context_ids=selected_ids,
-        focus_paths=focus_paths,
-        handoff_notes=handoff_notes,
-        open_questions=open_questions,
-        retrieved_snippets=snippets,
-        usage=usage,
-        raw=payload,
+    snippets: Optional[List[QueryResult]] = None
+    if vector_store and query_text:
+        # The search text is known up front, so overlap the (sync) vector
+        # lookup with the model round-trip.
+        (payload, usage, restored), snippets = await asyncio.gather(
+            model_call,
+            asyncio.to_thread(_query_snippets, vector_store, query_text, max_snippets),
+        )
+    else:
+        payload, usage, restored = await model_call
+    result = _build_retrieval_brief(payload, usage, keep_raw)
+    if snippets is None:
+        snippets = _query_snippets(vector_store, result.brief, max_snippets) if vector_store else []
+    result.retrieved_snippets = snippets
+    log_stage_transition(
+        stage_name, "complete", metadata={"focus_paths": len(result.focus_paths)}
     )
-    log_stage_transition(stage_name, "complete", metadata={"focus_paths": len(focus_paths)})
-    if usage and not usage.is_empty():
+    if usage and not restored and not usage.is_empty():
         log_token_usage(stage_name, usage=usage.as_dict())
     return result
 
 
-def _normalise_plan_steps(value: Any) -> List[str]:
-    if value is None:
-        return []
-    if isinstance(value, str):
-        text = value.strip()
-        return [text] if text else []
-    if isinstance(value, Sequence):
-        steps: List[str] = []
-        for entry in value:
-            text = _normalise_text(entry)
-            if text:
-                steps.append(text)
-        return steps
-    return []
+def run_retrieval_brief(
+    client: OpenAI | AsyncOpenAI | None = None,
+    *,
+    system_prompt: str,
+    user_prompt: str,
+    vector_store: Optional[VectorStore] = None,
+    query_text: Optional[str] = None,
+    max_snippets: int = 3,
+    model_override: Optional[str] = None,
+    keep_raw: Optional[bool] = None,
+) -> RetrievalBrief:
+    """Blocking wrapper around :func:`arun_retrieval_brief`."""
+    return _run_sync(
+        arun_retrieval_brief(
+            client,
+            system_prompt=system_prompt,
+            user_prompt=user_prompt,
+            vector_store=vector_store,
+            query_text=query_text,
+            max_snippets=max_snippets,
+            model_override=model_override,
+            keep_raw=keep_raw,
+        )
+    )
 
 
 def _normalise_patch_list(value: Any) -> List[Dict[str, Any]]:
-    if not value:
-        return []
-    if isinstance(value, list):
-        patches: List[Dict[str, Any]] = []
-        for item in value:
-            if isinstance(item, dict) and item.get("path") and item.get("content") is not None:
-                patches.append({"path": item["path"], "content": item["content"]})
-        return patches
-    return []
+    return [
+        {"path": item["path"], "content": item["content"]}
+        for item in _coerce_dicts(value)
+        if item.get("path") and item.get("content") is not None
+    ]
 
 
-def _normalise_admin_requests(value: Any) -> List[Dict[str, Any]]:
-    if not value:
-        return []
-    if isinstance(value, list):
-        requests: List[Dict[str, Any]] = []
-        for item in value:
-            if isinstance(item, dict):
-                requests.append(item)
-        return requests
-    return []
+def _log_plan_field(path: str, value: Any) -> None:
+    if path == "plan.item":
+        append_event(
+            level="debug",
+            source="pipeline",
+            message="plan_step_received",
+            details={"stage": "execution_plan", "step": _truncate_message(_normalise_text(value))},
+        )
 
 
-def run_execution_plan(
-    client: OpenAI,
+async def arun_execution_plan(
+    client: OpenAI | AsyncOpenAI | None = None,
     *,
     system_prompt: str,
     user_prompt: str,
     model_override: Optional[str] = None,
+    keep_raw: Optional[bool] = None,
+    stream: bool = True,
+    on_field: Optional[FieldCallback] = None,
 ) -> ExecutionPlan:
+    """Run the code-generation stage.
+
+    The response is streamed by default, which avoids a ``retrieve`` round
+    trip per poll; ``on_field`` (by default a logger for ``plan`` steps) sees
+    each field as it arrives.  Clients or models that cannot stream, and
+    ``stream=False``, use a background request that is polled instead.
+    """
     stage_name = "execution_plan"
     log_stage_transition(stage_name, "start")
     model_name, source = _resolve_stage_model(stage_name, model_override)
     _log_model_selection(stage_name, model_name, source)
-    payload, usage = _call_model_json(
+    payload, usage, restored = await _acall_stage(
         client,
         system_prompt=system_prompt,
         user_prompt=user_prompt,
         model=model_name,
         stage=stage_name,
+        # Code generation can run for many minutes; when streaming is not
+        # available, poll instead of holding one request open for the call.
+        background=True,
+        stream=stream,
+        on_field=on_field if on_field is not None or not stream else _log_plan_field,
     )
     plan = ExecutionPlan(
         rationale=_normalise_text(payload.get("rationale")),
-        plan=_normalise_plan_steps(payload.get("plan")),
+        plan=_coerce_items(payload.get("plan")),
         code_patches=_normalise_patch_list(payload.get("code_patches")),
         new_tests=_normalise_patch_list(payload.get("new_tests")),
-        admin_requests=_normalise_admin_requests(payload.get("admin_requests")),
+        admin_requests=_coerce_dicts(payload.get("admin_requests")),
         notes=_normalise_text(payload.get("notes")),
         usage=usage,
-        raw=payload,
+        raw=_retained_raw(payload, keep_raw),
     )
     log_stage_transition(
         stage_name,
         "complete",
         metadata={"patches": len(plan.code_patches), "tests": len(plan.new_tests)},
     )
-    if usage and not usage.is_empty():
+    if usage and not restored and not usage.is_empty():
         log_token_usage(stage_name, usage=usage.as_dict())
     return plan
 
+
+def run_execution_plan(
+    client: OpenAI | AsyncOpenAI | None = None,
+    *,
+    system_prompt: str,
+    user_prompt: str,
+    model_override: Optional[str] = None,
+    keep_raw: Optional[bool] = None,
+    stream: bool = True,
+    on_field: Optional[FieldCallback] = None,
+) -> ExecutionPlan:
+    """Blocking wrapper around :func:`arun_execution_plan`."""
+    return _run_sync(
+        arun_execution_plan(
+            client,
+            system_prompt=system_prompt,
+            user_prompt=user_prompt,
+            model_override=model_override,
+            keep_raw=keep_raw,
+            stream=stream,
+            on_field=on_field,
+        )
+    )
@@ -0,0 +1,150 @@
+"""Cheap, local prompt compression applied before model calls.
+
+Compression is opt-in via ``$PROMPT_COMPRESS``.  Only free prose is rewritten:
+fenced code blocks (```` ``` ```` / ``~~~``) are passed through untouched
+because the models are asked to reproduce file contents verbatim, and list
+items, headings, ``key: value`` lines, indented lines and lines mentioning
+code or paths keep their wording and spacing.
+"""
+from __future__ import annotations
+
+import os
+import re
+import statistics
+from typing import List, Set
+
+COMPRESS_ENV = "PROMPT_COMPRESS"
+LEVELS = ("off", "lite", "standard", "full")
+DEFAULT_LEVEL = "off"
+
+# CommonMark fences: at most three spaces of indent, three or more backticks
+# or tildes, optionally followed by an info string.
+_FENCE_RE = re.compile(r"^ {0,3}(`{3,}|~{3,})(.*)$")
+# Lines that carry structure rather than prose: indented, list items, quotes,
+# headings, tables, JSON, ``key: value`` pairs.
+_STRUCTURED_RE = re.compile(r"^(?:\s|[-*+>#|{\[]|\d+[.)]\s|[\w .-]+:(?:\s|$))")
+# Inline code, paths and file names.
+_CODE_TOKEN_RE = re.compile(r"`|\S/\S|\b\w+\.[A-Za-z]{1,5}\b")
+_INNER_SPACE_RE = re.compile(r"(?<=\S)[ \t]{2,}")
+_PLEASANTRY_RE = re.compile(
+    r"\b(?:thank you(?: very much)?|thanks(?: a lot)?)\b[!.]*|"
+    r"\b(?:please|kindly|i would (?:really )?(?:like|appreciate it if) (?:you )?(?:to )?|"
+    r"could you(?: please)?|would you(?: please)?|feel free to)\b[ ,]*",
+    re.IGNORECASE,
+)
+_SENTENCE_RE = re.compile(r"(?<=[.!?])\s+")
+_WORD_RE = re.compile(r"\w{3,}")
+
+
+def resolve_level(level: str | None = None) -> str:
+    """Return *level* (or ``$PROMPT_COMPRESS``) if valid, else the default."""
+    candidate = (level or os.environ.get(COMPRESS_ENV) or DEFAULT_LEVEL).strip().lower()
+    return candidate if candidate in LEVELS else DEFAULT_LEVEL
+
+
+def compress(text: str, level: str | None = None) -> str:
+    """Compress the prose in *text* according to *level*.
+
+    ``lite`` trims trailing whitespace and blank-line runs, ``standard`` also
+    collapses inner whitespace and strips pleasantries, and ``full`` also drops
+    prose lines that repeat an earlier line verbatim.
+    """
+    resolved = resolve_level(level)
+    if resolved == "off" or not text:
+        return text
+
+    seen: Set[str] = set()
+    out: List[str] = []
+    fence: str | None = None
+    for line in text.split("\n"):
+        if fence is not None:
+            if _closes_fence(line, fence):
+                fence = None
+            out.append(line)
+            continue
+        opened = _FENCE_RE.match(line)
+        if opened and not (opened.group(1)[0] == "`" and "`" in opened.group(2)):
+            fence = opened.group(1)
+            out.append(line.rstrip())
+            continue
+        line = line.rstrip()
+        prose = _is_prose(line)
+        if resolved in ("standard", "full") and prose:
+            line = _INNER_SPACE_RE.sub(" ", line)
+            line = _strip_pleasantries(line)
+        if not line:
+            # Collapse runs of blank prose lines into one.
+            if out and not out[-1]:
+                continue
+        elif resolved == "full" and prose:
+            if line in seen:
+                continue
+            seen.add(line)
+        out.append(line)
+    return "\n".join(out).strip("\n")
+
+
+def _closes_fence(line: str, fence: str) -> bool:
+    """Return True if *line* closes a block opened with *fence*.
+
+    The closer must use the same character, be at least as long and carry no
+    info string, so ``` lines inside a ```` block or with a language tag (a
+    nested snippet) do not end the outer block.
+    """
+    match = _FENCE_RE.match(line)
+    if match is None:
+        return False
+    marker, rest = match.groups()
+    return marker[0] == fence[0] and len(marker) >= len(fence) and not rest.strip()
+
+
+def _is_prose(line: str) -> bool:
+    return bool(line) and not _STRUCTURED_RE.match(line) and not _CODE_TOKEN_RE.search(line)
+
+
+def select_relevant_sentences(text: str, query: str) -> str:
+    """Drop the sentences of *text* that overlap *query* less than the median.
+
+    Surviving sentences keep their original order.  Short texts and empty
+    queries are returned unchanged.
+    """
+    sentences = [part for part in _SENTENCE_RE.split(text.strip()) if part]
+    query_terms = {word.lower() for word in _WORD_RE.findall(query)}
+    if len(sentences) < 3 or not query_terms:
+        return text
+    scores = [
+        len(query_terms.intersection(word.lower() for word in _WORD_RE.findall(sentence)))
+        for sentence in sentences
+    ]
+    cutoff = statistics.median(scores)
+    return " ".join(sentence for sentence, score in zip(sentences, scores) if score >= cutoff)
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token estimate (~4 characters per token) for logging."""
+    return (len(text) + 3) // 4
+
+
+def _strip_pleasantries(line: str) -> str:
+    stripped = _PLEASANTRY_RE.sub("", line)
+    if stripped == line:
+        return line
+    indent = line[: len(line) - len(line.lstrip())]
+    body = stripped.strip()
+    if not body:
+        return ""
+    # Re-capitalise a sentence whose leading politeness was removed.
+    if line.lstrip()[:1].isupper():
+        body = body[0].upper() + body[1:]
+    return indent + body
+
+
+__all__ = [
+    "COMPRESS_ENV",
+    "DEFAULT_LEVEL",
+    "LEVELS",
+    "compress",
+    "estimate_tokens",
+    "resolve_level",
+    "select_relevant_sentences",
+]
@@ -0,0 +1,93 @@
+"""Client-side pacing for OpenAI requests.
+
+``OPENAI_RPM`` and ``OPENAI_TPM`` describe the account's request and token
+budgets per minute; model calls wait for capacity here instead of bursting
+into 429 responses and backing off afterwards.  Both are unset by default,
+which disables pacing.
+"""
+from __future__ import annotations
+
+import asyncio
+import os
+import threading
+import time
+from typing import Optional
+
+RPM_ENV = "OPENAI_RPM"
+TPM_ENV = "OPENAI_TPM"
+
+
+class TokenBucket:
+    """Token bucket that refills at ``rate_per_sec`` up to ``capacity``.
+
+    Callers reserve tokens up front and may drive the balance negative; each
+    then sleeps until its own reservation is covered, so waiters are served
+    in arrival order without polling.  State is guarded by a thread lock
+    rather than an asyncio primitive so one bucket works across event loops.
+    """
+
+    def __init__(self, rate_per_sec: float, capacity: float) -> None:
+        self.rate_per_sec = rate_per_sec
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, amount: float) -> float:
+        """Reserve *amount* tokens and return the seconds to wait for them."""
+        # A single oversized request would otherwise never fit.
+        amount = min(amount, self.capacity)
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                self.capacity, self._tokens + (now - self._updated) * self.rate_per_sec
+            )
+            self._updated = now
+            self._tokens -= amount
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate_per_sec
+
+    async def consume(self, amount: float) -> float:
+        """Wait until *amount* tokens are available; return the time waited."""
+        wait = self.reserve(amount)
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return wait
+
+
+_REQUEST_BUCKET: Optional[TokenBucket] = None
+_TOKEN_BUCKET: Optional[TokenBucket] = None
+
+
+def _per_minute_bucket(env_name: str) -> Optional[TokenBucket]:
+    try:
+        per_minute = float(os.environ.get(env_name, "") or 0)
+    except ValueError:
+        return None
+    if per_minute <= 0:
+        return None
+    return TokenBucket(per_minute / 60.0, per_minute)
+
+
+def reload_limits() -> None:
+    """Rebuild the buckets from ``OPENAI_RPM``/``OPENAI_TPM``."""
+    global _REQUEST_BUCKET, _TOKEN_BUCKET
+    _REQUEST_BUCKET = _per_minute_bucket(RPM_ENV)
+    _TOKEN_BUCKET = _per_minute_bucket(TPM_ENV)
+
+
+reload_limits()
+
+
+async def acquire(estimated_tokens: int) -> float:
+    """Wait for one request slot and *estimated_tokens*; return seconds waited."""
+    waited = 0.0
+    if _REQUEST_BUCKET is not None:
+        waited += await _REQUEST_BUCKET.consume(1)
+    if _TOKEN_BUCKET is not None:
+        waited += await _TOKEN_BUCKET.consume(estimated_tokens)
+    return waited
+
+
+__all__ = ["RPM_ENV", "TPM_ENV", "TokenBucket", "acquire", "reload_limits"]
@@ -0,0 +1,268 @@
+"""Disk-backed response cache for pipeline model calls.
+
+Two layers are consulted in order: an exact-match shelf keyed on the SHA-256
+of ``(model, system prompt, user prompt)``, and an optional semantic layer
+that reuses a response whose prompt embedding is close enough to the new one.
+"""
+from __future__ import annotations
+
+import hashlib
+import os
+import pathlib
+import re
+import shelve
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from agent.core.vector_store import VectorStore, normalise_embedding
+
+CACHE_DIR_ENV = "PIPELINE_CACHE_DIR"
+CACHE_TTL_ENV = "PIPELINE_CACHE_TTL"
+DEFAULT_CACHE_DIR = pathlib.Path.home() / ".cache" / "agent" / "pipeline"
+# Caching is opt-in: a TTL of zero (the default) disables lookups and writes.
+DEFAULT_CACHE_TTL = 0.0
+
+SEMANTIC_THRESHOLD_ENV = "PIPELINE_SEM_CACHE_THRESHOLD"
+# The semantic layer is also opt-in; a non-numeric value (e.g. ``on``) enables
+# it with this minimum cosine similarity.
+DEFAULT_SEMANTIC_THRESHOLD = 0.95
+SEMANTIC_DIMENSION = 512
+SEMANTIC_CANDIDATES = 5
+
+_SHELF_NAME = "responses"
+_SEMANTIC_NAME = "semantic.json"
+_LOCK = threading.Lock()
+_SEMANTIC_STORES: Dict[pathlib.Path, VectorStore] = {}
+
+
+def cache_ttl() -> float:
+    """Return the configured entry lifetime in seconds (``0`` disables caching)."""
+    value = os.environ.get(CACHE_TTL_ENV)
+    if value is None:
+        return DEFAULT_CACHE_TTL
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        return DEFAULT_CACHE_TTL
+
+
+def semantic_threshold() -> float:
+    """Return the similarity required for a semantic hit (``0`` disables it)."""
+    value = os.environ.get(SEMANTIC_THRESHOLD_ENV)
+    if not value:
+        return 0.0
+    try:
+        threshold = float(value)
+    except ValueError:
+        return DEFAULT_SEMANTIC_THRESHOLD
+    return threshold if 0.0 < threshold <= 1.0 else 0.0
+
+
+def cache_dir() -> pathlib.Path:
+    override = os.environ.get(CACHE_DIR_ENV)
+    return pathlib.Path(override) if override else DEFAULT_CACHE_DIR
+
+
+def make_key(model: str, system_prompt: str, user_prompt: str) -> str:
+    """Return the cache key for an exact ``(model, system, user)`` prompt."""
+    digest = hashlib.sha256()
+    digest.update(f"{model}\0{system_prompt}\0{user_prompt}".encode("utf-8"))
+    return digest.hexdigest()
+
+
+def get(key: str) -> Optional[Dict[str, Any]]:
+    """Return the cached payload for *key*, or ``None`` when missing or expired."""
+    ttl = cache_ttl()
+    if ttl <= 0:
+        return None
+    try:
+        with _LOCK, _open_shelf() as shelf:
+            entry = shelf.get(key)
+            if entry is None:
+                return None
+            stored_at, payload = entry
+            if time.time() - stored_at >= ttl:
+                del shelf[key]
+                return None
+            return payload
+    except Exception:  # pragma: no cover - a broken cache must not break the run
+        return None
+
+
+def put(key: str, payload: Dict[str, Any]) -> None:
+    """Store *payload* under *key* when caching is enabled."""
+    if cache_ttl() <= 0 or not payload:
+        return
+    try:
+        with _LOCK, _open_shelf() as shelf:
+            shelf[key] = (time.time(), payload)
+    except Exception:  # pragma: no cover - a broken cache must not break the run
+        return
+
+
+def lookup(
+    key: str,
+    *,
+    model: str,
+    system_prompt: str,
+    user_prompt: str,
+) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+    """Return ``(payload, layer)`` from the exact or semantic layer.
+
+    ``layer`` is ``"exact"`` or ``"semantic"`` on a hit and ``None`` on a miss.
+    """
+    payload = get(key)
+    if payload is not None:
+        return payload, "exact"
+    payload = get_similar(model=model, system_prompt=system_prompt, user_prompt=user_prompt)
+    if payload is not None:
+        return payload, "semantic"
+    return None, None
+
+
+def store(
+    key: str,
+    payload: Dict[str, Any],
+    *,
+    model: str,
+    system_prompt: str,
+    user_prompt: str,
+) -> None:
+    """Record *payload* in every enabled layer."""
+    put(key, payload)
+    put_similar(
+        key,
+        payload,
+        model=model,
+        system_prompt=system_prompt,
+        user_prompt=user_prompt,
+    )
+
+
+def get_similar(
+    *,
+    model: str,
+    system_prompt: str,
+    user_prompt: str,
+) -> Optional[Dict[str, Any]]:
+    """Return a fresh payload for the same model whose prompt is similar enough."""
+    ttl = cache_ttl()
+    threshold = semantic_threshold()
+    if ttl <= 0 or threshold <= 0:
+        return None
+    text = _semantic_text(system_prompt, user_prompt)
+    now = time.time()
+    try:
+        with _LOCK:
+            matches = _semantic_store().query_text(text, top_k=SEMANTIC_CANDIDATES)
+    except Exception:  # pragma: no cover - a broken cache must not break the run
+        return None
+    for match in matches:
+        if match.score < threshold:
+            break
+        metadata = match.metadata
+        if metadata.get("model") != model or now - metadata.get("stored_at", 0.0) >= ttl:
+            continue
+        payload = metadata.get("payload")
+        if isinstance(payload, dict) and payload:
+            return payload
+    return None
+
+
+def put_similar(
+    key: str,
+    payload: Dict[str, Any],
+    *,
+    model: str,
+    system_prompt: str,
+    user_prompt: str,
+) -> None:
+    """Index *payload* under the embedding of its prompt when enabled."""
+    if cache_ttl() <= 0 or semantic_threshold() <= 0 or not payload:
+        return
+    try:
+        with _LOCK:
+            vector_store = _semantic_store()
+            # Only the payload is needed on a hit, so the prompt text itself
+            # is not kept alongside the embedding.
+            vector_store.upsert(
+                key,
+                _stable_embed(_semantic_text(system_prompt, user_prompt), SEMANTIC_DIMENSION),
+                metadata={"model": model, "stored_at": time.time(), "payload": payload},
+            )
+            vector_store.save()
+    except Exception:  # pragma: no cover - a broken cache must not break the run
+        return
+
+
+def clear() -> None:
+    """Drop every cached response."""
+    try:
+        with _LOCK:
+            with _open_shelf(flag="n"):
+                pass
+            semantic_path = cache_dir() / _SEMANTIC_NAME
+            _SEMANTIC_STORES.pop(semantic_path, None)
+            semantic_path.unlink(missing_ok=True)
+    except Exception:  # pragma: no cover - defensive
+        return
+
+
+def _semantic_text(system_prompt: str, user_prompt: str) -> str:
+    return f"{system_prompt}\n{user_prompt}"
+
+
+def _stable_embed(text: str, dimension: int) -> List[float]:
+    """Hash tokens with BLAKE2 so embeddings are comparable across processes.
+
+    The vector store's default embedding uses ``hash()``, which is salted per
+    interpreter and therefore useless for a cache persisted between runs.
+    """
+    vector = [0.0] * dimension
+    for token in re.findall(r"\w+", text.lower()):
+        digest = hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest()
+        vector[int.from_bytes(digest, "little") % dimension] += 1.0
+    return normalise_embedding(vector)
+
+
+def _semantic_store() -> VectorStore:
+    """Return the semantic store for the current cache dir; hold ``_LOCK``."""
+    path = cache_dir() / _SEMANTIC_NAME
+    vector_store = _SEMANTIC_STORES.get(path)
+    if vector_store is None:
+        vector_store = VectorStore(
+            path,
+            embedding_dim=SEMANTIC_DIMENSION,
+            embedding_function=_stable_embed,
+            use_faiss=False,
+        )
+        _SEMANTIC_STORES[path] = vector_store
+    return vector_store
+
+
+def _open_shelf(flag: str = "c") -> shelve.Shelf:
+    directory = cache_dir()
+    directory.mkdir(parents=True, exist_ok=True)
+    return shelve.open(str(directory / _SHELF_NAME), flag=flag)
+
+
+__all__ = [
+    "CACHE_DIR_ENV",
+    "CACHE_TTL_ENV",
+    "DEFAULT_CACHE_DIR",
+    "DEFAULT_CACHE_TTL",
+    "DEFAULT_SEMANTIC_THRESHOLD",
+    "SEMANTIC_THRESHOLD_ENV",
+    "cache_dir",
+    "cache_ttl",
+    "clear",
+    "get",
+    "get_similar",
+    "lookup",
+    "make_key",
+    "put",
+    "put_similar",
+    "semantic_threshold",
+    "store",
+]
@@ -1,17 +1,38 @@
 '''Utilities for collating TaskSpec data into orchestrator-ready context.'''
 from __future__ import annotations
 
-from dataclasses import dataclass
+import io
+import sys
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Any, Iterable, Sequence
 
-from agent.core.task_loader import TaskSpecLoadingError, load_task_specs
-from agent.core.task_selection import order_by_priority, summarise_tasks_for_prompt
-from agent.core.task_state import DEFAULT_STATE_PATH, TaskStateError, load_completed_tasks
+from agent.core.task_loader import TaskSpecLoadingError, load_task_specs, task_files_fingerprint
+from agent.core.task_selection import order_by_priority, task_summary_lines
 from agent.core.taskspec import TaskSpec
 
 ROOT = Path(__file__).resolve().parents[2]
 DEFAULT_TASKS_DIR = ROOT / 'tasks'
+# The spec cache is keyed by resolved paths; resolve the default once at import.
+_DEFAULT_TASKS_DIR_RESOLVED = DEFAULT_TASKS_DIR.resolve()
+
+# Parsed specs per resolved tasks directory, reused while the file
+# fingerprint matches.  A parse in progress is published in _SPEC_LOADS so
+# concurrent callers wait for it instead of parsing the same files again.
+_Fingerprint = tuple[tuple[str, int, int], ...]
+_SPEC_CACHE: dict[Path, tuple[_Fingerprint, tuple[TaskSpec, ...]]] = {}
+_SPEC_LOADS: dict[Path, tuple[_Fingerprint, Future]] = {}
+_SPEC_LOCK = threading.Lock()
+
+# Rendered prompts keyed by (tasks dir, completed ids, ready_limit,
+# blocked_limit), each stored with the specs tuple it was rendered from.
+PROMPT_CACHE_SIZE = 8
+_PROMPT_CACHE: OrderedDict[
+    tuple[Path, tuple[str, ...], int, int], tuple[tuple[TaskSpec, ...], TaskPrompt]
+] = OrderedDict()
 
 __all__ = [
     'TaskContextError',
@@ -33,59 +54,97 @@ class TaskContextError(RuntimeError):
 
 @dataclass(frozen=True, slots=True)
 class TaskBatch:
-    '''Partitioned view of task specifications for orchestrator runs.'''
+    '''Partitioned view of task specifications for orchestrator runs.
+
+    ``ready`` and ``blocked`` are stored in priority order, so renderers can
+    slice them without sorting again.
+    '''
 
     ready: tuple[TaskSpec, ...]
     blocked: tuple[TaskSpec, ...]
     completed: tuple[str, ...]
+    _uncapped: tuple[tuple[TaskSpec, ...], tuple[TaskSpec, ...]] | None = field(
+        default=None, repr=False, compare=False
+    )
+    _completed_fs: frozenset[str] | None = field(default=None, repr=False, compare=False)
+    # task_id -> (spec, missing dependencies) recorded while partitioning.
+    _missing: dict[str, tuple[TaskSpec, tuple[str, ...]]] | None = field(
+        default=None, repr=False, compare=False
+    )
+
+    def __post_init__(self) -> None:
+        # load_task_batch hands over the set it partitioned with; build one
+        # only for batches constructed directly.
+        if self._completed_fs is None:
+            object.__setattr__(self, '_completed_fs', frozenset(self.completed))
 
     def is_empty(self) -> bool:
         '''Return True when no ready or blocked tasks are present.'''
         return not self.ready and not self.blocked
 
+    def full(self) -> TaskBatch:
+        '''Return the batch without the ``ready_cap``/``blocked_cap`` truncation.'''
+        if self._uncapped is None:
+            return self
+        ready, blocked = self._uncapped
+        return TaskBatch(
+            ready=ready,
+            blocked=blocked,
+            completed=self.completed,
+            _completed_fs=self._completed_fs,
+            _missing=self._missing,
+        )
+
+    @property
+    def completed_set(self) -> frozenset[str]:
+        '''Completed identifiers as a frozenset, built once per batch.'''
+        return self._completed_fs  # type: ignore[return-value]
+
     def missing_dependencies(self, spec: TaskSpec) -> tuple[str, ...]:
         '''Return dependencies of *spec* that are not marked as completed.'''
-        completed_set = set(self.completed)
-        return tuple(dep for dep in spec.dependencies if dep not in completed_set)
+        if not spec.dependencies:
+            return ()
+        if self._missing is not None:
+            known = self._missing.get(spec.task_id)
+            if known is not None and known[0] is spec:
+                return known[1]
+        return tuple(dep for dep in spec.dependencies if dep not in self._completed_fs)
 
 
 @dataclass(frozen=True, slots=True)
 class TaskPrompt:
-    '''Structured payload combining a task batch with a formatted prompt section.'''
+    '''Structured payload combining a task batch with a formatted prompt section.
+
+    ``ready``, ``blocked`` and ``completed`` mirror the batch's tuples as plain
+    slots so hot loops read them without a forwarding property call.
+    '''
 
     batch: TaskBatch
     prompt: str
+    ready: tuple[TaskSpec, ...] = field(init=False, repr=False, compare=False)
+    blocked: tuple[TaskSpec, ...] = field(init=False, repr=False, compare=False)
+    completed: tuple[str, ...] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        object.__setattr__(self, 'ready', self.batch.ready)
+        object.__setattr__(self, 'blocked', self.batch.blocked)
+        object.__setattr__(self, 'completed', self.batch.completed)
 
     def is_empty(self) -> bool:
         '''Return True when no ready or blocked tasks are described.'''
-        return self.batch.is_empty()
+        return not self.ready and not self.blocked
 
     def has_ready_tasks(self) -> bool:
         '''Return True when at least one task is ready for execution.'''
-        return bool(self.batch.ready)
-
-    @property
-    def ready(self) -> tuple[TaskSpec, ...]:
-        '''Expose the ready task specifications.'''
-        return self.batch.ready
-
-    @property
-    def blocked(self) -> tuple[TaskSpec, ...]:
-        '''Expose the blocked task specifications.'''
-        return self.batch.blocked
-
-    @property
-    def completed(self) -> tuple[str, ...]:
-        '''Expose the normalised completed task identifiers.'''
-        return self.batch.completed
+        return bool(self.ready)
 
     def to_dict(self) -> dict[str, Any]:
         '''Return a serialisable representation suitable for logging or prompts.'''
         return {
             'prompt': self.prompt,
-            'ready_task_ids': [spec.task_id for spec in self.batch.ready],
-            'blocked_task_ids': [spec.task_id for spec in self.batch.blocked],
-            'completed_task_ids': list(self.batch.completed),
+            'ready_task_ids': [spec.task_id for spec in self.ready],
+            'blocked_task_ids': [spec.task_id for spec in self.blocked],
+            'completed_task_ids': list(self.completed),
         }
 
 
@@ -94,9 +153,16 @@ def load_task_batch(
     *,
     completed: Iterable[str] | None = None,
     state_path: Path | str | None = None,
+    ready_cap: int | None = None,
+    blocked_cap: int | None = None,
+    max_workers: int | None = None,
 ) -> TaskBatch:
     '''Load task specifications and partition them into ready and blocked sets.
 
+    Parsed specifications are reused until a task file is added, removed or
+    modified; ``load_task_batch.cache_clear()`` forces the next call to reparse
+    and drops the prompts memoised by :func:`load_task_prompt`.
+
     Args:
         tasks_dir: Directory containing task specification files. Defaults to the
             repository ``tasks/`` directory when not provided.
@@ -105,6 +171,11 @@ def load_task_batch(
             consulted.
         state_path: Path to a persisted completed-task store. Defaults to the
             repository ``state/task_state.json``.
+        ready_cap: When set, keep only this many highest-priority ready tasks.
+        blocked_cap: When set, keep only this many highest-priority blocked
+            tasks. With either cap, :meth:`TaskBatch.full` returns every task.
+        max_workers: Thread count for parsing task files on a cache miss; see
+            :func:`agent.core.task_loader.load_task_specs`.
 
     Returns:
         A :class:`TaskBatch` containing tasks whose dependencies are satisfied
@@ -116,10 +187,46 @@ def load_task_batch(
     tasks_path = _resolve_tasks_dir(tasks_dir)
     completed_ids = _resolve_completed_ids(completed, state_path)
 
-    specs = _load_task_specs(tasks_path)
-    ready, blocked = _partition_tasks(specs, completed_ids)
+    # The cached specs are already priority-ordered and partitioning keeps
+    # that order, so a warm call neither parses nor sorts.
+    specs = _load_task_specs(tasks_path, max_workers=max_workers)
+    return _batch_from_specs(specs, completed_ids, ready_cap=ready_cap, blocked_cap=blocked_cap)
+
+
+def _batch_from_specs(
+    specs: Sequence[TaskSpec],
+    completed_ids: tuple[str, ...],
+    *,
+    ready_cap: int | None = None,
+    blocked_cap: int | None = None,
+) -> TaskBatch:
+    completed_set = frozenset(completed_ids)
+    ready, blocked, missing = _partition_tasks(specs, completed_set)
+    if ready_cap is None and blocked_cap is None:
+        return TaskBatch(
+            ready=ready,
+            blocked=blocked,
+            completed=completed_ids,
+            _completed_fs=completed_set,
+            _missing=missing,
+        )
+
+    return TaskBatch(
+        ready=ready if ready_cap is None else ready[:ready_cap],
+        blocked=blocked if blocked_cap is None else blocked[:blocked_cap],
+        completed=completed_ids,
+        _uncapped=(ready, blocked),
+        _completed_fs=completed_set,
+        _missing=missing,
+    )
 
-    return TaskBatch(ready=ready, blocked=blocked, completed=completed_ids)
+
+# Section boundaries of the rendered prompt, each written with a single call.
+_READY_HEADER = '## Ready Tasks'
+_READY_EMPTY = '## Ready Tasks\nNo ready tasks detected.'
+_BLOCKED_HEADER = '\n\n## Blocked Tasks'
+_COMPLETED_HEADER = '\n\n## Completed Tasks'
+_COMPLETED_SEP = '\n- '
 
 
 def build_task_prompt(
@@ -143,28 +250,28 @@ def build_task_prompt(
     if blocked_limit <= 0:
         raise ValueError('blocked_limit must be positive.')
 
-    sections: list[str] = []
+    buf = io.StringIO()
+    write = buf.write
 
-    sections.append('## Ready Tasks')
-    ready_section = _render_ready_section(batch.ready, limit=ready_limit)
-    if ready_section:
-        sections.extend(ready_section)
+    if batch.ready:
+        write(_READY_HEADER)
+        # batch.ready is already priority-ordered (see TaskBatch).
+        for line in task_summary_lines(batch.ready[:ready_limit]):
+            write('\n')
+            write(line)
     else:
-        sections.append('No ready tasks detected.')
+        write(_READY_EMPTY)
 
-    blocked_section = _render_blocked_section(batch, limit=blocked_limit)
-    if blocked_section:
-        sections.append('')
-        sections.append('## Blocked Tasks')
-        sections.extend(blocked_section)
+    if batch.blocked:
+        write(_BLOCKED_HEADER)
+        _write_blocked_section(buf, batch, limit=blocked_limit)
 
     if batch.completed:
-        sections.append('')
-        sections.append('## Completed Tasks')
-        for task_id in batch.completed:
-            sections.append(f'- {task_id}')
+        write(_COMPLETED_HEADER)
+        write(_COMPLETED_SEP)
+        write(_COMPLETED_SEP.join(batch.completed))
 
-    return '\n'.join(sections).strip()
+    return buf.getvalue().strip()
 
 
 def load_task_prompt(
@@ -175,14 +282,33 @@ def load_task_prompt(
     ready_limit: int = 3,
     blocked_limit: int = 3,
 ) -> TaskPrompt:
-    '''Return a :class:`TaskPrompt` containing task partitions and prompt text.'''
-    batch = load_task_batch(
-        tasks_dir,
-        completed=completed,
-        state_path=state_path,
-    )
+    '''Return a :class:`TaskPrompt` containing task partitions and prompt text.
+
+    The result is memoised on the tasks directory, completed identifiers and
+    limits; while the task files are unchanged, repeated calls return the same
+    :class:`TaskPrompt` object.
+    '''
+    tasks_path = _resolve_tasks_dir(tasks_dir)
+    completed_ids = _resolve_completed_ids(completed, state_path)
+    specs = _load_task_specs(tasks_path)
+    key = (_spec_cache_key(tasks_path), completed_ids, ready_limit, blocked_limit)
+
+    with _SPEC_LOCK:
+        cached = _PROMPT_CACHE.get(key)
+        # A reparse produces a new specs tuple, so identity tracks file changes.
+        if cached is not None and cached[0] is specs:
+            _PROMPT_CACHE.move_to_end(key)
+            return cached[1]
+
+    batch = _batch_from_specs(specs, completed_ids)
     prompt = build_task_prompt(batch, ready_limit=ready_limit, blocked_limit=blocked_limit)
-    return TaskPrompt(batch=batch, prompt=prompt)
+    payload = TaskPrompt(batch=batch, prompt=prompt)
+    with _SPEC_LOCK:
+        _PROMPT_CACHE[key] = (specs, payload)
+        _PROMPT_CACHE.move_to_end(key)
+        while len(_PROMPT_CACHE) > PROMPT_CACHE_SIZE:
+            _PROMPT_CACHE.popitem(last=False)
+    return payload
 
 
 def _resolve_tasks_dir(tasks_dir: Path | str | None) -> Path:
@@ -193,10 +319,16 @@ def _resolve_tasks_dir(tasks_dir: Path | str | None) -> Path:
 
 def _resolve_state_path(state_path: Path | str | None) -> Path:
     if state_path is None:
+        from agent.core.task_state import DEFAULT_STATE_PATH
+
         return DEFAULT_STATE_PATH
     return Path(state_path)
 
 
+def _spec_cache_key(path: Path) -> Path:
+    return _DEFAULT_TASKS_DIR_RESOLVED if path is DEFAULT_TASKS_DIR else path.resolve()
+
+
 def _resolve_completed_ids(
     completed: Iterable[str] | None,
     state_path: Path | str | None,
@@ -204,6 +336,10 @@ def _resolve_completed_ids(
     if completed is not None:
         return _normalise_completed(completed)
 
+    # Imported here so callers that always pass ``completed`` never load the
+    # state-store module.
+    from agent.core.task_state import TaskStateError, load_completed_tasks
+
     resolved_state_path = _resolve_state_path(state_path)
     try:
         stored = load_completed_tasks(resolved_state_path)
@@ -212,74 +348,122 @@ def _resolve_completed_ids(
     return _normalise_completed(stored)
 
 
-def _load_task_specs(path: Path) -> Sequence[TaskSpec]:
+def _load_task_specs(path: Path, *, max_workers: int | None = None) -> Sequence[TaskSpec]:
     try:
-        return load_task_specs(path)
+        fingerprint = task_files_fingerprint(path)
+    except (FileNotFoundError, NotADirectoryError) as exc:
+        raise TaskContextError(path, str(exc)) from exc
+    key = _spec_cache_key(path)
+
+    with _SPEC_LOCK:
+        cached = _SPEC_CACHE.get(key)
+        if cached is not None and cached[0] == fingerprint:
+            return cached[1]
+        pending = _SPEC_LOADS.get(key)
+        if pending is not None and pending[0] == fingerprint:
+            future = pending[1]
+            owner = False
+        else:
+            future = Future()
+            _SPEC_LOADS[key] = (fingerprint, future)
+            owner = True
+    if not owner:
+        return future.result()
+
+    try:
+        specs = _parse_task_specs(path, max_workers=max_workers)
+    except BaseException as exc:
+        with _SPEC_LOCK:
+            _SPEC_LOADS.pop(key, None)
+        future.set_exception(exc)
+        raise
+    with _SPEC_LOCK:
+        _SPEC_CACHE[key] = (fingerprint, specs)
+        _SPEC_LOADS.pop(key, None)
+    future.set_result(specs)
+    return specs
+
+
+def _parse_task_specs(path: Path, *, max_workers: int | None = None) -> tuple[TaskSpec, ...]:
+    '''Load the specs under *path* in priority order (file order within tiers).'''
+    try:
+        return tuple(order_by_priority(load_task_specs(path, max_workers=max_workers)))
     except (FileNotFoundError, NotADirectoryError) as exc:
         raise TaskContextError(path, str(exc)) from exc
     except TaskSpecLoadingError as exc:
         raise TaskContextError(exc.path, str(exc)) from exc
 
 
+def _clear_spec_cache() -> None:
+    with _SPEC_LOCK:
+        _SPEC_CACHE.clear()
+        _PROMPT_CACHE.clear()
+
+
+load_task_batch.cache_clear = _clear_spec_cache  # type: ignore[attr-defined]
+
+
 def _partition_tasks(
     specs: Sequence[TaskSpec],
-    completed: tuple[str, ...],
-) -> tuple[tuple[TaskSpec, ...], tuple[TaskSpec, ...]]:
-    completed_set = set(completed)
+    completed: frozenset[str],
+) -> tuple[
+    tuple[TaskSpec, ...],
+    tuple[TaskSpec, ...],
+    dict[str, tuple[TaskSpec, tuple[str, ...]]],
+]:
     ready: list[TaskSpec] = []
     blocked: list[TaskSpec] = []
-
-    for spec in order_by_priority(specs):
-        if any(dependency not in completed_set for dependency in spec.dependencies):
-            blocked.append(spec)
+    # The unmet dependencies found here are kept so rendering the blocked
+    # section does not scan them a second time.
+    missing: dict[str, tuple[TaskSpec, tuple[str, ...]]] = {}
+
+    for spec in specs:
+        dependencies = spec.dependencies
+        # issuperset walks the tuple in C; only blocked specs pay for the
+        # Python-level scan that lists what is missing.
+        if not dependencies or completed.issuperset(dependencies):
+            ready.append(spec)
             continue
-        ready.append(spec)
-
-    return tuple(ready), tuple(blocked)
+        blocked.append(spec)
+        missing[spec.task_id] = (
+            spec,
+            tuple(dependency for dependency in dependencies if dependency not in completed),
+        )
 
+    # Both partitions inherit the priority order of *specs*.
+    return tuple(ready), tuple(blocked), missing
 
-def _render_ready_section(specs: Sequence[TaskSpec], *, limit: int) -> list[str]:
-    if not specs:
-        return []
-    summary = summarise_tasks_for_prompt(specs, limit=limit)
-    return summary.splitlines()
 
+_ACCEPTANCE_SEP = '\n  * Acceptance: '
 
-def _render_blocked_section(batch: TaskBatch, *, limit: int) -> list[str]:
-    specs = batch.blocked
-    if not specs:
-        return []
-
-    lines: list[str] = []
-    for spec in order_by_priority(specs)[:limit]:
-        priority_label = spec.priority or 'unspecified'
-        lines.append(f'- [{priority_label}] {spec.task_id}: {spec.summary}')
 
+def _write_blocked_section(buf: io.StringIO, batch: TaskBatch, *, limit: int) -> None:
+    # One write per spec part; acceptance criteria are joined in a single call.
+    write = buf.write
+    for spec in batch.blocked[:limit]:
         missing = batch.missing_dependencies(spec)
-        if missing:
-            deps = ', '.join(missing)
-            lines.append(f'  * Blocked by: {deps}')
-        else:
-            lines.append('  * Blocked by: dependencies previously completed.')
-        if spec.has_acceptance_criteria():
-            for criterion in spec.acceptance_criteria:
-                lines.append(f'  * Acceptance: {criterion}')
+        blocked_by = ', '.join(missing) if missing else 'dependencies previously completed.'
+        write(
+            f'\n- [{spec.priority or "unspecified"}] {spec.task_id}: {spec.summary}'
+            f'\n  * Blocked by: {blocked_by}'
+        )
+        if spec.acceptance_criteria:
+            write(_ACCEPTANCE_SEP)
+            write(_ACCEPTANCE_SEP.join(spec.acceptance_criteria))
         else:
-            lines.append('  * No acceptance criteria recorded.')
-
-    return lines
+            write('\n  * No acceptance criteria recorded.')
 
 
 def _normalise_completed(completed: Iterable[str] | None) -> tuple[str, ...]:
-    '''Return a sorted tuple of normalised completed task identifiers.'''
+    '''Return a sorted tuple of normalised completed task identifiers.
+
+    Sorting keeps prompts and prompt-cache keys independent of the caller's
+    iteration order.  The ids are interned to share storage with the
+    ``TaskSpec`` ids they match.
+    '''
     if completed is None:
         return ()
-    normalised: set[str] = set()
-    for entry in completed:
-        if entry is None:
-            continue
-        text = str(entry).strip()
-        if not text:
-            continue
-        normalised.add(text)
-    return tuple(sorted(normalised))
+    normalised = {
+        text for entry in completed if entry is not None and (text := str(entry).strip())
+    }
+    return tuple(sys.intern(text) for text in sorted(normalised))
@@ -3,12 +3,22 @@
 from __future__ import annotations
 
 import json
+import os
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Sequence
+from typing import Iterator, Sequence
 
 from agent.core.taskspec import TaskSpec
 
+try:  # pragma: no cover - optional dependency
+    import orjson  # type: ignore
+except Exception:  # pragma: no cover - fallback when orjson is unavailable
+    orjson = None  # type: ignore
+
 SUPPORTED_EXTENSIONS: tuple[str, ...] = (".json",)
+# Directories with fewer task files than this are parsed serially by default;
+# thread start-up would cost more than the overlapped reads save.
+PARALLEL_LOAD_THRESHOLD = 16
 
 
 class TaskSpecLoadingError(RuntimeError):
@@ -19,7 +29,7 @@ class TaskSpecLoadingError(RuntimeError):
         super().__init__(f"{path}: {message}")
 
 
-def load_task_specs(directory: Path | str) -> list[TaskSpec]:
+def load_task_specs(directory: Path | str, *, max_workers: int | None = None) -> list[TaskSpec]:
     """Load all task specifications from *directory*.
 
     Task files must use one of the supported extensions (currently only ``.json``)
@@ -29,6 +39,9 @@ def load_task_specs(directory: Path | str) -> list[TaskSpec]:
 
     Args:
         directory: Directory to scan for task specification files.
+        max_workers: Number of threads reading files concurrently. ``None``
+            picks a pool size automatically for directories with at least
+            ``PARALLEL_LOAD_THRESHOLD`` files; ``1`` always reads serially.
 
     Returns:
         A list of :class:`TaskSpec` instances sorted by file path and declaration order.
@@ -47,8 +60,22 @@ def load_task_specs(directory: Path | str) -> list[TaskSpec]:
     task_specs: list[TaskSpec] = []
     seen_task_ids: dict[str, Path] = {}
 
-    for file_path in _discover_task_files(root):
-        for spec in _load_task_specs_from_file(file_path):
+    files = _discover_task_files(root)
+    if max_workers is None:
+        if len(files) >= PARALLEL_LOAD_THRESHOLD:
+            max_workers = min(32, (os.cpu_count() or 1) * 4)
+        else:
+            max_workers = 1
+    if max_workers > 1 and len(files) > 1:
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(files))) as executor:
+            # map() yields in file order, so the first broken file (by path)
+            # is still the one reported.
+            parsed = list(executor.map(_load_task_specs_from_file, files))
+    else:
+        parsed = [_load_task_specs_from_file(file_path) for file_path in files]
+
+    for file_path, file_specs in zip(files, parsed):
+        for spec in file_specs:
             duplicate_path = seen_task_ids.get(spec.task_id)
             if duplicate_path is not None:
                 raise TaskSpecLoadingError(
@@ -61,32 +88,59 @@ def load_task_specs(directory: Path | str) -> list[TaskSpec]:
     return task_specs
 
 
-def _discover_task_files(root: Path) -> list[Path]:
-    files: list[Path] = []
-    for path in root.rglob("*"):
-        if not path.is_file():
-            continue
-        if path.suffix.lower() not in SUPPORTED_EXTENSIONS:
-            continue
-        if _is_hidden(path, root):
+def task_files_fingerprint(directory: Path | str) -> tuple[tuple[str, int, int], ...]:
+    """Return ``(path, mtime_ns, size)`` for every task file under *directory*.
+
+    The fingerprint only stats files, so callers can cheaply detect whether
+    :func:`load_task_specs` would return something different from last time.
+
+    Raises:
+        FileNotFoundError: If *directory* does not exist.
+        NotADirectoryError: If *directory* is not a directory.
+    """
+    root = Path(directory)
+    if not root.exists():
+        raise FileNotFoundError(f"Task specification directory {root} does not exist.")
+    if not root.is_dir():
+        raise NotADirectoryError(f"Task specification path {root} is not a directory.")
+
+    entries: list[tuple[str, int, int]] = []
+    for file_path in _discover_task_files(root):
+        try:
+            stat = file_path.stat()
+        except OSError:
+            # Removed between discovery and stat; it will not be loaded either.
             continue
-        files.append(path)
+        entries.append((str(file_path), stat.st_mtime_ns, stat.st_size))
+    return tuple(entries)
+
+
+def _discover_task_files(root: Path) -> list[Path]:
+    files = [Path(path) for path in _iter_task_files(os.fspath(root))]
     files.sort()
     return files
 
 
-def _is_hidden(path: Path, root: Path) -> bool:
-    try:
-        relative_parts = path.relative_to(root).parts
-    except ValueError:
-        # ``path`` is not inside ``root``.
-        return False
-    return any(part.startswith(".") for part in relative_parts)
+def _iter_task_files(directory: str) -> Iterator[str]:
+    """Yield task file paths under *directory*, skipping hidden entries.
+
+    ``os.scandir`` reports entry types from the directory listing itself, so
+    unlike ``Path.rglob`` plus ``is_file`` this needs no ``stat`` per entry.
+    """
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            if entry.name.startswith("."):
+                continue
+            # Symlinked directories are not followed, as with ``Path.rglob``.
+            if entry.is_dir(follow_symlinks=False):
+                yield from _iter_task_files(entry.path)
+            elif entry.is_file() and entry.name.lower().endswith(SUPPORTED_EXTENSIONS):
+                yield entry.path
 
 
 def _load_task_specs_from_file(path: Path) -> list[TaskSpec]:
     try:
-        raw = json.loads(path.read_text(encoding="utf-8"))
+        raw = _read_json(path)
     except json.JSONDecodeError as exc:
         raise TaskSpecLoadingError(path, f"Invalid JSON payload: {exc}") from exc
 
@@ -102,6 +156,18 @@ def _load_task_specs_from_file(path: Path) -> list[TaskSpec]:
     return specs
 
 
+def _read_json(path: Path) -> object:
+    """Parse *path* from its raw bytes, without decoding it to ``str`` first.
+
+    ``orjson.JSONDecodeError`` subclasses ``json.JSONDecodeError``, so callers
+    handle both parsers with one ``except`` clause.
+    """
+    with path.open("rb") as handle:
+        if orjson is not None:
+            return orjson.loads(handle.read())
+        return json.load(handle)
+
+
 def _coerce_task_entries(raw: object, path: Path) -> Sequence[dict[str, object]]:
     if isinstance(raw, dict):
         if "tasks" in raw:
@@ -128,4 +194,9 @@ def _coerce_task_entries(raw: object, path: Path) -> Sequence[dict[str, object]]
     return validated
 
 
-__all__ = ["TaskSpecLoadingError", "load_task_specs"]
+__all__ = [
+    "PARALLEL_LOAD_THRESHOLD",
+    "TaskSpecLoadingError",
+    "load_task_specs",
+    "task_files_fingerprint",
+]
@@ -7,7 +7,8 @@ rules.
 
 from __future__ import annotations
 
-from collections.abc import Collection, Iterable, Sequence
+import heapq
+from collections.abc import Collection, Iterable, Iterator, Sequence
 from pathlib import Path
 from typing import Final
 
@@ -21,9 +22,11 @@ from agent.core.vector_store import VectorStore
 
 __all__ = [
     "order_by_priority",
+    "priority_key",
     "refresh_vector_cache",
     "select_next_task",
     "summarise_tasks_for_prompt",
+    "task_summary_lines",
 ]
 
 _PRIORITY_ORDER: Final[dict[TaskPriority, int]] = {
@@ -33,22 +36,27 @@ _PRIORITY_ORDER: Final[dict[TaskPriority, int]] = {
     "low": 3,
 }
 
+_UNKNOWN_RANK: Final[int] = len(_PRIORITY_ORDER)
+_PRIORITY_GET = _PRIORITY_ORDER.get
+
 
 def _priority_rank(priority: TaskPriority | None) -> int:
     """Return a sortable rank for the provided priority value."""
-    if priority is None:
-        return len(_PRIORITY_ORDER)
-    return _PRIORITY_ORDER[priority]
+    return _PRIORITY_GET(priority, _UNKNOWN_RANK)  # type: ignore[arg-type]
+
+
+def priority_key(spec: TaskSpec) -> int:
+    """Sort key ranking *spec* by priority; stable sorts keep file order within tiers."""
+    return _PRIORITY_GET(spec.priority, _UNKNOWN_RANK)  # type: ignore[arg-type]
 
 
 def order_by_priority(specs: Iterable[TaskSpec]) -> list[TaskSpec]:
     """Return *specs* ordered by priority while preserving stable ordering within tiers."""
-    specs_list = list(specs)
-    ranked = sorted(
-        enumerate(specs_list),
-        key=lambda item: (_priority_rank(item[1].priority), item[0]),
-    )
-    return [spec for _, spec in ranked]
+    items = specs if isinstance(specs, list) else list(specs)
+    # Ranks are computed once per spec; the sort then compares plain ints
+    # fetched by a C-level __getitem__ instead of calling back into Python.
+    ranks = [_PRIORITY_GET(spec.priority, _UNKNOWN_RANK) for spec in items]  # type: ignore[arg-type]
+    return [items[index] for index in sorted(range(len(items)), key=ranks.__getitem__)]
 
 
 def select_next_task(
@@ -67,12 +75,25 @@ def select_next_task(
     Returns:
         The next task to execute, or ``None`` when no tasks are eligible.
     """
-    completed_ids = set(completed or ())
-    for spec in order_by_priority(specs):
-        if any(dependency not in completed_ids for dependency in spec.dependencies):
+    if isinstance(completed, (set, frozenset)):
+        completed_ids: Collection[str] = completed
+    else:
+        completed_ids = set(completed or ())
+    # One pass keeping the best eligible spec; a strict comparison keeps the
+    # earliest spec within a tier, matching the stable priority sort.
+    best_spec: TaskSpec | None = None
+    best_rank = _UNKNOWN_RANK + 1
+    for spec in specs:
+        rank = _priority_rank(spec.priority)
+        if rank >= best_rank:
             continue
-        return spec
-    return None
+        dependencies = spec.dependencies
+        if dependencies and any(dependency not in completed_ids for dependency in dependencies):
+            continue
+        best_spec, best_rank = spec, rank
+        if rank == 0:
+            break
+    return best_spec
 
 
 def summarise_tasks_for_prompt(
@@ -94,23 +115,30 @@ def summarise_tasks_for_prompt(
     if limit <= 0:
         raise ValueError("limit must be positive.")
 
-    selected = order_by_priority(specs)[:limit]
+    # nsmallest is stable like sorted(), without ordering the whole backlog.
+    selected = heapq.nsmallest(limit, specs, key=priority_key)
     if not selected:
         return "No pending tasks."
+    return "\n".join(task_summary_lines(selected))
+
 
-    lines: list[str] = []
-    for spec in selected:
+def task_summary_lines(specs: Iterable[TaskSpec]) -> Iterator[str]:
+    """Yield the :func:`summarise_tasks_for_prompt` lines for *specs*, in the given order.
+
+    Callers that already hold priority-ordered specs can stream these lines
+    into a larger document without sorting again or joining a sub-string.
+    """
+    for spec in specs:
         priority_label = spec.priority or "unspecified"
-        lines.append(f"- [{priority_label}] {spec.task_id}: {spec.summary}")
+        yield f"- [{priority_label}] {spec.task_id}: {spec.summary}"
         if spec.has_acceptance_criteria():
             for criterion in spec.acceptance_criteria:
-                lines.append(f"  * {criterion}")
+                yield f"  * {criterion}"
         else:
-            lines.append("  * No acceptance criteria recorded.")
+            yield "  * No acceptance criteria recorded."
         if spec.dependencies:
             deps = ", ".join(spec.dependencies)
-            lines.append(f"  * Dependencies: {deps}")
-    return "\n".join(lines)
+            yield f"  * Dependencies: {deps}"
 
 
 def refresh_vector_cache(
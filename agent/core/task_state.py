@@ -1,10 +1,19 @@
 '''Persistence helpers for tracking completed tasks across orchestrator runs.'''
 from __future__ import annotations
 
+import contextlib
 import json
+import os
+import stat
+import uuid
 from pathlib import Path
 from typing import Iterable, Iterator
 
+try:  # pragma: no cover - optional dependency
+    import orjson  # type: ignore
+except Exception:  # pragma: no cover - fallback when orjson is unavailable
+    orjson = None  # type: ignore
+
 ROOT = Path(__file__).resolve().parents[2]
 DEFAULT_STATE_PATH = ROOT / 'state' / 'task_state.json'
 
@@ -25,17 +34,45 @@ class CompletedTaskStore:
     def __init__(self, path: Path | str | None = None) -> None:
         self.path = Path(path) if path is not None else DEFAULT_STATE_PATH
         self._completed: set[str] = set()
+        # Sorted view of _completed, rebuilt lazily after each mutation.
+        self._sorted_cache: tuple[str, ...] | None = None
+        # Inside ``with store:`` mutations only mark the state dirty; the
+        # outermost exit (or an explicit flush) writes it once.
+        self._batch_depth = 0
+        self._dirty = False
         self.reload()
 
+    def __enter__(self) -> CompletedTaskStore:
+        self._batch_depth += 1
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self._batch_depth -= 1
+        if self._batch_depth == 0:
+            self.flush()
+
+    def flush(self) -> None:
+        '''Write pending changes made inside a ``with`` block to disk.'''
+        if self._dirty:
+            self._dirty = False
+            _write_completed(self.path, self._completed)
+
     def reload(self) -> tuple[str, ...]:
-        '''Reload task identifiers from disk, returning the current state.'''
+        '''Reload task identifiers from disk, returning the current state.
+
+        Unflushed changes from an open ``with`` block are discarded.
+        '''
+        self._dirty = False
         self._completed = _read_completed(self.path)
+        self._sorted_cache = None
         return self.completed
 
     @property
     def completed(self) -> tuple[str, ...]:
         '''Return the completed task identifiers in sorted order.'''
-        return tuple(sorted(self._completed))
+        if self._sorted_cache is None:
+            self._sorted_cache = tuple(sorted(self._completed))
+        return self._sorted_cache
 
     def is_completed(self, task_id: object) -> bool:
         '''Return ``True`` when *task_id* is marked as completed.'''
@@ -76,7 +113,11 @@ class CompletedTaskStore:
         self._persist()
 
     def _persist(self) -> None:
-        _write_completed(self.path, self._completed)
+        # Every mutation persists, so this is the single invalidation point.
+        self._sorted_cache = None
+        self._dirty = True
+        if not self._batch_depth:
+            self.flush()
 
 
 def load_completed_tasks(path: Path | str | None = None) -> tuple[str, ...]:
@@ -89,7 +130,9 @@ def _read_completed(path: Path) -> set[str]:
     if not path.exists():
         return set()
     try:
-        raw = json.loads(path.read_text(encoding='utf-8'))
+        # Parsed from bytes; orjson.JSONDecodeError subclasses json's.
+        with path.open('rb') as handle:
+            raw = orjson.loads(handle.read()) if orjson is not None else json.load(handle)
     except json.JSONDecodeError as exc:  # pragma: no cover - exercised via tests
         raise TaskStateError(path, f'Invalid JSON payload: {exc}') from exc
 
@@ -123,7 +166,49 @@ def _write_completed(path: Path, completed: Iterable[str]) -> None:
     normalised = {_normalise_task_id(task_id) for task_id in completed}
     payload = {'completed': sorted(normalised)}
     path.parent.mkdir(parents=True, exist_ok=True)
-    path.write_text(json.dumps(payload, ensure_ascii=False, indent=2) + '\n', encoding='utf-8')
+    # Write to a sibling file and rename it over the state so readers never
+    # observe a partially written payload.
+    mode = _existing_mode(path)
+    fd, tmp_name = _create_sibling_temp(path)
+    try:
+        if mode is not None:
+            # Keep the permissions of the state file being replaced.
+            os.chmod(fd, mode)
+        with os.fdopen(fd, 'wb') as handle:
+            handle.write(_dump_state(payload))
+        os.replace(tmp_name, path)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.unlink(tmp_name)
+        raise
+
+
+def _existing_mode(path: Path) -> int | None:
+    try:
+        return stat.S_IMODE(os.stat(path).st_mode)
+    except FileNotFoundError:
+        return None
+
+
+def _create_sibling_temp(path: Path) -> tuple[int, str]:
+    '''Create a unique temporary file next to *path* and return ``(fd, name)``.
+
+    Unlike ``tempfile.mkstemp`` (always 0600) the file is opened with 0o666 so
+    the kernel applies the process umask, as ``write_text`` would for a new file.
+    '''
+    while True:
+        tmp_name = str(path.parent / f'.{path.name}.{uuid.uuid4().hex[:8]}.tmp')
+        try:
+            return os.open(tmp_name, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o666), tmp_name
+        except FileExistsError:
+            continue
+
+
+def _dump_state(payload: dict[str, list[str]]) -> bytes:
+    '''Serialise *payload* as indented UTF-8 JSON; both encoders emit identical bytes.'''
+    if orjson is not None:
+        return orjson.dumps(payload, option=orjson.OPT_INDENT_2 | orjson.OPT_APPEND_NEWLINE)
+    return (json.dumps(payload, ensure_ascii=False, indent=2) + '\n').encode('utf-8')
 
 
 def _normalise_task_id(task_id: object) -> str:
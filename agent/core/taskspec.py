@@ -1,13 +1,17 @@
 """Data models describing structured automation tasks."""
 from __future__ import annotations
 
+import sys
 from collections.abc import Iterable as IterableABC, Mapping as MappingABC
 from dataclasses import dataclass, field
-from typing import Any, Dict, Literal, Optional, Tuple, cast
+from functools import lru_cache
+from typing import Any, Dict, Literal, Optional, Tuple
 
 TaskPriority = Literal["low", "medium", "high", "critical"]
 
 _ALLOWED_PRIORITIES: Tuple[TaskPriority, ...] = ("low", "medium", "high", "critical")
+# Normalised priorities resolve to these constants, so every spec shares them.
+_CANONICAL_PRIORITIES: Dict[str, TaskPriority] = {name: name for name in _ALLOWED_PRIORITIES}
 
 
 def _normalise_required_text(value: Any, field_name: str) -> str:
@@ -52,15 +56,31 @@ def _normalise_sequence(value: Any, field_name: str) -> Tuple[str, ...]:
 
 
 def _normalise_priority(value: Any) -> Optional[TaskPriority]:
+    # Backlogs reuse a handful of spellings, so string inputs hit the cache.
+    if isinstance(value, str):
+        return _normalise_priority_text(value)
+    return _coerce_priority(value)
+
+
+def _coerce_priority(value: Any) -> Optional[TaskPriority]:
     if value is None:
         return None
     text = str(value).strip().lower()
     if not text:
         return None
-    if text not in _ALLOWED_PRIORITIES:
+    canonical = _CANONICAL_PRIORITIES.get(text)
+    if canonical is None:
         allowed = ", ".join(_ALLOWED_PRIORITIES)
         raise ValueError(f"priority must be one of {allowed}, got {value!r}.")
-    return cast(TaskPriority, text)
+    return canonical
+
+
+_normalise_priority_text = lru_cache(maxsize=1024)(_coerce_priority)
+
+
+def _normalise_tags(value: Any, field_name: str) -> Tuple[str, ...]:
+    # Tags repeat across tasks; interning shares one string per distinct tag.
+    return tuple(map(sys.intern, _normalise_sequence(value, field_name)))
 
 
 @dataclass(frozen=True, slots=True)
@@ -78,7 +98,11 @@ class TaskSpec:
     dependencies: Tuple[str, ...] = field(default_factory=tuple)
 
     def __post_init__(self) -> None:
-        object.__setattr__(self, "task_id", _normalise_required_text(self.task_id, "task_id"))
+        # Task ids recur as dependencies and completed ids on every orchestrator
+        # tick; interning lets those comparisons short-circuit on identity.
+        object.__setattr__(
+            self, "task_id", sys.intern(_normalise_required_text(self.task_id, "task_id"))
+        )
         object.__setattr__(self, "title", _normalise_required_text(self.title, "title"))
         object.__setattr__(self, "summary", _normalise_required_text(self.summary, "summary"))
         object.__setattr__(self, "details", _normalise_optional_text(self.details, "details"))
@@ -88,8 +112,12 @@ class TaskSpec:
             "acceptance_criteria",
             _normalise_sequence(self.acceptance_criteria, "acceptance_criteria"),
         )
-        object.__setattr__(self, "tags", _normalise_sequence(self.tags, "tags"))
-        object.__setattr__(self, "dependencies", _normalise_sequence(self.dependencies, "dependencies"))
+        object.__setattr__(self, "tags", _normalise_tags(self.tags, "tags"))
+        object.__setattr__(
+            self,
+            "dependencies",
+            tuple(map(sys.intern, _normalise_sequence(self.dependencies, "dependencies"))),
+        )
         object.__setattr__(self, "priority", _normalise_priority(self.priority))
 
     @classmethod
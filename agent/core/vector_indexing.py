@@ -2,7 +2,12 @@
 
 from __future__ import annotations
 
+import os
+import re
+import stat
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
+from functools import partial
 from pathlib import Path
 from typing import Iterable, Iterator, Sequence
 
@@ -11,17 +16,23 @@ from agent.core.vector_store import VectorStore
 
 DEFAULT_CHUNK_SIZE = 800
 DEFAULT_CHUNK_OVERLAP = 200
-ALLOWED_EXTENSIONS = {
-    ".md",
-    ".mdx",
-    ".rst",
-    ".txt",
-    ".py",
-    ".json",
-    ".yaml",
-    ".yml",
-}
+ALLOWED_EXTENSIONS = frozenset(
+    {
+        ".md",
+        ".mdx",
+        ".rst",
+        ".txt",
+        ".py",
+        ".json",
+        ".yaml",
+        ".yml",
+    }
+)
+# Lower-case suffixes as a tuple, so a single str.endswith call checks them all.
+_EXT_TUPLE: tuple[str, ...] = tuple(sorted(ext.lower() for ext in ALLOWED_EXTENSIONS))
 ALLOWED_ROOTS = {"docs", "tests"}
+# Matches ``\r\n`` and lone ``\r`` so both are rewritten in a single pass.
+_CARRIAGE_RETURN_RE = re.compile(r"\r\n?")
 
 
 @dataclass(frozen=True, slots=True)
@@ -36,7 +47,9 @@ class TextChunk:
 def normalise_newlines(text: str) -> str:
     """Return *text* with Windows/old-Mac newlines normalised to ``\n``."""
 
-    return text.replace("\r\n", "\n").replace("\r", "\n")
+    if "\r" not in text:
+        return text
+    return _CARRIAGE_RETURN_RE.sub("\n", text)
 
 
 def chunk_text(text: str, *, chunk_size: int = DEFAULT_CHUNK_SIZE, overlap: int = DEFAULT_CHUNK_OVERLAP) -> list[TextChunk]:
@@ -55,16 +68,14 @@ def chunk_text(text: str, *, chunk_size: int = DEFAULT_CHUNK_SIZE, overlap: int
         return []
 
     step = chunk_size - overlap
-    start = 0
-    chunks: list[TextChunk] = []
-    while start < length:
-        end = min(start + chunk_size, length)
-        chunk = normalised[start:end]
-        chunks.append(TextChunk(text=chunk, start=start, end=end))
-        if end == length:
-            break
-        start = end - overlap
-    return chunks
+    # Chunks start every ``step`` characters and the last one is the first to
+    # reach ``length``, so the boundaries follow in closed form.
+    count = 1 if length <= chunk_size else (length - chunk_size + step - 1) // step + 1
+    return [
+        TextChunk(text=normalised[start:end], start=start, end=end)
+        for start in range(0, count * step, step)
+        for end in (min(start + chunk_size, length),)
+    ]
 
 
 def iter_source_files(root: Path, include: Sequence[str] = tuple(ALLOWED_ROOTS)) -> Iterator[Path]:
@@ -72,14 +83,33 @@ def iter_source_files(root: Path, include: Sequence[str] = tuple(ALLOWED_ROOTS))
 
     for directory in include:
         candidate_root = root / directory
-        if not candidate_root.exists() or not candidate_root.is_dir():
+        if not candidate_root.is_dir():
             continue
-        for path in sorted(candidate_root.rglob("*")):
-            if not path.is_file():
-                continue
-            if path.suffix.lower() not in ALLOWED_EXTENSIONS:
-                continue
-            yield path
+        # Sorted as Path objects (part by part), matching the former
+        # ``sorted(rglob(...))`` order that snippet ids depend on.
+        yield from sorted(map(Path, _scan(os.fspath(candidate_root), _EXT_TUPLE)))
+
+
+def _scan(root: str, extensions: tuple[str, ...]) -> Iterator[str]:
+    """Yield paths of non-hidden files under *root* ending in one of *extensions*.
+
+    Entry types come from the ``os.scandir`` listing, so only accepted files
+    ever become ``Path`` objects and only symlinks need a ``stat``.  Symlinked
+    files are followed but symlinked directories are not, as with
+    ``Path.rglob``, so a link cycle cannot loop forever.
+    """
+
+    stack = [root]
+    while stack:
+        with os.scandir(stack.pop()) as entries:
+            for entry in entries:
+                name = entry.name
+                if name.startswith("."):
+                    continue
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                elif entry.is_file() and name.lower().endswith(extensions):
+                    yield entry.path
 
 
 def _build_snippet_id(relative_path: Path, chunk_index: int) -> str:
@@ -103,26 +133,48 @@ def index_file(
 ) -> int:
     """Index *path* into *vector_store*, returning the number of chunks stored."""
 
-    relative = path.relative_to(root)
-    if relative.parts[0] not in ALLOWED_ROOTS:
+    chunked = _read_and_chunk(path, root=root, chunk_size=chunk_size, overlap=overlap)
+    if chunked is None:
         return 0
+    relative, chunks = chunked
+    vector_store.delete_by_path(relative.as_posix())
+    return _store_chunks(vector_store, relative, chunks)
 
+
+def _read_and_chunk(
+    path: Path,
+    *,
+    root: Path,
+    chunk_size: int,
+    overlap: int,
+) -> tuple[Path, list[TextChunk]] | None:
+    relative = path.relative_to(root)
+    if relative.parts[0] not in ALLOWED_ROOTS:
+        return None
     text = path.read_text(encoding="utf-8")
-    chunks = chunk_text(text, chunk_size=chunk_size, overlap=overlap)
+    return relative, chunk_text(text, chunk_size=chunk_size, overlap=overlap)
+
+
+def _store_chunks(vector_store: VectorStore, relative: Path, chunks: Sequence[TextChunk]) -> int:
     chunk_total = len(chunks)
-    vector_store.delete_by_path(relative.as_posix())
     source_label = _detect_source(relative)
-    for index, chunk in enumerate(chunks):
-        metadata = {
-            "path": relative.as_posix(),
-            "source": source_label,
-            "chunk_index": index,
-            "chunk_count": chunk_total,
-            "char_start": chunk.start,
-            "char_end": chunk.end,
-        }
-        snippet_id = _build_snippet_id(relative, index)
-        vector_store.add_text(snippet_id, chunk.text, metadata=metadata)
+    relative_posix = relative.as_posix()
+    # One add_texts call so the embedder sees every chunk of the file at once.
+    vector_store.add_texts(
+        [_build_snippet_id(relative, index) for index in range(chunk_total)],
+        [chunk.text for chunk in chunks],
+        metadatas=[
+            {
+                "path": relative_posix,
+                "source": source_label,
+                "chunk_index": index,
+                "chunk_count": chunk_total,
+                "char_start": chunk.start,
+                "char_end": chunk.end,
+            }
+            for index, chunk in enumerate(chunks)
+        ],
+    )
     return chunk_total
 
 
@@ -136,16 +188,32 @@ def index_paths(
 ) -> dict[str, int]:
     """Index the supplied *paths* and return a mapping of path -> chunk count."""
 
-    indexed: dict[str, int] = {}
-    for path in sorted(set(paths)):
-        if not path.exists() or not path.is_file():
+    # Deduplicate, filter by root and stat each candidate once before any
+    # file is read.
+    candidates: dict[str, tuple[Path, str]] = {}
+    seen: set[str] = set()
+    for raw in paths:
+        path = Path(raw)
+        key = str(path)
+        if key in seen:
             continue
+        seen.add(key)
         try:
             relative = path.relative_to(root)
         except ValueError:
             continue
-        if relative.parts[0] not in ALLOWED_ROOTS:
+        if not relative.parts or relative.parts[0] not in ALLOWED_ROOTS:
             continue
+        try:
+            if not stat.S_ISREG(os.stat(key).st_mode):
+                continue
+        except OSError:
+            continue
+        candidates[key] = (path, relative.as_posix())
+
+    indexed: dict[str, int] = {}
+    for key in sorted(candidates):
+        path, relative_posix = candidates[key]
         chunk_total = index_file(
             vector_store,
             path,
@@ -154,7 +222,7 @@ def index_paths(
             overlap=overlap,
         )
         if chunk_total:
-            indexed[relative.as_posix()] = chunk_total
+            indexed[relative_posix] = chunk_total
     if indexed:
         vector_store.save()
     return indexed
@@ -167,23 +235,36 @@ def rebuild_vector_store(
     include: Sequence[str] = tuple(ALLOWED_ROOTS),
     chunk_size: int = DEFAULT_CHUNK_SIZE,
     overlap: int = DEFAULT_CHUNK_OVERLAP,
+    max_workers: int | None = None,
 ) -> dict[str, int]:
-    """Rebuild the vector store at *storage_path* using repository docs/tests."""
+    """Rebuild the vector store at *storage_path* using repository docs/tests.
+
+    Files are read and chunked on a thread pool of *max_workers* threads
+    (``None`` picks one per CPU; ``1`` works serially).  Chunks are stored
+    from the calling thread in file order, so the saved store is identical
+    whatever the pool size.
+    """
 
     storage_path.unlink(missing_ok=True)
     vector_store = VectorStore(storage_path)
+    files = list(iter_source_files(root, include))
+    read = partial(_read_and_chunk, root=root, chunk_size=chunk_size, overlap=overlap)
+    workers = min(max_workers or os.cpu_count() or 1, len(files))
+    if workers > 1:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            chunked_files = list(executor.map(read, files))
+    else:
+        chunked_files = [read(path) for path in files]
+
     indexed: dict[str, int] = {}
-    for path in iter_source_files(root, include):
-        chunk_total = index_file(
-            vector_store,
-            path,
-            root=root,
-            chunk_size=chunk_size,
-            overlap=overlap,
-        )
+    # The store starts empty, so no per-file delete_by_path scan is needed.
+    for chunked in chunked_files:
+        if chunked is None:
+            continue
+        relative, chunks = chunked
+        chunk_total = _store_chunks(vector_store, relative, chunks)
         if chunk_total:
-            relative = path.relative_to(root).as_posix()
-            indexed[relative] = chunk_total
+            indexed[relative.as_posix()] = chunk_total
     vector_store.save()
     return indexed
 
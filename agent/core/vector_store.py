@@ -29,7 +29,9 @@ class VectorStoreError(RuntimeError):
     """Raised when the vector store cannot complete an operation."""
 
 
-def _normalise_embedding(values: Sequence[float]) -> List[float]:
+def normalise_embedding(values: Sequence[float]) -> List[float]:
+    """Return *values* scaled to unit length (all zeros stays all zeros)."""
+
     vector = [float(v) for v in values]
     norm = math.sqrt(sum(v * v for v in vector))
     if not norm:
@@ -47,7 +49,7 @@ def _default_embed(text: str, dimension: int) -> List[float]:
     for token in cleaned:
         index = hash(token) % dimension
         vector[index] += 1.0
-    return _normalise_embedding(vector)
+    return normalise_embedding(vector)
 
 
 @dataclass
@@ -83,12 +85,16 @@ class VectorStore:
         *,
         embedding_dim: int = DEFAULT_DIMENSION,
         embedding_function: Optional[Callable[[str, int], Sequence[float]]] = None,
+        batch_embedding_function: Optional[
+            Callable[[Sequence[str], int], Sequence[Sequence[float]]]
+        ] = None,
         use_faiss: Optional[bool] = None,
     ) -> None:
         self._path = Path(storage_path)
         self._path.parent.mkdir(parents=True, exist_ok=True)
         self._default_dim = embedding_dim
         self._embedding_fn = embedding_function or _default_embed
+        self._batch_embedding_fn = batch_embedding_function
         self._records: MutableMapping[str, VectorRecord] = {}
         self._dimension: Optional[int] = None
         self._dirty = False
@@ -96,8 +102,15 @@ class VectorStore:
         self._faiss_index = None
         self._faiss_ids: List[str] = []
         self._faiss_dirty = True
+        self._revision = 0
         self.load()
 
+    @property
+    def revision(self) -> int:
+        """Counter bumped on every change to the stored records."""
+
+        return self._revision
+
     # ------------------------------------------------------------------
     # Persistence helpers
     # ------------------------------------------------------------------
@@ -115,7 +128,7 @@ class VectorStore:
         self._dimension = int(data.get("dimension", self._default_dim))
         self._records.clear()
         for item in data.get("records", []):
-            embedding = _normalise_embedding(item.get("embedding", []))
+            embedding = normalise_embedding(item.get("embedding", []))
             record = VectorRecord(
                 snippet_id=str(item["id"]),
                 embedding=embedding,
@@ -125,6 +138,7 @@ class VectorStore:
             self._records[record.snippet_id] = record
         self._dirty = False
         self._faiss_dirty = True
+        self._revision += 1
 
     def save(self) -> None:
         """Persist the current store to disk if modified."""
@@ -160,24 +174,29 @@ class VectorStore:
     ) -> None:
         """Insert or update a snippet embedding."""
 
-        if not embedding:
-            raise VectorStoreError("Embedding must contain at least one value")
-        normalised = _normalise_embedding(embedding)
+        normalised = self._validated_embedding(embedding, self._dimension)
         if self._dimension is None:
             self._dimension = len(normalised)
-        elif len(normalised) != self._dimension:
-            raise VectorStoreError(
-                f"Embedding dimensionality mismatch: expected {self._dimension}, got {len(normalised)}"
-            )
-        record = VectorRecord(
+        self._records[snippet_id] = VectorRecord(
             snippet_id=snippet_id,
             embedding=normalised,
             content=content,
             metadata=metadata or {},
         )
-        self._records[snippet_id] = record
         self._dirty = True
         self._faiss_dirty = True
+        self._revision += 1
+
+    @staticmethod
+    def _validated_embedding(embedding: Sequence[float], dimension: Optional[int]) -> List[float]:
+        if not embedding:
+            raise VectorStoreError("Embedding must contain at least one value")
+        normalised = normalise_embedding(embedding)
+        if dimension is not None and len(normalised) != dimension:
+            raise VectorStoreError(
+                f"Embedding dimensionality mismatch: expected {dimension}, got {len(normalised)}"
+            )
+        return normalised
 
     def add_text(
         self,
@@ -192,6 +211,57 @@ class VectorStore:
         embedding = self._embedding_fn(text, dim)
         self.upsert(snippet_id, embedding, content=text, metadata=metadata)
 
+    def add_texts(
+        self,
+        snippet_ids: Sequence[str],
+        texts: Sequence[str],
+        *,
+        metadatas: Optional[Sequence[Optional[Dict[str, Any]]]] = None,
+    ) -> None:
+        """Embed and store several texts, handing the embedder one batch.
+
+        With a ``batch_embedding_function`` every text is embedded in a single
+        call; otherwise each text goes through ``embedding_function``.  The
+        revision is bumped once for the whole batch.
+        """
+
+        if len(snippet_ids) != len(texts):
+            raise VectorStoreError("snippet_ids and texts must have the same length")
+        if metadatas is not None and len(metadatas) != len(texts):
+            raise VectorStoreError("metadatas must match the number of texts")
+        if not texts:
+            return
+        dim = self._dimension or self._default_dim
+        if self._batch_embedding_fn is not None:
+            embeddings = self._batch_embedding_fn(texts, dim)
+            if len(embeddings) != len(texts):
+                raise VectorStoreError(
+                    f"Batch embedder returned {len(embeddings)} embeddings for {len(texts)} texts"
+                )
+        else:
+            embeddings = [self._embedding_fn(text, dim) for text in texts]
+        # Validate the whole batch before touching _records, so a bad embedding
+        # leaves the store exactly as it was.
+        dimension = self._dimension
+        records: List[VectorRecord] = []
+        for index, (snippet_id, text, embedding) in enumerate(zip(snippet_ids, texts, embeddings)):
+            normalised = self._validated_embedding(embedding, dimension)
+            dimension = len(normalised)
+            records.append(
+                VectorRecord(
+                    snippet_id=snippet_id,
+                    embedding=normalised,
+                    content=text,
+                    metadata=(metadatas[index] if metadatas is not None else None) or {},
+                )
+            )
+        self._dimension = dimension
+        for record in records:
+            self._records[record.snippet_id] = record
+        self._dirty = True
+        self._faiss_dirty = True
+        self._revision += 1
+
     def bulk_upsert(self, items: Iterable[VectorRecord]) -> None:
         for item in items:
             self.upsert(item.snippet_id, item.embedding, content=item.content, metadata=item.metadata)
@@ -201,6 +271,7 @@ class VectorStore:
             del self._records[snippet_id]
             self._dirty = True
             self._faiss_dirty = True
+            self._revision += 1
 
     # ------------------------------------------------------------------
     # Query API
@@ -210,7 +281,7 @@ class VectorStore:
             return []
         if self._dimension is None:
             raise VectorStoreError("Vector store is not initialised with any embeddings")
-        normalised = _normalise_embedding(embedding)
+        normalised = normalise_embedding(embedding)
         if len(normalised) != self._dimension:
             raise VectorStoreError(
                 f"Query dimensionality mismatch: expected {self._dimension}, got {len(normalised)}"
@@ -300,6 +371,7 @@ class VectorStore:
         if to_delete:
             self._dirty = True
             self._faiss_dirty = True
+            self._revision += 1
         return len(to_delete)
 
     def delete_by_path(self, path: str) -> int:
@@ -322,5 +394,6 @@ __all__ = [
     "VectorStore",
     "VectorStoreError",
     "DEFAULT_DIMENSION",
+    "normalise_embedding",
 ]
 
@@ -13,17 +13,23 @@ import pathlib
 import re
 import subprocess
 import sys
-from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence
-
-from openai import OpenAI
-
-from agent.core.event_log import append_event, load_events, log_admin_requests
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Mapping, Optional, Sequence
+
+from agent.core.event_log import (
+    append_event,
+    flush_events,
+    load_events,
+    log_admin_requests,
+    normalise_admin_requests,
+)
+from agent.core.llm_client import create_client, get_client
 from agent.core.pipeline import (
     ContextClue,
     ContextSummary,
     ExecutionPlan,
     LLMCallError,
     RetrievalBrief,
+    _dumps_json,
     run_context_summary,
     run_execution_plan,
     run_retrieval_brief,
@@ -44,6 +50,9 @@ from agent.core.task_selection import (
 from agent.core.taskspec import TaskSpec
 from agent.core.vector_store import QueryResult, VectorStore, VectorStoreError
 
+if TYPE_CHECKING:  # pragma: no cover - clients are built via agent.core.llm_client
+    from openai import OpenAI
+
 ROOT = pathlib.Path(__file__).resolve().parents[1]
 AUTO_BRANCH_PREFIX = "auto/"
 AUTO_LABEL = "auto"
@@ -190,12 +199,20 @@ def create_branch() -> str:
     else:
         ts = datetime.datetime.utcnow().strftime("%Y%m%d-%H%M%S")
         branch = f"{AUTO_BRANCH_PREFIX}{ts}"
+    flush_events()
     sh(["git", "checkout", "-b", branch])
     _PREFERRED_BRANCH_NAME = None
     return branch
 
 
+def _checkout_previous_branch() -> None:
+    flush_events()
+    sh(["git", "checkout", "-"], check=False)
+
+
 def commit_all(msg: str) -> None:
+    # Queued event-log writes must be on disk before the tree is staged.
+    flush_events()
     sh(["git", "add", "-A"], check=False)
     status = sh(["git", "status", "--porcelain"], check=False).strip()
     if not status:
@@ -282,7 +299,7 @@ def _get_completed_store() -> CompletedTaskStore:
     return _COMPLETED_STORE
 
 
-def _maybe_create_openai_client(api_key: str | None = None) -> Optional[OpenAI]:
+def _maybe_create_openai_client(api_key: str | None = None) -> Optional["OpenAI"]:
     api_key = api_key or os.environ.get("OPENAI_API_KEY")
     if not api_key:
         append_event(
@@ -291,7 +308,7 @@ def _maybe_create_openai_client(api_key: str | None = None) -> Optional[OpenAI]:
             message="OPENAI_API_KEY missing; skipping live model calls.",
         )
         return None
-    return OpenAI(api_key=api_key)
+    return create_client(api_key=api_key)
 
 
 def apply_plan(plan: ExecutionPlan) -> list[str]:
@@ -396,7 +413,7 @@ def _select_task_for_execution(task_prompt: TaskPrompt) -> Optional[TaskSpec]:
             details={"missing_task_ids": missing_catalog_entries},
         )
 
-    completed_ids = set(task_prompt.completed)
+    completed_ids = task_prompt.batch.completed_set
     eligible_ready = [
         spec for spec in resolved_ready if spec.task_id not in completed_ids
     ]
@@ -508,16 +525,17 @@ def _build_context_summary_prompt(
         "- `context_clues`: array (max 5) of objects with `id`, `path` (optional), `rationale`, and `content` (<= 500 characters, copy directly from the provided material when referencing code).\n"
         "Ensure clue ids follow the format `clue-1`, `clue-2`, ... for downstream reference."
     )
-    sections = [instructions]
+    # Most stable material first and the per-run outcome digest last, so
+    # consecutive calls share the longest possible byte-identical prefix for
+    # server-side prompt caching.
+    sections = [
+        instructions,
+        "\n## Task Backlog\n" + backlog_section,
+        "\n## Selected Task\n" + selected_section,
+        "\n## Repository Snapshot (truncated)\n" + snapshot,
+    ]
     if important_section:
         sections.append("\n" + important_section.strip())
-    sections.extend(
-        [
-            "\n## Task Backlog\n" + backlog_section,
-            "\n## Selected Task\n" + selected_section,
-            "\n## Repository Snapshot (truncated)\n" + snapshot,
-        ]
-    )
     return "".join(sections)
 
 
@@ -531,7 +549,7 @@ def _context_clues_to_json(clues: Sequence[ContextClue]) -> str:
         }
         for clue in clues
     ]
-    return json.dumps(payload, ensure_ascii=False, indent=2)
+    return _dumps_json(payload, indent=True)
 
 
 def _load_prompt_fragment(name: str) -> str:
@@ -593,16 +611,14 @@ def _build_retrieval_prompt(
     )
     summary_text = context_summary.summary or "(no summary provided)"
     clues_block = clues_json if clues_json.strip() else "[]"
-    sections = [instructions]
+    sections = [
+        instructions,
+        "\n## Selected Task (for reference)\n" + selected_section,
+        "\n## Context Summary\n" + summary_text,
+        "\n## Candidate Context Clues\n```json\n" + clues_block + "\n```",
+    ]
     if important_section:
         sections.append("\n" + important_section.strip())
-    sections.extend(
-        [
-            "\n## Selected Task (for reference)\n" + selected_section,
-            "\n## Context Summary\n" + summary_text,
-            "\n## Candidate Context Clues\n```json\n" + clues_block + "\n```",
-        ]
-    )
     return "".join(sections)
 
 
@@ -665,20 +681,18 @@ def _build_execution_prompt(
         "- `code_patches` entries must include `path` and full file `content`.\n"
         "- Limit the scope to the provided focus paths unless the plan justifies additional files."
     )
-    sections = [instructions]
+    sections = [
+        instructions,
+        "\n## Selected Task for Execution\n" + selected_section,
+        "\n## Retrieval Brief\n" + (retrieval_brief.brief or "(no brief provided)"),
+        "\n## Retrieved Snippets\n" + snippet_section,
+        "\n## Focus Paths\n" + focus_block,
+        "\n## Handoff Notes\n" + (retrieval_brief.handoff_notes or "(none)"),
+        "\n## Open Questions\n" + questions_block,
+        "\n## Context Excerpts\n" + context_section,
+    ]
     if important_section:
         sections.append("\n" + important_section.strip())
-    sections.extend(
-        [
-            "\n## Selected Task for Execution\n" + selected_section,
-            "\n## Retrieval Brief\n" + (retrieval_brief.brief or "(no brief provided)"),
-            "\n## Retrieved Snippets\n" + snippet_section,
-            "\n## Focus Paths\n" + focus_block,
-            "\n## Handoff Notes\n" + (retrieval_brief.handoff_notes or "(none)"),
-            "\n## Open Questions\n" + questions_block,
-            "\n## Context Excerpts\n" + context_section,
-        ]
-    )
     return "".join(sections)
 
 
@@ -686,7 +700,7 @@ def call_code_model(
     system_prompt: str,
     user_prompt: str,
     *,
-    client: OpenAI | None = None,
+    client: Optional["OpenAI"] = None,
 ) -> Dict[str, Any]:
     """Execute the code-generation stage and return a serialisable payload."""
 
@@ -694,7 +708,7 @@ def call_code_model(
         api_key = os.environ.get("OPENAI_API_KEY")
         if not api_key:
             raise RuntimeError("OPENAI_API_KEY is required to call the code model.")
-        runner = OpenAI(api_key=api_key)
+        runner = get_client()
     else:
         runner = client
     execution_plan = run_execution_plan(runner, system_prompt=system_prompt, user_prompt=user_prompt)
@@ -834,18 +848,14 @@ def _summarise_admin_request(request: Mapping[str, Any] | Any) -> str:
 
 
 def _announce_admin_requests(requests: Sequence[Mapping[str, Any]] | Sequence[Any]) -> None:
-    if not requests:
-        return
-
-    stored = log_admin_requests(requests)
-    if not stored:
-        return
-
-    details = stored.get("details", {})
-    recorded = details.get("requests", [])
+    recorded = normalise_admin_requests(requests)
     if not recorded:
         return
 
+    # Persistence honours AGENT_EVENT_LOG_LEVEL; the console announcement is
+    # operator-facing and always printed.
+    log_admin_requests(recorded)
+
     print("\nAdmin assistance requested:")
     for idx, request in enumerate(recorded, start=1):
         summary = _summarise_admin_request(request)
@@ -1017,7 +1027,7 @@ def main() -> int:
             file=sys.stderr,
         )
         if branch_checked_out:
-            sh(["git", "checkout", "-"], check=False)
+            _checkout_previous_branch()
         return 1
     except Exception as e:
         append_event(
@@ -1028,7 +1038,7 @@ def main() -> int:
         )
         print(f"LLM call failed: {e}", file=sys.stderr)
         if branch_checked_out:
-            sh(["git", "checkout", "-"], check=False)
+            _checkout_previous_branch()
         return 1
 
     if not plan_applied:
@@ -1047,7 +1057,7 @@ def main() -> int:
         )
         print(f"Tests fehlgeschlagen, kein Push/PR. Fehler: {e}", file=sys.stderr)
         if branch_checked_out:
-            sh(["git", "checkout", "-"], check=False)
+            _checkout_previous_branch()
         return 1
 
     push_branch(branch_name)
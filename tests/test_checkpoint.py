@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+import os
+import pathlib
+import tempfile
+import unittest
+from unittest import mock
+
+from agent.core import checkpoint, pipeline
+
+
+class CheckpointTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmpdir.cleanup)
+        self.path = pathlib.Path(self._tmpdir.name) / "results.jsonl"
+        patcher = mock.patch.dict(
+            os.environ,
+            {
+                "AGENT_EVENT_LOG_PATH": os.devnull,
+                checkpoint.CHECKPOINT_ENV: str(self.path),
+            },
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(checkpoint._INDEX.clear)  # type: ignore[attr-defined]
+
+    def test_save_and_load_survive_reload_and_torn_lines(self) -> None:
+        key = checkpoint.make_key("stage", "model", "sys", "user")
+        self.assertIsNone(checkpoint.checkpoint_load(key))
+
+        checkpoint.checkpoint_save(key, {"raw": {"summary": "done"}})
+        with self.path.open("a", encoding="utf-8") as handle:
+            handle.write('{"key": "torn')
+        checkpoint._INDEX.clear()  # type: ignore[attr-defined]
+
+        self.assertEqual(checkpoint.checkpoint_load(key), {"raw": {"summary": "done"}})
+        self.assertNotEqual(key, checkpoint.make_key("other", "model", "sys", "user"))
+
+    def test_disabled_without_path(self) -> None:
+        with mock.patch.dict(os.environ, {checkpoint.CHECKPOINT_ENV: ""}):
+            checkpoint.checkpoint_save("key", {"raw": {}})
+            self.assertIsNone(checkpoint.checkpoint_load("key"))
+        self.assertFalse(self.path.exists())
+
+    def test_stage_resumes_from_checkpoint(self) -> None:
+        calls = []
+
+        class Responses:
+            def create(self, *args, **kwargs):  # type: ignore[no-untyped-def]
+                calls.append(kwargs["model"])
+
+                class Response:
+                    id = "resp"
+                    status = "completed"
+                    output_text = '{"summary": "fresh", "context_clues": []}'
+                    usage = {"input_tokens": 3, "output_tokens": 4, "total_tokens": 7}
+
+                return Response()
+
+        class DummyClient:
+            responses = Responses()
+
+        first = pipeline.run_context_summary(
+            DummyClient(), system_prompt="sys", user_prompt="user", keep_raw=True
+        )
+        checkpoint._INDEX.clear()  # type: ignore[attr-defined]
+        second = pipeline.run_context_summary(
+            DummyClient(), system_prompt="sys", user_prompt="user", keep_raw=True
+        )
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(second.summary, "fresh")
+        self.assertEqual(second.raw, {"summary": "fresh", "context_clues": []})
+        self.assertEqual(second.raw, first.raw)
+        self.assertEqual(second.usage, first.usage)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -3,7 +3,10 @@ from __future__ import annotations
 import json
 import os
 import tempfile
+import threading
 import unittest
+from collections import deque
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
 from unittest import mock
 
@@ -14,7 +17,7 @@ class EventLogTests(unittest.TestCase):
     def setUp(self) -> None:
         self._tmpdir = tempfile.TemporaryDirectory()
         self.addCleanup(self._tmpdir.cleanup)
-        self.log_path = Path(self._tmpdir.name) / "log.json"
+        self.log_path = Path(self._tmpdir.name) / "log.jsonl"
         patcher = mock.patch.dict(os.environ, {"AGENT_EVENT_LOG_PATH": str(self.log_path)})
         patcher.start()
         self.addCleanup(patcher.stop)
@@ -35,9 +38,10 @@ class EventLogTests(unittest.TestCase):
         self.assertEqual(events[0]["source"], "unit_test")
         self.assertEqual(events[0]["details"], {"code": 123})
 
-        raw = self.log_path.read_text(encoding="utf-8")
-        loaded = json.loads(raw)
-        self.assertIsInstance(loaded, list)
+        event_log.flush_events()
+        lines = self.log_path.read_text(encoding="utf-8").splitlines()
+        self.assertEqual(len(lines), 1)
+        self.assertEqual(json.loads(lines[0])["message"], "Something failed")
 
     def test_event_log_truncates_to_max(self) -> None:
         for idx in range(event_log.MAX_EVENTS + 5):
@@ -48,6 +52,65 @@ class EventLogTests(unittest.TestCase):
         self.assertEqual(events[0]["message"], "m5")
         self.assertEqual(events[-1]["message"], f"m{event_log.MAX_EVENTS + 4}")
 
+    def test_event_log_compacts_after_threshold(self) -> None:
+        for idx in range(event_log.COMPACT_THRESHOLD + 1):
+            event_log.append_event(level="info", source="s", message=f"m{idx}")
+
+        event_log.flush_events()
+        lines = self.log_path.read_text(encoding="utf-8").splitlines()
+        self.assertEqual(len(lines), event_log.MAX_EVENTS)
+        self.assertEqual(json.loads(lines[-1])["message"], f"m{event_log.COMPACT_THRESHOLD}")
+        self.assertEqual(list(self.log_path.parent.iterdir()), [self.log_path])
+
+    def test_load_events_skips_malformed_lines(self) -> None:
+        event_log.append_event(level="info", source="s", message="first")
+        event_log.flush_events()
+        with self.log_path.open("a", encoding="utf-8") as handle:
+            handle.write("{not json\n")
+        event_log.append_event(level="info", source="s", message="second")
+        event_log.flush_events()
+        event_log._EVENT_CACHE.clear()  # type: ignore[attr-defined]
+
+        events = event_log.load_events(self.log_path)
+        self.assertEqual([event["message"] for event in events], ["first", "second"])
+
+    def test_load_events_served_from_cache_after_first_read(self) -> None:
+        event_log.append_event(level="info", source="s", message="cached")
+        event_log.flush_events()
+        self.log_path.write_text("", encoding="utf-8")
+
+        events = event_log.load_events(self.log_path)
+        self.assertEqual([event["message"] for event in events], ["cached"])
+
+        event_log.clear_events(self.log_path)
+        self.assertEqual(event_log.load_events(self.log_path), [])
+
+    def test_iter_events_streams_full_log_after_flushing(self) -> None:
+        for idx in range(event_log.MAX_EVENTS + 3):
+            event_log.append_event(level="info", source="s", message=f"m{idx}")
+
+        messages = [event["message"] for event in event_log.iter_events(self.log_path)]
+        self.assertEqual(len(messages), event_log.MAX_EVENTS + 3)
+        self.assertEqual(messages[0], "m0")
+
+        tail = deque(event_log.iter_events(self.log_path), maxlen=2)
+        self.assertEqual(
+            [event["message"] for event in tail],
+            [f"m{event_log.MAX_EVENTS + 1}", f"m{event_log.MAX_EVENTS + 2}"],
+        )
+
+    def test_event_timestamps_are_utc_isoformat(self) -> None:
+        before = datetime.now(timezone.utc)
+        first = event_log.append_event(level="info", source="s", message="a")
+        second = event_log.append_event(level="info", source="s", message="b")
+        after = datetime.now(timezone.utc)
+
+        parsed = [datetime.fromisoformat(item["timestamp"]) for item in (first, second)]
+        self.assertTrue(all(stamp.utcoffset() == timedelta(0) for stamp in parsed))
+        self.assertLessEqual(before.replace(microsecond=0), parsed[0])
+        self.assertLessEqual(parsed[0], parsed[1])
+        self.assertLessEqual(parsed[1], after)
+
     def test_log_admin_requests_records_valid_entries(self) -> None:
         requests = [
             {"type": "credentials", "message": "Need GitHub token"},
@@ -79,5 +142,57 @@ class EventLogTests(unittest.TestCase):
         self.assertEqual(events, [])
 
 
+    def test_events_below_threshold_skip_details_factory(self) -> None:
+        factory = mock.Mock(return_value={"stage": "plan"})
+
+        with mock.patch.dict(os.environ, {event_log.LOG_LEVEL_ENV: "info"}):
+            dropped = event_log.append_event(
+                level="debug", source="s", message="dropped", details_factory=factory
+            )
+        self.assertEqual(dropped["message"], "dropped")
+        self.assertNotIn("details", dropped)
+        factory.assert_not_called()
+
+        stored = event_log.append_event(
+            level="debug", source="s", message="kept", details_factory=factory
+        )
+        self.assertEqual(stored["details"], {"stage": "plan"})
+        self.assertEqual(
+            [event["message"] for event in event_log.load_events(self.log_path)], ["kept"]
+        )
+
+    def test_clear_events_orders_with_concurrent_appends(self) -> None:
+        event_log.append_event(level="info", source="s", message="before")
+        stop = threading.Event()
+
+        def append_until_stopped() -> None:
+            index = 0
+            while not stop.is_set():
+                event_log.append_event(level="info", source="s", message=f"during-{index}")
+                index += 1
+
+        writer = threading.Thread(target=append_until_stopped)
+        writer.start()
+        try:
+            for _ in range(5):
+                event_log.clear_events(self.log_path)
+        finally:
+            stop.set()
+            writer.join()
+        event_log.flush_events()
+
+        cached = [event["message"] for event in event_log.load_events(self.log_path)]
+        on_disk = [event["message"] for event in event_log.iter_events(self.log_path)]
+        self.assertNotIn("before", on_disk)
+        self.assertEqual(on_disk[-len(cached):] if cached else on_disk, cached)
+
+        event_log.clear_events(self.log_path)
+        event_log.append_event(level="info", source="s", message="after")
+        event_log.flush_events()
+        self.assertEqual(
+            [event["message"] for event in event_log.iter_events(self.log_path)], ["after"]
+        )
+
+
 if __name__ == "__main__":
     unittest.main()
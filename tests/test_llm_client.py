@@ -0,0 +1,42 @@
+from __future__ import annotations
+
+from agent.core import llm_client
+
+
+def test_connection_limits_read_environment(monkeypatch) -> None:
+    monkeypatch.setenv(llm_client.MAX_CONNECTIONS_ENV, "64")
+    monkeypatch.setenv(llm_client.MAX_KEEPALIVE_ENV, "not-a-number")
+
+    limits = llm_client.connection_limits()
+
+    assert limits.max_connections == 64
+    assert limits.max_keepalive_connections == llm_client.DEFAULT_MAX_KEEPALIVE_CONNECTIONS
+
+
+def test_create_async_client_falls_back_without_aiohttp() -> None:
+    client = llm_client.create_async_client(api_key="test-key")
+
+    assert client.api_key == "test-key"
+
+
+def test_create_client_enables_http2_only_when_h2_is_installed(monkeypatch) -> None:
+    monkeypatch.setattr(llm_client, "h2", None)
+    assert llm_client.http2_enabled() is False
+    llm_client.create_client(api_key="test-key")
+
+    monkeypatch.setattr(llm_client, "h2", object())
+    assert llm_client.http2_enabled() is True
+
+
+def test_shared_client_is_built_once_and_injectable(monkeypatch) -> None:
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    llm_client.set_client(None)
+    try:
+        first = llm_client.get_client()
+        assert llm_client.get_client() is first
+
+        sentinel = object()
+        llm_client.set_client(sentinel)  # type: ignore[arg-type]
+        assert llm_client.get_client() is sentinel
+    finally:
+        llm_client.set_client(None)
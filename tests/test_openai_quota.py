@@ -1,11 +1,32 @@
 from __future__ import annotations
 
 import json
+import threading
 
 from agent.core.openai_quota import (
     QuotaSnapshot,
+    _extract_numeric_blocks,
+    _summarise_limits_payload,
+    capture_quota_snapshot,
     format_quota_snapshot_for_console,
+    invalidate_quota_cache,
 )
+from agent.core import openai_quota
+
+
+class _BarrierClient:
+    """Fake client whose GETs only succeed when both run concurrently."""
+
+    def __init__(self) -> None:
+        self.barrier = threading.Barrier(2, timeout=5)
+        self.paths: list[str] = []
+
+    def get(self, path, *, cast_to, options):  # type: ignore[no-untyped-def]
+        self.paths.append(path)
+        self.barrier.wait()
+        if path == "/usage":
+            return {"aggregated_usage": {"requests": 4}}
+        return {"data": [{"name": "requests", "limit": 100}]}
 
 
 def test_format_quota_snapshot_for_console_returns_serialised_payload() -> None:
@@ -37,3 +58,75 @@ def test_format_quota_snapshot_for_console_ignores_empty_snapshot() -> None:
     snapshot = QuotaSnapshot()
 
     assert format_quota_snapshot_for_console("context_summary", snapshot) is None
+
+
+def test_extract_numeric_blocks_skips_booleans_and_non_numeric_values() -> None:
+    block = {
+        "requests": 3,
+        "cost": 1.5,
+        "name": "gpt",
+        "active": True,
+        "window": {"limit": 10, "strict": False, "unit": "rpm"},
+        "empty": {"unit": "rpm"},
+    }
+
+    assert _extract_numeric_blocks(block) == {
+        "requests": 3,
+        "cost": 1.5,
+        "window": {"limit": 10},
+    }
+
+
+def test_capture_quota_snapshot_fetches_usage_and_limits_concurrently() -> None:
+    client = _BarrierClient()
+    invalidate_quota_cache()
+
+    snapshot = capture_quota_snapshot(client, request_timeout=1.0)
+
+    assert sorted(client.paths) == ["/limits", "/usage"]
+    assert snapshot.usage == {"totals": {"requests": 4}}
+    assert snapshot.limits == {"limits": [{"name": "requests", "metrics": {"limit": 100}}]}
+
+
+class _CountingClient:
+    def __init__(self) -> None:
+        self.calls: list[str] = []
+
+    def get(self, path, *, cast_to, options):  # type: ignore[no-untyped-def]
+        self.calls.append(path)
+        return {"aggregated_usage": {"requests": len(self.calls)}}
+
+
+def test_capture_quota_snapshot_caches_per_client_until_invalidated(monkeypatch) -> None:
+    invalidate_quota_cache()
+    client = _CountingClient()
+
+    first = capture_quota_snapshot(client, request_timeout=1.0, include_limits=False)
+    second = capture_quota_snapshot(client, request_timeout=1.0, include_limits=False)
+    assert client.calls == ["/usage"]
+    assert second.usage == first.usage
+
+    # Limits have their own TTL and are fetched independently of usage.
+    capture_quota_snapshot(client, request_timeout=1.0)
+    assert client.calls == ["/usage", "/limits"]
+
+    monkeypatch.setattr(openai_quota, "USAGE_CACHE_TTL", 0.0)
+    capture_quota_snapshot(client, request_timeout=1.0)
+    assert client.calls == ["/usage", "/limits", "/usage"]
+
+    monkeypatch.setattr(openai_quota, "USAGE_CACHE_TTL", 30.0)
+    invalidate_quota_cache(client)
+    capture_quota_snapshot(client, request_timeout=1.0)
+    assert sorted(client.calls[3:]) == ["/limits", "/usage"]
+
+
+def test_summarise_limits_payload_only_reads_first_entries() -> None:
+    def entries():
+        for idx in range(5):
+            yield {"name": f"limit-{idx}", "limit": idx}
+        raise AssertionError("entries beyond the cap must not be consumed")
+
+    summary = _summarise_limits_payload({"data": entries()})
+
+    assert summary is not None
+    assert [item["name"] for item in summary["limits"]] == [f"limit-{idx}" for idx in range(5)]
@@ -409,6 +409,19 @@ def test_admin_requests_are_logged_and_announced(monkeypatch, capsys):
     assert "Need API key" in stdout
 
 
+def test_announce_admin_requests_prints_when_event_level_filtered(monkeypatch, capsys, tmp_path):
+    monkeypatch.setenv("AGENT_EVENT_LOG_PATH", str(tmp_path / "events.jsonl"))
+    monkeypatch.setenv("AGENT_EVENT_LOG_LEVEL", "error")
+
+    orchestrator._announce_admin_requests([{"summary": "Rotate the deploy key"}, "ignored"])
+
+    stdout = capsys.readouterr().out
+    assert "Admin assistance requested" in stdout
+    assert "1. Rotate the deploy key" in stdout
+    assert "ignored" not in stdout
+    assert orchestrator.load_events(tmp_path / "events.jsonl") == []
+
+
 def test_main_surfaces_stage_metadata_on_llm_failure(monkeypatch, capsys):
     monkeypatch.setenv("OPENAI_API_KEY", "test")
 
@@ -507,3 +520,47 @@ def test_main_does_not_checkout_previous_branch_when_model_fails(monkeypatch):
     result = orchestrator.main()
     assert result == 1
     assert ["git", "checkout", "-"] not in checkout_commands
+
+
+def test_stage_prompts_place_run_outcomes_after_stable_sections():
+    task = TaskSpec(
+        task_id="task/cache",
+        title="Cache friendly prompts",
+        summary="Keep stable prompt prefixes",
+    )
+    summary = pipeline.ContextSummary(summary="Summary text")
+    important = "## Important Run Outcomes\n- last run failed"
+
+    retrieval_prompt = orchestrator._build_retrieval_prompt(
+        task, summary, important_section=important
+    )
+    execution_prompt = orchestrator._build_execution_prompt(
+        task,
+        pipeline.RetrievalBrief(brief="Brief"),
+        [],
+        important_section=important,
+    )
+
+    for prompt in (retrieval_prompt, execution_prompt):
+        assert prompt.endswith(important)
+        assert prompt.index("## Selected Task") < prompt.index(important)
+    assert retrieval_prompt == orchestrator._build_retrieval_prompt(task, summary) + "\n" + important
+
+
+def test_commit_all_flushes_event_log_before_staging(monkeypatch, tmp_path):
+    log_path = tmp_path / "events.jsonl"
+    monkeypatch.setenv("AGENT_EVENT_LOG_PATH", str(log_path))
+    orchestrator.append_event(level="info", source="test", message="before commit")
+
+    staged_logs: list[str] = []
+
+    def fake_sh(args, check=True, cwd=orchestrator.ROOT):  # type: ignore[override]
+        if args[:2] == ["git", "add"]:
+            staged_logs.append(log_path.read_text(encoding="utf-8"))
+        return "M docs/run_events.jsonl" if args[:2] == ["git", "status"] else ""
+
+    monkeypatch.setattr(orchestrator, "sh", fake_sh)
+
+    orchestrator.commit_all("test commit")
+
+    assert staged_logs and "before commit" in staged_logs[0]
@@ -1,10 +1,18 @@
 from __future__ import annotations
 
+import asyncio
+import json
 import os
+import sys
+import tempfile
 import unittest
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
 from unittest import mock
 
 from agent.core import pipeline
+from agent.core.vector_store import VectorStore
 
 
 class PipelineModelCallTests(unittest.TestCase):
@@ -17,7 +25,9 @@ class PipelineModelCallTests(unittest.TestCase):
             },
         )
         patcher.start()
+        self.addCleanup(pipeline._reload_env)  # type: ignore[attr-defined]
         self.addCleanup(patcher.stop)
+        pipeline._reload_env()  # type: ignore[attr-defined]
 
     def test_call_model_json_logs_stage_and_error_type_on_failure(self) -> None:
         class FailingResponses:
@@ -29,7 +39,7 @@ class PipelineModelCallTests(unittest.TestCase):
 
         captured = []
 
-        def fake_append_event(*, level, source, message, details=None):  # type: ignore[no-untyped-def]
+        def fake_append_event(*, level, source, message, details=None, details_factory=None):  # type: ignore[no-untyped-def]
             captured.append({
                 "level": level,
                 "source": source,
@@ -54,7 +64,7 @@ class PipelineModelCallTests(unittest.TestCase):
         self.assertEqual(details["stage"], "execution_plan")
         self.assertEqual(details["error_type"], "RuntimeError")
         self.assertLessEqual(len(details["error"]), pipeline.ERROR_MESSAGE_MAX_LENGTH)
-        self.assertTrue(details["error"].endswith("…"))
+        self.assertTrue(details["error"].endswith("..."))
 
         exhaustion_event = captured[1]
         self.assertEqual(exhaustion_event["message"], "llm_call_exhausted")
@@ -66,7 +76,7 @@ class PipelineModelCallTests(unittest.TestCase):
         self.assertLessEqual(
             len(exhaustion_details["error"]), pipeline.ERROR_MESSAGE_MAX_LENGTH
         )
-        self.assertTrue(exhaustion_details["error"].endswith("…"))
+        self.assertTrue(exhaustion_details["error"].endswith("..."))
 
     def test_call_model_json_records_exhaustion_after_retries(self) -> None:
         class FailingResponses:
@@ -78,18 +88,18 @@ class PipelineModelCallTests(unittest.TestCase):
 
         captured = []
 
-        def fake_append_event(*, level, source, message, details=None):  # type: ignore[no-untyped-def]
+        def fake_append_event(*, level, source, message, details=None, details_factory=None):  # type: ignore[no-untyped-def]
             captured.append(
                 {
                     "level": level,
                     "source": source,
                     "message": message,
-                    "details": details or {},
+                    "details": details or (details_factory() if details_factory else {}),
                 }
             )
             return captured[-1]
 
-        with mock.patch.dict(os.environ, {"OPENAI_API_MAX_RETRIES": "2"}):
+        with mock.patch.object(pipeline, "_API_MAX_RETRIES", 2):
             with mock.patch.object(pipeline, "append_event", side_effect=fake_append_event):
                 with self.assertRaises(pipeline.LLMCallError):
                     pipeline._call_model_json(  # type: ignore[protected-access]
@@ -127,13 +137,13 @@ class PipelineModelCallTests(unittest.TestCase):
 
         captured = []
 
-        def fake_append_event(*, level, source, message, details=None):  # type: ignore[no-untyped-def]
+        def fake_append_event(*, level, source, message, details=None, details_factory=None):  # type: ignore[no-untyped-def]
             captured.append(
                 {
                     "level": level,
                     "source": source,
                     "message": message,
-                    "details": details or {},
+                    "details": details or (details_factory() if details_factory else {}),
                 }
             )
             return captured[-1]
@@ -163,6 +173,548 @@ class PipelineModelCallTests(unittest.TestCase):
         completion_events = [event for event in captured if event["message"] == "model_call_completed"]
         self.assertEqual(len(completion_events), 1)
 
+    def test_arun_execution_plan_awaits_async_client(self) -> None:
+        calls = []
+
+        class Response:
+            def __init__(self, status: str) -> None:
+                self.id = "resp_async"
+                self.status = status
+                self.output_text = '{"rationale": "r", "plan": ["step"]}'
+                self.usage = {"input_tokens": 1, "output_tokens": 2, "total_tokens": 3}
+
+        class AsyncResponses:
+            async def create(self, *args, **kwargs):  # type: ignore[no-untyped-def]
+                calls.append("create")
+                return Response("queued")
+
+            async def retrieve(self, response_id, **kwargs):  # type: ignore[no-untyped-def]
+                calls.append(("retrieve", response_id))
+                return Response("completed")
+
+        class AsyncClient:
+            responses = AsyncResponses()
+
+            async def get(self, path, **kwargs):  # type: ignore[no-untyped-def]
+                calls.append(("get", path))
+                return {}
+
+        with mock.patch.object(pipeline, "_API_POLL_INTERVAL", 0.2):
+            plan = asyncio.run(
+                pipeline.arun_execution_plan(
+                    AsyncClient(), system_prompt="sys", user_prompt="user"
+                )
+            )
+
+        self.assertEqual(plan.rationale, "r")
+        self.assertEqual(plan.plan, ["step"])
+        self.assertEqual(plan.usage.total_tokens, 3)  # type: ignore[union-attr]
+        self.assertIn("create", calls)
+        self.assertIn(("retrieve", "resp_async"), calls)
+
+    def test_blocking_wrappers_point_to_async_variant_inside_event_loop(self) -> None:
+        class Client:
+            class responses:  # noqa: N801
+                @staticmethod
+                def create(**kwargs):  # type: ignore[no-untyped-def]
+                    raise AssertionError("model called from a running loop")
+
+        async def call_from_loop() -> None:
+            pipeline.run_context_summary(Client(), system_prompt="sys", user_prompt="user")
+
+        with warnings.catch_warnings():
+            warnings.simplefilter("error", RuntimeWarning)
+            with self.assertRaises(RuntimeError) as ctx:
+                asyncio.run(call_from_loop())
+
+        self.assertIn("await arun_context_summary()", str(ctx.exception))
+
+    def test_call_model_json_does_not_retry_terminal_errors(self) -> None:
+        attempts = []
+
+        class BadRequest(Exception):
+            status_code = 400
+
+        class FailingResponses:
+            def create(self, *args, **kwargs):  # type: ignore[no-untyped-def]
+                attempts.append(1)
+                raise BadRequest("invalid schema")
+
+        class DummyClient:
+            responses = FailingResponses()
+
+        captured = []
+
+        def fake_append_event(*, level, source, message, details=None, details_factory=None):  # type: ignore[no-untyped-def]
+            captured.append({"message": message, "details": details or {}})
+            return captured[-1]
+
+        with mock.patch.object(pipeline, "_API_MAX_RETRIES", 3):
+            with mock.patch.object(pipeline, "append_event", side_effect=fake_append_event):
+                with self.assertRaises(pipeline.LLMCallError) as ctx:
+                    pipeline._call_model_json(  # type: ignore[protected-access]
+                        DummyClient(), system_prompt="sys", user_prompt="user"
+                    )
+
+        self.assertEqual(len(attempts), 1)
+        self.assertEqual(ctx.exception.attempts, 1)
+        failure = next(e for e in captured if e["message"] == "LLM call attempt failed")
+        self.assertEqual(failure["details"]["error_class"], "terminal")
+
+    def test_retry_delay_honours_retry_after_and_jitters_backoff(self) -> None:
+        class Response:
+            headers = {"retry-after": "2"}
+
+        class RateLimited(Exception):
+            status_code = 429
+            response = Response()
+
+        self.assertEqual(pipeline._classify_error(RateLimited()), "rate_limit")  # type: ignore[protected-access]
+        self.assertEqual(pipeline._retry_delay(1, RateLimited()), 2.0)  # type: ignore[protected-access]
+
+        for attempt in (1, 3, 10):
+            delay = pipeline._retry_delay(attempt, RuntimeError("boom"))  # type: ignore[protected-access]
+            base = min(pipeline.RETRY_MAX_DELAY, pipeline.RETRY_BASE_DELAY * 2 ** (attempt - 1))
+            self.assertGreaterEqual(delay, base * (1 - pipeline.RETRY_JITTER))
+            self.assertLessEqual(delay, base * (1 + pipeline.RETRY_JITTER))
+
+    def test_call_model_json_only_requests_background_mode_when_asked(self) -> None:
+        seen = []
+
+        class Responses:
+            def create(self, *args, **kwargs):  # type: ignore[no-untyped-def]
+                seen.append(kwargs)
+
+                class Response:
+                    id = "resp"
+                    status = "completed"
+                    output_text = "{}"
+                    usage = None
+
+                return Response()
+
+        class DummyClient:
+            responses = Responses()
+
+        pipeline._call_model_json(  # type: ignore[protected-access]
+            DummyClient(), system_prompt="sys", user_prompt="user"
+        )
+        pipeline._call_model_json(  # type: ignore[protected-access]
+            DummyClient(), system_prompt="sys", user_prompt="user", background=True
+        )
+
+        self.assertNotIn("background", seen[0])
+        self.assertTrue(seen[1]["background"])
+
+    def test_stages_send_prompt_cache_key_tied_to_system_prompt(self) -> None:
+        seen = []
+
+        class Responses:
+            def create(self, **kwargs):  # type: ignore[no-untyped-def]
+                seen.append(kwargs.get("prompt_cache_key"))
+                return SimpleNamespace(status="completed", output_text="{}", usage=None)
+
+        class DummyClient:
+            responses = Responses()
+
+        pipeline.run_context_summary(DummyClient(), system_prompt="sys", user_prompt="a")
+        pipeline.run_context_summary(DummyClient(), system_prompt="sys", user_prompt="b")
+        pipeline.run_context_summary(DummyClient(), system_prompt="other", user_prompt="a")
+
+        self.assertTrue(seen[0].startswith("context_summary-"))
+        self.assertEqual(seen[0], seen[1])
+        self.assertNotEqual(seen[0], seen[2])
+
+    def test_background_polling_backs_off_and_learns_completion_time(self) -> None:
+        statuses = iter(["in_progress", "in_progress", "in_progress", "completed"])
+        delays = []
+
+        async def fake_sleep(seconds):  # type: ignore[no-untyped-def]
+            delays.append(seconds)
+
+        class Response:
+            def __init__(self, status: str) -> None:
+                self.id = "resp_poll"
+                self.status = status
+                self.output_text = "{}"
+                self.usage = None
+
+        class Responses:
+            def create(self, *args, **kwargs):  # type: ignore[no-untyped-def]
+                return Response("queued")
+
+            def retrieve(self, response_id, **kwargs):  # type: ignore[no-untyped-def]
+                return Response(next(statuses))
+
+        class DummyClient:
+            responses = Responses()
+
+        with mock.patch.object(pipeline, "_API_POLL_INTERVAL", 1.0), \
+                mock.patch.object(pipeline, "_COMPLETION_EMA", None), \
+                mock.patch.object(pipeline.asyncio, "sleep", fake_sleep):
+            pipeline._call_model_json(  # type: ignore[protected-access]
+                DummyClient(), system_prompt="sys", user_prompt="user", background=True
+            )
+            learned = pipeline._COMPLETION_EMA  # type: ignore[attr-defined]
+
+        # Polling starts at 100ms, restarts on queued -> in_progress and then
+        # backs off by 1.7x, never beyond the configured poll interval.
+        self.assertEqual(len(delays), 4)
+        for actual, expected in zip(delays, [0.1, 0.1, 0.17, 0.289]):
+            self.assertAlmostEqual(actual, expected)
+        self.assertIsNotNone(learned)
+        with mock.patch.object(pipeline, "_COMPLETION_EMA", 40.0):
+            self.assertEqual(pipeline._initial_poll_delay(1.0), 20.0)  # type: ignore[attr-defined]
+            pipeline._record_completion_time(50.0)  # type: ignore[attr-defined]
+            self.assertAlmostEqual(pipeline._COMPLETION_EMA, 43.0)  # type: ignore[attr-defined]
+
+    def test_poll_retrieve_timeout_excludes_time_spent_sleeping(self) -> None:
+        statuses = iter(["in_progress", "completed"])
+        timeouts = []
+
+        async def fake_sleep(seconds):  # type: ignore[no-untyped-def]
+            return None
+
+        class Response:
+            def __init__(self, status: str) -> None:
+                self.id = "resp_poll"
+                self.status = status
+                self.output_text = "{}"
+                self.usage = None
+
+        class Responses:
+            def create(self, *args, **kwargs):  # type: ignore[no-untyped-def]
+                return Response("queued")
+
+            def retrieve(self, response_id, **kwargs):  # type: ignore[no-untyped-def]
+                timeouts.append(kwargs["timeout"])
+                return Response(next(statuses))
+
+        class DummyClient:
+            responses = Responses()
+
+        with mock.patch.object(pipeline, "_API_TIMEOUT", 2.0), \
+                mock.patch.object(pipeline, "_API_POLL_INTERVAL", 1.0), \
+                mock.patch.object(pipeline, "_COMPLETION_EMA", 3.0), \
+                mock.patch.object(pipeline.asyncio, "sleep", fake_sleep):
+            pipeline._call_model_json(  # type: ignore[protected-access]
+                DummyClient(), system_prompt="sys", user_prompt="user", background=True
+            )
+
+        # The first pause is 1.5s, so only ~0.5s of the 2s budget is left.
+        self.assertEqual(len(timeouts), 2)
+        self.assertLessEqual(timeouts[0], 0.5)
+        self.assertGreater(timeouts[0], 0.1)
+
+    def test_extract_response_text_handles_dicts_and_objects(self) -> None:
+        dict_parts = [
+            {"type": "reasoning"},
+            {"type": "message", "content": [
+                {"type": "output_text", "text": "{\"a\": "},
+                {"type": "refusal", "text": "ignored"},
+            ]},
+            {"type": "output_text", "text": "1}"},
+        ]
+        object_parts = (
+            SimpleNamespace(type="message", content=[
+                SimpleNamespace(type="output_text", text="{}"),
+                SimpleNamespace(type="output_text", text=None),
+            ]),
+        )
+
+        self.assertEqual(pipeline._extract_response_text(dict_parts), '{"a": 1}')  # type: ignore[protected-access]
+        self.assertEqual(pipeline._extract_response_text(object_parts), "{}")  # type: ignore[protected-access]
+        self.assertEqual(pipeline._extract_response_text(iter(())), "")  # type: ignore[protected-access]
+    def test_execution_plan_streams_and_reports_fields(self) -> None:
+        body = '{"rationale": "why", "plan": ["one", "two"], "code_patches": []}'
+
+        class Event:
+            def __init__(self, delta: str) -> None:
+                self.type = "response.output_text.delta"
+                self.delta = delta
+
+        class Final:
+            status = "completed"
+            output_text = body
+            usage = None
+
+        class Stream:
+            def __enter__(self):  # type: ignore[no-untyped-def]
+                return self
+
+            def __exit__(self, *exc_info):  # type: ignore[no-untyped-def]
+                return False
+
+            def __iter__(self):  # type: ignore[no-untyped-def]
+                return iter([Event(body[:20]), Event(body[20:])])
+
+            def get_final_response(self):  # type: ignore[no-untyped-def]
+                return Final()
+
+        class Responses:
+            def stream(self, **kwargs):  # type: ignore[no-untyped-def]
+                return Stream()
+
+            def create(self, **kwargs):  # type: ignore[no-untyped-def]
+                raise AssertionError("streaming should not fall back")
+
+        class DummyClient:
+            responses = Responses()
+
+        fields = []
+        plan = pipeline.run_execution_plan(
+            DummyClient(),
+            system_prompt="sys",
+            user_prompt="user",
+            on_field=lambda path, value: fields.append((path, value)),
+        )
+
+        self.assertEqual(plan.plan, ["one", "two"])
+        self.assertEqual(
+            fields, [("rationale", "why"), ("plan.item", "one"), ("plan.item", "two")]
+        )
+
+    def test_stream_rejection_falls_back_to_buffered_call(self) -> None:
+        class BadRequest(Exception):
+            status_code = 400
+
+        calls = []
+
+        class Responses:
+            def stream(self, **kwargs):  # type: ignore[no-untyped-def]
+                raise BadRequest("streaming unsupported")
+
+            def create(self, **kwargs):  # type: ignore[no-untyped-def]
+                calls.append(kwargs)
+                return SimpleNamespace(status="completed", output_text='{"summary": "ok"}', usage=None)
+
+        class DummyClient:
+            responses = Responses()
+
+        payload, _ = pipeline._call_model_json(  # type: ignore[protected-access]
+            DummyClient(), system_prompt="sys", user_prompt="user", stream=True
+        )
+
+        self.assertEqual(payload, {"summary": "ok"})
+        self.assertEqual(len(calls), 1)
+    def test_stage_results_only_keep_raw_payload_when_requested(self) -> None:
+        class Responses:
+            def create(self, **kwargs):  # type: ignore[no-untyped-def]
+                return SimpleNamespace(status="completed", output_text='{"summary": "ok"}', usage=None)
+
+        class DummyClient:
+            responses = Responses()
+
+        default = pipeline.run_context_summary(DummyClient(), system_prompt="sys", user_prompt="user")
+        explicit = pipeline.run_context_summary(
+            DummyClient(), system_prompt="sys", user_prompt="user", keep_raw=True
+        )
+        with mock.patch.dict(os.environ, {pipeline.KEEP_RAW_ENV: "1"}):
+            pipeline._reload_env()  # type: ignore[attr-defined]
+            from_env = pipeline.run_context_summary(DummyClient(), system_prompt="sys", user_prompt="user")
+
+        self.assertEqual(default.summary, "ok")
+        self.assertIsNone(default.raw)
+        self.assertEqual(explicit.raw, {"summary": "ok"})
+        self.assertEqual(from_env.raw, {"summary": "ok"})
+    def test_stage_defaults_to_shared_client(self) -> None:
+        class Responses:
+            def create(self, **kwargs):  # type: ignore[no-untyped-def]
+                return SimpleNamespace(status="completed", output_text='{"summary": "shared"}', usage=None)
+
+        shared = SimpleNamespace(responses=Responses())
+        with mock.patch.object(pipeline.llm_client, "_SHARED_CLIENT", shared):
+            result = pipeline.run_context_summary(system_prompt="sys", user_prompt="user")
+
+        self.assertEqual(result.summary, "shared")
+    def test_stage_model_env_is_cached_until_reload(self) -> None:
+        with mock.patch.dict(os.environ, {pipeline.CONTEXT_MODEL_ENV: "model-a"}):
+            pipeline._reload_env()  # type: ignore[attr-defined]
+            first = pipeline._resolve_stage_model("context_summary", None)  # type: ignore[attr-defined]
+            os.environ[pipeline.CONTEXT_MODEL_ENV] = "model-b"
+            cached = pipeline._resolve_stage_model("context_summary", None)  # type: ignore[attr-defined]
+            pipeline._reload_env()  # type: ignore[attr-defined]
+            reloaded = pipeline._resolve_stage_model("context_summary", None)  # type: ignore[attr-defined]
+            override = pipeline._resolve_stage_model("context_summary", " pinned ")  # type: ignore[attr-defined]
+
+        self.assertEqual(first, ("model-a", f"env:{pipeline.CONTEXT_MODEL_ENV}"))
+        self.assertEqual(cached, first)
+        self.assertEqual(reloaded[0], "model-b")
+        self.assertEqual(override, ("pinned", "parameter"))
+    def test_call_model_json_unwraps_fenced_json(self) -> None:
+        class Responses:
+            def create(self, **kwargs):  # type: ignore[no-untyped-def]
+                text = '```json\n{"summary": "fenced"}\n```\n'
+                return SimpleNamespace(status="completed", output_text=text, usage=None)
+
+        class DummyClient:
+            responses = Responses()
+
+        with mock.patch.object(pipeline, "append_event") as append_event:
+            payload, _ = pipeline._call_model_json(  # type: ignore[protected-access]
+                DummyClient(), system_prompt="sys", user_prompt="user"
+            )
+
+        self.assertEqual(payload, {"summary": "fenced"})
+        messages = [call.kwargs["message"] for call in append_event.call_args_list]
+        self.assertNotIn("model_json_parse_failed", messages)
+    def test_stages_use_batch_api_when_enabled(self) -> None:
+        uploads = []
+
+        def output_line(index: int, summary: str) -> str:
+            body = {
+                "status": "completed",
+                "output": [{"type": "message", "content": [
+                    {"type": "output_text", "text": f'{{"summary": "{summary}"}}'},
+                ]}],
+                "usage": {"input_tokens": 2, "output_tokens": 3, "total_tokens": 5},
+            }
+            return json.dumps({"custom_id": str(index), "response": {"status_code": 200, "body": body}})
+
+        class Files:
+            def create(self, *, file, purpose):  # type: ignore[no-untyped-def]
+                uploads.append((purpose, file[1].decode("utf-8").splitlines()))
+                return SimpleNamespace(id="file-in")
+
+            def content(self, file_id):  # type: ignore[no-untyped-def]
+                assert file_id == "file-out"
+                return SimpleNamespace(
+                    text="\n".join([output_line(1, "stray"), "{not json", output_line(0, "first")])
+                )
+
+        class Batches:
+            def create(self, **kwargs):  # type: ignore[no-untyped-def]
+                assert kwargs["endpoint"] == "/v1/responses"
+                return SimpleNamespace(id="batch-1", status="validating", output_file_id=None)
+
+            def retrieve(self, batch_id):  # type: ignore[no-untyped-def]
+                return SimpleNamespace(id=batch_id, status="completed", output_file_id="file-out")
+
+        class DummyClient:
+            files = Files()
+            batches = Batches()
+
+        async def fake_sleep(seconds):  # type: ignore[no-untyped-def]
+            return None
+
+        with mock.patch.object(pipeline, "_USE_BATCH_API", True), \
+                mock.patch.object(pipeline.asyncio, "sleep", fake_sleep):
+            summary = pipeline.run_context_summary(
+                DummyClient(), system_prompt="sys", user_prompt="a"
+            )
+
+        self.assertEqual(summary.summary, "first")
+        self.assertEqual(summary.usage, pipeline.StageUsage(2, 3, 5))
+        purpose, lines = uploads[0]
+        self.assertEqual(purpose, "batch")
+        self.assertEqual(len(lines), 1)
+        self.assertEqual(json.loads(lines[0])["body"]["input"][1]["content"], "a")
+
+    def test_batch_api_cancels_a_batch_that_outlives_the_timeout(self) -> None:
+        cancelled = []
+
+        class Files:
+            def create(self, *, file, purpose):  # type: ignore[no-untyped-def]
+                return SimpleNamespace(id="file-in")
+
+        class Batches:
+            def create(self, **kwargs):  # type: ignore[no-untyped-def]
+                return SimpleNamespace(id="batch-1", status="validating", output_file_id=None)
+
+            def retrieve(self, batch_id):  # type: ignore[no-untyped-def]
+                return SimpleNamespace(id=batch_id, status="in_progress", output_file_id=None)
+
+            def cancel(self, batch_id):  # type: ignore[no-untyped-def]
+                cancelled.append(batch_id)
+
+        class DummyClient:
+            files = Files()
+            batches = Batches()
+
+        with mock.patch.object(pipeline, "_USE_BATCH_API", True), \
+                mock.patch.object(pipeline, "_BATCH_TIMEOUT", 0.0):
+            with self.assertRaises(pipeline.LLMCallError) as raised:
+                pipeline.run_context_summary(DummyClient(), system_prompt="sys", user_prompt="a")
+
+        self.assertEqual(cancelled, ["batch-1"])
+        self.assertIsInstance(raised.exception.original_error, TimeoutError)
+
+    def test_identifiers_are_interned_but_prose_is_not(self) -> None:
+        path = "".join(["agent/core/", "pipeline.py"])
+        clues = pipeline._normalise_context_clues(  # type: ignore[protected-access]
+            [{"id": "".join(["clue-", "a"]), "path": path, "rationale": "why it matters"}]
+        )
+        prose = "".join(["two ", "words"])
+        focus = pipeline._coerce_items(  # type: ignore[protected-access]
+            [" agent/core/pipeline.py ", prose], intern=True
+        )
+
+        self.assertIs(clues[0].path, focus[0])
+        self.assertIs(clues[0].identifier, sys.intern("clue-a"))
+        self.assertIs(focus[1], prose)
+        self.assertIsNot(sys.intern("".join(["two ", "words"])), prose)
+
+    def test_extract_usage_reads_objects_and_legacy_dict_keys(self) -> None:
+        extract = pipeline._extract_usage  # type: ignore[protected-access]
+        response = SimpleNamespace(
+            usage=SimpleNamespace(input_tokens=3, output_tokens=4, total_tokens=7)
+        )
+        legacy = {"usage": {"prompt_tokens": 2, "completion_tokens": 5.0, "total_tokens": "7"}}
+
+        self.assertEqual(extract(response), pipeline.StageUsage(3, 4, 7))
+        self.assertEqual(extract(legacy), pipeline.StageUsage(2, 5, 7))
+        self.assertEqual(extract({"usage": {"total_tokens": "n/a"}}), pipeline.StageUsage())
+
+    def test_query_snippets_caches_until_store_changes(self) -> None:
+        self.addCleanup(pipeline.clear_snippet_cache)
+        with tempfile.TemporaryDirectory() as tmpdir:
+            store = VectorStore(os.path.join(tmpdir, "store.json"))
+            store.add_text("a", "alpha beta", metadata={"path": "a.py"})
+            query = pipeline._query_snippets  # type: ignore[protected-access]
+
+            with mock.patch.object(store, "query_text", wraps=store.query_text) as query_text:
+                first = query(store, "alpha", 2)
+                second = query(store, "alpha", 2)
+                self.assertEqual(query_text.call_count, 1)
+                self.assertEqual([hit.snippet_id for hit in second], [hit.snippet_id for hit in first])
+
+                store.add_text("b", "alpha gamma", metadata={"path": "b.py"})
+                self.assertEqual(len(query(store, "alpha", 2)), 2)
+                self.assertEqual(query_text.call_count, 2)
+
+                pipeline.clear_snippet_cache()
+                query(store, "alpha", 2)
+                self.assertEqual(query_text.call_count, 3)
+
+    def test_query_snippets_cache_survives_concurrent_workers(self) -> None:
+        self.addCleanup(pipeline.clear_snippet_cache)
+        with tempfile.TemporaryDirectory() as tmpdir:
+            store = VectorStore(os.path.join(tmpdir, "store.json"))
+            store.add_text("a", "alpha beta", metadata={"path": "a.py"})
+            query = pipeline._query_snippets  # type: ignore[protected-access]
+
+            def worker(offset: int) -> None:
+                for index in range(200):
+                    query(store, f"alpha {(offset + index) % 12}", 1)
+
+            with mock.patch.object(pipeline, "SNIPPET_CACHE_SIZE", 4):
+                with ThreadPoolExecutor(max_workers=8) as executor:
+                    list(executor.map(worker, range(8)))
+
+            self.assertLessEqual(len(pipeline._SNIPPET_CACHE), 4)  # type: ignore[attr-defined]
+
+    def test_dumps_json_matches_json_module_with_and_without_orjson(self) -> None:
+        payload = [{"id": "c1", "path": "docs/é.md", "content": "line\n\"quoted\""}]
+        dumps = pipeline._dumps_json  # type: ignore[protected-access]
+        for module in (pipeline.orjson, None):
+            with mock.patch.object(pipeline, "orjson", module):
+                self.assertEqual(
+                    dumps(payload), json.dumps(payload, ensure_ascii=False, separators=(",", ":"))
+                )
+                self.assertEqual(
+                    dumps(payload, indent=True), json.dumps(payload, ensure_ascii=False, indent=2)
+                )
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+from agent.core import prompt_compress
+
+
+SAMPLE = """Please   review the patch.   Thank you!
+
+
+Could you please add tests?
+```python
+x  =  1
+
+
+y = 2
+```
+Review the patch.
+"""
+
+
+def test_standard_level_strips_prose_but_keeps_code_fences() -> None:
+    compressed = prompt_compress.compress(SAMPLE, "standard")
+
+    assert compressed.startswith("Review the patch.\n\nAdd tests?\n")
+    assert "```python\nx  =  1\n\n\ny = 2\n```" in compressed
+    assert compressed.count("Review the patch.") == 2
+
+
+def test_full_level_drops_repeated_prose_lines() -> None:
+    compressed = prompt_compress.compress(SAMPLE, "full")
+
+    assert compressed.count("Review the patch.") == 1
+
+
+def test_off_level_and_invalid_env_fallback(monkeypatch) -> None:
+    assert prompt_compress.compress(SAMPLE, "off") == SAMPLE
+
+    monkeypatch.delenv(prompt_compress.COMPRESS_ENV, raising=False)
+    assert prompt_compress.resolve_level() == "off"
+    assert prompt_compress.compress(SAMPLE) == SAMPLE
+
+    monkeypatch.setenv(prompt_compress.COMPRESS_ENV, "bogus")
+    assert prompt_compress.resolve_level() == prompt_compress.DEFAULT_LEVEL
+
+
+def test_nested_and_indented_fences_stay_inside_the_snippet() -> None:
+    text = """Please  check this.
+````markdown
+Please  keep   this.
+```python
+x  =  1
+```
+Thanks!
+````
+~~~
+    ```
+Please   keep this too.
+```js
+~~~
+Please   tidy this.
+"""
+
+    compressed = prompt_compress.compress(text, "standard")
+
+    assert compressed.startswith("Check this.\n````markdown\nPlease  keep   this.\n")
+    assert "```python\nx  =  1\n```\nThanks!\n````" in compressed
+    assert "    ```\nPlease   keep this too.\n```js\n~~~" in compressed
+    assert compressed.endswith("\nTidy this.")
+
+
+def test_standard_level_leaves_structured_lines_alone() -> None:
+    text = """Please   review this.
+- Please keep   the list item.
+Acceptance:   thanks to the cache, calls drop.
+Please   update agent/core/pipeline.py as well.
+"""
+
+    compressed = prompt_compress.compress(text, "full")
+
+    assert compressed == (
+        "Review this.\n"
+        "- Please keep   the list item.\n"
+        "Acceptance:   thanks to the cache, calls drop.\n"
+        "Please   update agent/core/pipeline.py as well."
+    )
+
+
+def test_select_relevant_sentences_keeps_overlapping_sentences_in_order() -> None:
+    text = "The cache stores data. Nothing here. Cache eviction uses LRU. Weather is nice."
+
+    selected = prompt_compress.select_relevant_sentences(text, "cache eviction")
+
+    assert selected == "The cache stores data. Cache eviction uses LRU."
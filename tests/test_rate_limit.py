@@ -0,0 +1,45 @@
+from __future__ import annotations
+
+import asyncio
+from unittest import mock
+
+from agent.core import rate_limit
+
+
+def test_token_bucket_charges_debt_in_arrival_order() -> None:
+    with mock.patch.object(rate_limit.time, "monotonic", return_value=100.0):
+        bucket = rate_limit.TokenBucket(rate_per_sec=2.0, capacity=4.0)
+        assert bucket.reserve(3) == 0.0
+        assert bucket.reserve(2) == 0.5
+        assert bucket.reserve(2) == 1.5
+        # Oversized requests are capped at the bucket capacity.
+        assert bucket.reserve(100) == 3.5
+
+
+def test_acquire_is_a_no_op_without_limits(monkeypatch) -> None:
+    monkeypatch.delenv(rate_limit.RPM_ENV, raising=False)
+    monkeypatch.setenv(rate_limit.TPM_ENV, "not-a-number")
+    rate_limit.reload_limits()
+
+    assert asyncio.run(rate_limit.acquire(10_000)) == 0.0
+
+
+def test_acquire_waits_once_rpm_budget_is_spent(monkeypatch) -> None:
+    monkeypatch.setenv(rate_limit.RPM_ENV, "60")
+    monkeypatch.delenv(rate_limit.TPM_ENV, raising=False)
+    sleeps = []
+
+    async def fake_sleep(delay: float) -> None:
+        sleeps.append(delay)
+
+    try:
+        with mock.patch.object(rate_limit.time, "monotonic", return_value=5.0), \
+                mock.patch.object(rate_limit.asyncio, "sleep", fake_sleep):
+            rate_limit.reload_limits()
+            for _ in range(61):
+                asyncio.run(rate_limit.acquire(1))
+    finally:
+        monkeypatch.delenv(rate_limit.RPM_ENV)
+        rate_limit.reload_limits()
+
+    assert sleeps == [1.0]
@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from agent.core import pipeline, response_cache
+
+
+class ResponseCacheTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmpdir.cleanup)
+        patcher = mock.patch.dict(
+            os.environ,
+            {
+                "AGENT_EVENT_LOG_PATH": os.devnull,
+                response_cache.CACHE_DIR_ENV: self._tmpdir.name,
+                response_cache.CACHE_TTL_ENV: "60",
+            },
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_put_and_get_round_trip(self) -> None:
+        key = response_cache.make_key("model", "sys", "user")
+        self.assertIsNone(response_cache.get(key))
+
+        response_cache.put(key, {"summary": "cached"})
+
+        self.assertEqual(response_cache.get(key), {"summary": "cached"})
+        self.assertNotEqual(key, response_cache.make_key("model", "sys", "other"))
+
+    def test_entries_expire_after_ttl(self) -> None:
+        key = response_cache.make_key("model", "sys", "user")
+        with mock.patch.object(response_cache.time, "time", return_value=1000.0):
+            response_cache.put(key, {"summary": "old"})
+        with mock.patch.object(response_cache.time, "time", return_value=1060.0):
+            self.assertIsNone(response_cache.get(key))
+
+    def test_disabled_without_ttl_and_skips_empty_payloads(self) -> None:
+        key = response_cache.make_key("model", "sys", "user")
+        response_cache.put(key, {})
+        self.assertIsNone(response_cache.get(key))
+
+        with mock.patch.dict(os.environ, {response_cache.CACHE_TTL_ENV: "0"}):
+            response_cache.put(key, {"summary": "ignored"})
+            self.assertIsNone(response_cache.get(key))
+
+    def test_call_model_json_serves_repeat_prompts_from_cache(self) -> None:
+        calls = []
+
+        class Responses:
+            def create(self, *args, **kwargs):  # type: ignore[no-untyped-def]
+                calls.append(kwargs["model"])
+
+                class Response:
+                    id = "resp"
+                    status = "completed"
+                    output_text = '{"summary": "fresh"}'
+                    usage = {"input_tokens": 3, "output_tokens": 4, "total_tokens": 7}
+
+                return Response()
+
+        class DummyClient:
+            responses = Responses()
+
+        first_payload, first_usage = pipeline._call_model_json(  # type: ignore[protected-access]
+            DummyClient(), system_prompt="sys", user_prompt="user"
+        )
+        second_payload, second_usage = pipeline._call_model_json(  # type: ignore[protected-access]
+            DummyClient(), system_prompt="sys", user_prompt="user"
+        )
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(first_payload, second_payload)
+        self.assertEqual(first_usage.total_tokens, 7)
+        self.assertTrue(second_usage.is_empty())
+
+    def test_semantic_layer_reuses_near_duplicate_prompts(self) -> None:
+        base = " ".join(f"token{idx}" for idx in range(60))
+        with mock.patch.dict(os.environ, {response_cache.SEMANTIC_THRESHOLD_ENV: "0.9"}):
+            response_cache.store(
+                response_cache.make_key("model", "sys", base),
+                {"summary": "similar"},
+                model="model",
+                system_prompt="sys",
+                user_prompt=base,
+            )
+
+            payload, layer = response_cache.lookup(
+                response_cache.make_key("model", "sys", base + " extra"),
+                model="model",
+                system_prompt="sys",
+                user_prompt=base + " extra",
+            )
+            self.assertEqual((payload, layer), ({"summary": "similar"}, "semantic"))
+
+            other_model = response_cache.get_similar(
+                model="other", system_prompt="sys", user_prompt=base
+            )
+            self.assertIsNone(other_model)
+            unrelated = response_cache.get_similar(
+                model="model", system_prompt="sys", user_prompt="completely different words"
+            )
+            self.assertIsNone(unrelated)
+
+        self.assertIsNone(
+            response_cache.get_similar(model="model", system_prompt="sys", user_prompt=base)
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -2,9 +2,13 @@ from __future__ import annotations
 
 import json
 import tempfile
+import time
 import unittest
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from unittest import mock
 
+from agent.core import task_context
 from agent.core.task_context import (
     TaskContextError,
     TaskPrompt,
@@ -49,6 +53,99 @@ class TaskContextTests(unittest.TestCase):
         self.assertEqual(batch.blocked, ())
         self.assertEqual(batch.completed, ('orchestrator/load-task-specs',))
 
+    def test_completed_ids_share_storage_with_spec_ids(self) -> None:
+        completed_id = ''.join(['orchestrator/', 'load-task-specs'])
+        batch = load_task_batch(self.tasks_dir, completed=[completed_id])
+
+        self.assertIs(batch.completed[0], batch.ready[0].task_id)
+        self.assertIs(batch.ready[1].dependencies[0], batch.ready[0].task_id)
+
+    def test_completed_ids_are_sorted_regardless_of_input_order(self) -> None:
+        forward = load_task_batch(self.tasks_dir, completed=['b/task', ' a/task ', 'b/task'])
+        backward = load_task_batch(self.tasks_dir, completed=['a/task', 'b/task'][::-1])
+
+        self.assertEqual(forward.completed, ('a/task', 'b/task'))
+        self.assertEqual(backward.completed, forward.completed)
+
+    def test_load_task_batch_caps_prefixes_and_keeps_full_view(self) -> None:
+        batch = load_task_batch(
+            self.tasks_dir,
+            completed={'orchestrator/load-task-specs'},
+            ready_cap=1,
+            blocked_cap=1,
+        )
+        uncapped = load_task_batch(
+            self.tasks_dir,
+            completed={'orchestrator/load-task-specs'},
+        )
+
+        self.assertEqual(len(batch.ready), 1)
+        self.assertEqual(batch.ready[0], uncapped.ready[0])
+        self.assertEqual(batch.full(), uncapped)
+        self.assertIs(uncapped.full(), uncapped)
+
+    def test_load_task_batch_reuses_specs_until_files_change(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            task_file = Path(tmpdir) / 'tasks.json'
+            task_file.write_text(
+                json.dumps({'task_id': 'demo/one', 'title': 'Demo', 'summary': 'First'}), encoding='utf-8'
+            )
+            first = load_task_batch(tmpdir, completed=())
+            with mock.patch(
+                'agent.core.task_context.load_task_specs', side_effect=AssertionError('reparsed')
+            ):
+                self.assertEqual(load_task_batch(tmpdir, completed=()), first)
+
+            task_file.write_text(
+                json.dumps({'task_id': 'demo/one', 'title': 'Demo', 'summary': 'Second, longer'}),
+                encoding='utf-8',
+            )
+            self.assertEqual(load_task_batch(tmpdir, completed=()).ready[0].summary, 'Second, longer')
+
+            load_task_batch.cache_clear()
+            with mock.patch(
+                'agent.core.task_context.load_task_specs', side_effect=AssertionError('reparsed')
+            ):
+                with self.assertRaises(AssertionError):
+                    load_task_batch(tmpdir, completed=())
+
+    def test_concurrent_load_task_batch_parses_once(self) -> None:
+        calls = []
+        real_load = task_context.load_task_specs
+
+        def slow_load(path, **kwargs):  # type: ignore[no-untyped-def]
+            calls.append(path)
+            time.sleep(0.2)
+            return real_load(path, **kwargs)
+
+        load_task_batch.cache_clear()
+        self.addCleanup(load_task_batch.cache_clear)
+        with mock.patch('agent.core.task_context.load_task_specs', side_effect=slow_load):
+            with ThreadPoolExecutor(max_workers=4) as executor:
+                batches = list(
+                    executor.map(lambda _: load_task_batch(self.tasks_dir, completed=()), range(4))
+                )
+
+        self.assertEqual(len(calls), 1)
+        self.assertTrue(all(batch == batches[0] for batch in batches))
+
+    def test_load_task_batch_stores_blocked_in_priority_order(self) -> None:
+        tasks = [
+            {'task_id': f'demo/{priority}', 'title': priority, 'summary': priority,
+             'priority': priority, 'dependencies': ['demo/missing']}
+            for priority in ('low', 'high', 'medium')
+        ]
+        with tempfile.TemporaryDirectory() as tmpdir:
+            (Path(tmpdir) / 'tasks.json').write_text(json.dumps(tasks), encoding='utf-8')
+            batch = load_task_batch(tmpdir, completed=())
+
+        self.assertEqual(
+            [spec.priority for spec in batch.blocked], ['high', 'medium', 'low']
+        )
+        prompt = build_task_prompt(batch, blocked_limit=1)
+        self.assertIn('[high] demo/high', prompt)
+        self.assertNotIn('demo/medium', prompt)
+
     def test_build_task_prompt_formats_sections(self) -> None:
         batch = load_task_batch(self.tasks_dir)
         prompt = build_task_prompt(batch, ready_limit=3, blocked_limit=3)
@@ -76,6 +173,14 @@ class TaskContextTests(unittest.TestCase):
         self.assertIn('## Completed Tasks', prompt)
         self.assertIn('- orchestrator/load-task-specs', prompt)
 
+    def test_build_task_prompt_separates_sections_with_real_newlines(self) -> None:
+        batch = load_task_batch(self.tasks_dir, completed=())
+        prompt = build_task_prompt(batch)
+
+        self.assertIn('\n\n## Blocked Tasks\n- [', prompt)
+        self.assertNotIn('\\n', prompt)
+        self.assertTrue(prompt.startswith('## Ready Tasks\n'))
+
     def test_load_task_prompt_returns_payload(self) -> None:
         payload = load_task_prompt(self.tasks_dir, ready_limit=1, blocked_limit=1)
 
@@ -92,6 +197,28 @@ class TaskContextTests(unittest.TestCase):
         self.assertIn('## Ready Tasks', payload.prompt)
         self.assertIn('## Blocked Tasks', payload.prompt)
 
+    def test_load_task_prompt_memoises_until_files_change(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            task_file = Path(tmpdir) / 'tasks.json'
+            task_file.write_text(
+                json.dumps({'task_id': 'demo/one', 'title': 'Demo', 'summary': 'First'}), encoding='utf-8'
+            )
+            first = load_task_prompt(tmpdir, completed=())
+            with mock.patch(
+                'agent.core.task_context.build_task_prompt', side_effect=AssertionError('rerendered')
+            ):
+                self.assertIs(load_task_prompt(tmpdir, completed=()), first)
+            self.assertIsNot(load_task_prompt(tmpdir, completed=(), ready_limit=1), first)
+
+            task_file.write_text(
+                json.dumps({'task_id': 'demo/one', 'title': 'Demo', 'summary': 'Second, longer'}),
+                encoding='utf-8',
+            )
+            refreshed = load_task_prompt(tmpdir, completed=())
+
+        self.assertIsNot(refreshed, first)
+        self.assertIn('Second, longer', refreshed.prompt)
+
     def test_task_prompt_to_dict_contains_metadata(self) -> None:
         payload = load_task_prompt(self.tasks_dir)
         summary = payload.to_dict()
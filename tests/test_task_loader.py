@@ -4,7 +4,9 @@ import json
 import tempfile
 import unittest
 from pathlib import Path
+from unittest import mock
 
+from agent.core import task_loader
 from agent.core.task_loader import TaskSpecLoadingError, load_task_specs
 
 
@@ -65,6 +67,47 @@ class LoadTaskSpecsTests(unittest.TestCase):
             self.assertTrue(specs[0].has_acceptance_criteria())
             self.assertEqual(specs[-1].priority, "high")
 
+    def test_parallel_load_matches_serial_order(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            tasks_root = Path(tmpdir)
+            for index in range(20):
+                (tasks_root / f"task-{index:02d}.json").write_text(
+                    json.dumps(
+                        {
+                            "task_id": f"task-{index:02d}",
+                            "title": f"Task {index}",
+                            "summary": "Generated for ordering checks.",
+                        }
+                    ),
+                    encoding="utf-8",
+                )
+
+            serial = load_task_specs(tasks_root, max_workers=1)
+            parallel = load_task_specs(tasks_root, max_workers=4)
+            automatic = load_task_specs(tasks_root)
+
+        self.assertEqual(parallel, serial)
+        self.assertEqual(automatic, serial)
+        self.assertEqual(serial[0].task_id, "task-00")
+
+    def test_load_task_specs_skips_hidden_and_unsupported_files(self) -> None:
+        def task(task_id: str) -> str:
+            return json.dumps({"task_id": task_id, "title": task_id, "summary": "Scan check."})
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            tasks_root = Path(tmpdir)
+            (tasks_root / ".hidden").mkdir()
+            (tasks_root / ".hidden" / "skipped.json").write_text(task("hidden-dir"), encoding="utf-8")
+            (tasks_root / ".skipped.json").write_text(task("hidden-file"), encoding="utf-8")
+            (tasks_root / "notes.txt").write_text("not a task", encoding="utf-8")
+            (tasks_root / "nested" / "deeper").mkdir(parents=True)
+            (tasks_root / "nested" / "deeper" / "UPPER.JSON").write_text(task("upper"), encoding="utf-8")
+            (tasks_root / "top.json").write_text(task("top"), encoding="utf-8")
+
+            specs = load_task_specs(tasks_root)
+
+        self.assertEqual([spec.task_id for spec in specs], ["upper", "top"])
+
     def test_load_task_specs_invalid_json(self) -> None:
         with tempfile.TemporaryDirectory() as tmpdir:
             tasks_root = Path(tmpdir) / "tasks"
@@ -76,6 +119,24 @@ class LoadTaskSpecsTests(unittest.TestCase):
 
             self.assertIn("Invalid JSON payload", str(ctx.exception))
 
+    def test_load_task_specs_invalid_json_without_orjson(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            tasks_root = Path(tmpdir)
+            (tasks_root / "broken.json").write_text("{ invalid json }", encoding="utf-8")
+            (tasks_root / "valid.json").write_text(
+                json.dumps({"task_id": "valid", "title": "Valid", "summary": "Parsed by json."}),
+                encoding="utf-8",
+            )
+
+            with mock.patch.object(task_loader, "orjson", None):
+                with self.assertRaises(TaskSpecLoadingError) as ctx:
+                    load_task_specs(tasks_root)
+                (tasks_root / "broken.json").unlink()
+                specs = load_task_specs(tasks_root)
+
+        self.assertIn("Invalid JSON payload", str(ctx.exception))
+        self.assertEqual([spec.task_id for spec in specs], ["valid"])
+
     def test_load_task_specs_duplicate_task_ids(self) -> None:
         with tempfile.TemporaryDirectory() as tmpdir:
             tasks_root = Path(tmpdir) / "tasks"
@@ -104,5 +104,18 @@ class TaskSelectionTests(unittest.TestCase):
         self.assertEqual(summary, "No pending tasks.")
 
 
+    def test_select_next_task_prefers_earliest_spec_within_tier(self) -> None:
+        specs = [
+            TaskSpec(task_id="medium-1", title="M1", summary="m", priority="medium"),
+            TaskSpec(task_id="high-1", title="H1", summary="h", priority="high"),
+            TaskSpec(task_id="high-2", title="H2", summary="h", priority="high"),
+            TaskSpec(task_id="unranked", title="U", summary="u"),
+        ]
+
+        selected = select_next_task(specs)
+
+        assert selected is not None
+        self.assertEqual(selected.task_id, "high-1")
+
 if __name__ == "__main__":
     unittest.main()
@@ -1,10 +1,14 @@
 from __future__ import annotations
 
 import json
+import os
+import stat
 import tempfile
 import unittest
 from pathlib import Path
+from unittest import mock
 
+from agent.core import task_state
 from agent.core.task_state import CompletedTaskStore, TaskStateError, load_completed_tasks
 
 
@@ -34,6 +38,69 @@ class CompletedTaskStoreTests(unittest.TestCase):
         )
         self.assertTrue(reloaded.is_completed('planning/task-loader'))
 
+    def test_state_file_bytes_match_with_and_without_orjson(self) -> None:
+        store = CompletedTaskStore(path=self.state_path)
+        store.mark_completed('planning/tâche')
+        store.mark_completed('orchestrator/load-task-specs')
+        written = self.state_path.read_bytes()
+
+        with mock.patch.object(task_state, 'orjson', None):
+            store.mark_incomplete('orchestrator/load-task-specs')
+            store.mark_completed('orchestrator/load-task-specs')
+            self.assertEqual(self.state_path.read_bytes(), written)
+            reloaded = CompletedTaskStore(path=self.state_path)
+
+        self.assertTrue(written.endswith(b'\n'))
+        self.assertIn('planning/tâche'.encode('utf-8'), written)
+        self.assertEqual(set(reloaded.completed), set(store.completed))
+
+    def test_completed_view_is_reused_until_mutation(self) -> None:
+        store = CompletedTaskStore(path=self.state_path)
+        store.mark_completed('b/task')
+        store.mark_completed('a/task')
+
+        view = store.completed
+        self.assertEqual(view, ('a/task', 'b/task'))
+        self.assertIs(store.completed, view)
+
+        store.mark_incomplete('b/task')
+        self.assertEqual(store.completed, ('a/task',))
+        store.clear()
+        self.assertEqual(list(store), [])
+
+    def test_with_block_batches_writes_until_exit(self) -> None:
+        store = CompletedTaskStore(path=self.state_path)
+        with mock.patch.object(
+            task_state, '_write_completed', wraps=task_state._write_completed
+        ) as write:
+            with store:
+                store.mark_completed('batch/one')
+                with store:
+                    store.mark_completed('batch/two')
+                self.assertFalse(self.state_path.exists())
+                store.mark_incomplete('batch/one')
+            self.assertEqual(write.call_count, 1)
+
+            store.flush()
+            self.assertEqual(write.call_count, 1)
+
+        self.assertEqual(load_completed_tasks(self.state_path), ('batch/two',))
+        self.assertEqual(
+            [path.name for path in self.state_path.parent.iterdir()], ['task_state.json']
+        )
+
+    @unittest.skipIf(os.name != 'posix', 'POSIX file modes only')
+    def test_persist_keeps_state_file_mode(self) -> None:
+        store = CompletedTaskStore(path=self.state_path)
+        store.mark_completed('mode/first')
+        umask = os.umask(0)
+        os.umask(umask)
+        self.assertEqual(stat.S_IMODE(self.state_path.stat().st_mode), 0o666 & ~umask)
+
+        os.chmod(self.state_path, 0o640)
+        store.mark_completed('mode/second')
+        self.assertEqual(stat.S_IMODE(self.state_path.stat().st_mode), 0o640)
+
     def test_normalises_and_validates_task_identifiers(self) -> None:
         store = CompletedTaskStore(path=self.state_path)
         store.mark_completed('  planning/normalise  ')
@@ -84,5 +84,26 @@ class TaskSpecTests(unittest.TestCase):
         self.assertFalse(spec.context)
 
 
+    def test_taskspec_shares_priority_and_tag_strings(self) -> None:
+        first = TaskSpec(
+            task_id="task-005",
+            title="First",
+            summary="Shares strings.",
+            priority=" High ",
+            tags=("".join(["perf", "ormance"]),),
+        )
+        second = TaskSpec(
+            task_id="task-006",
+            title="Second",
+            summary="Shares strings.",
+            priority="HIGH",
+            tags=("".join(["perfor", "mance"]),),
+        )
+
+        self.assertIs(first.priority, second.priority)
+        self.assertIs(first.tags[0], second.tags[0])
+        with self.assertRaises(ValueError):
+            TaskSpec(task_id="task-007", title="Bad", summary="Bad.", priority=5)
+
 if __name__ == "__main__":
     unittest.main()
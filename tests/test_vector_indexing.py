@@ -1,16 +1,22 @@
 from __future__ import annotations
 
 import json
+import os
 import tempfile
 import unittest
 from pathlib import Path
+from unittest import mock
 
 from agent.core.vector_indexing import (
     TextChunk,
     chunk_text,
     index_file,
+    index_paths,
+    iter_source_files,
+    normalise_newlines,
+    rebuild_vector_store,
 )
-from agent.core.vector_store import VectorStore
+from agent.core.vector_store import VectorStore, VectorStoreError
 
 
 class VectorIndexingTests(unittest.TestCase):
@@ -32,6 +38,23 @@ class VectorIndexingTests(unittest.TestCase):
         self.assertEqual(chunks[1].start, 3)
         self.assertEqual(chunks[1].end, 7)
 
+    def test_chunk_text_boundaries_end_exactly_at_length(self) -> None:
+        self.assertEqual(
+            [(chunk.start, chunk.end) for chunk in chunk_text("a" * 10, chunk_size=4, overlap=0)],
+            [(0, 4), (4, 8), (8, 10)],
+        )
+        self.assertEqual(
+            [(chunk.start, chunk.end) for chunk in chunk_text("a" * 7, chunk_size=4, overlap=1)],
+            [(0, 4), (3, 7)],
+        )
+        self.assertEqual(len(chunk_text("short", chunk_size=16, overlap=4)), 1)
+        self.assertEqual(chunk_text("", chunk_size=4, overlap=1), [])
+
+    def test_normalise_newlines_handles_mixed_endings(self) -> None:
+        self.assertEqual(normalise_newlines("a\r\nb\rc\n\r\r\nd"), "a\nb\nc\n\n\nd")
+        text = "already\nnormalised"
+        self.assertIs(normalise_newlines(text), text)
+
     def test_index_file_populates_metadata(self) -> None:
         target = self.root / "docs" / "guide.md"
         target.write_text("First line\nSecond line\n", encoding="utf-8")
@@ -50,6 +73,119 @@ class VectorIndexingTests(unittest.TestCase):
         self.assertEqual(first["metadata"]["chunk_count"], chunk_total)
 
 
+    def test_iter_source_files_filters_hidden_and_extensions(self) -> None:
+        (self.root / "docs" / "nested").mkdir()
+        (self.root / "docs" / ".cache").mkdir()
+        (self.root / "docs" / "nested" / "deep.RST").write_text("deep", encoding="utf-8")
+        (self.root / "docs" / "guide.md").write_text("guide", encoding="utf-8")
+        (self.root / "docs" / "image.png").write_bytes(b"")
+        (self.root / "docs" / ".draft.md").write_text("hidden", encoding="utf-8")
+        (self.root / "docs" / ".cache" / "skipped.md").write_text("hidden", encoding="utf-8")
+        (self.root / "tests" / "test_x.py").write_text("", encoding="utf-8")
+
+        found = [path.relative_to(self.root).as_posix() for path in iter_source_files(self.root)]
+
+        self.assertEqual(
+            sorted(found),
+            ["docs/guide.md", "docs/nested/deep.RST", "tests/test_x.py"],
+        )
+        self.assertTrue(all(isinstance(path, Path) for path in iter_source_files(self.root)))
+
+    @unittest.skipUnless(hasattr(os, "symlink"), "symlinks unavailable")
+    def test_iter_source_files_follows_file_links_in_path_order(self) -> None:
+        (self.root / "docs" / "a").mkdir()
+        (self.root / "docs" / "a-b").mkdir()
+        (self.root / "docs" / "a" / "x.md").write_text("a", encoding="utf-8")
+        (self.root / "docs" / "a-b" / "x.md").write_text("a-b", encoding="utf-8")
+        (self.root / "shared.md").write_text("shared", encoding="utf-8")
+        try:
+            os.symlink(self.root / "shared.md", self.root / "docs" / "linked.md")
+            os.symlink(self.root / "docs", self.root / "docs" / "loop")
+        except OSError:
+            self.skipTest("cannot create symlinks")
+
+        found = [
+            path.relative_to(self.root).as_posix()
+            for path in iter_source_files(self.root, include=("docs",))
+        ]
+
+        self.assertEqual(found, ["docs/a/x.md", "docs/a-b/x.md", "docs/linked.md"])
+
+    def test_index_file_embeds_chunks_in_one_batch(self) -> None:
+        target = self.root / "docs" / "batch.md"
+        target.write_text("alpha beta gamma delta epsilon", encoding="utf-8")
+        batches: list[int] = []
+
+        def embed_batch(texts, dim):  # type: ignore[no-untyped-def]
+            batches.append(len(texts))
+            return [[1.0] + [0.0] * (dim - 1) for _ in texts]
+
+        vector_store = VectorStore(
+            self.root / "state" / "batch.json",
+            embedding_dim=4,
+            embedding_function=lambda text, dim: self.fail("per-text embedder used"),
+            batch_embedding_function=embed_batch,
+        )
+        revision = vector_store.revision
+
+        chunk_total = index_file(vector_store, target, root=self.root, chunk_size=8, overlap=2)
+
+        self.assertGreater(chunk_total, 1)
+        self.assertEqual(batches, [chunk_total])
+        self.assertEqual(vector_store.revision, revision + 1)
+        results = vector_store.query([1.0, 0.0, 0.0, 0.0], top_k=chunk_total)
+        self.assertEqual(
+            sorted(result.metadata["chunk_index"] for result in results), list(range(chunk_total))
+        )
+
+    def test_rebuild_vector_store_matches_serial_output(self) -> None:
+        for index in range(6):
+            (self.root / "docs" / f"doc-{index}.md").write_text(
+                f"Document {index} " * 20, encoding="utf-8"
+            )
+        (self.root / "tests" / "test_doc.py").write_text("assert True\n", encoding="utf-8")
+
+        serial_path = self.root / "state" / "serial.json"
+        parallel_path = self.root / "state" / "parallel.json"
+        serial = rebuild_vector_store(serial_path, root=self.root, chunk_size=40, overlap=5, max_workers=1)
+        parallel = rebuild_vector_store(parallel_path, root=self.root, chunk_size=40, overlap=5, max_workers=4)
+
+        self.assertEqual(parallel, serial)
+        self.assertEqual(len(serial), 7)
+        self.assertEqual(parallel_path.read_bytes(), serial_path.read_bytes())
+
+    def test_index_paths_deduplicates_and_skips_invalid_paths(self) -> None:
+        doc = self.root / "docs" / "dup.md"
+        doc.write_text("Duplicate entry", encoding="utf-8")
+        outside = self.root / "other.md"
+        outside.write_text("Outside allowed roots", encoding="utf-8")
+        vector_store = VectorStore(self.root / "state" / "paths.json")
+
+        with mock.patch.object(vector_store, "add_texts", wraps=vector_store.add_texts) as add_texts:
+            indexed = index_paths(
+                vector_store,
+                [doc, Path(str(doc)), self.root / "docs" / "missing.md", self.root / "docs", outside],
+                root=self.root,
+            )
+
+        self.assertEqual(indexed, {"docs/dup.md": 1})
+        self.assertEqual(add_texts.call_count, 1)
+
+    def test_add_texts_leaves_store_untouched_when_batch_fails(self) -> None:
+        vector_store = VectorStore(
+            self.root / "state" / "failing.json",
+            batch_embedding_function=lambda texts, dim: [[1.0, 0.0], [1.0, 0.0, 0.0]],
+        )
+        revision = vector_store.revision
+
+        with self.assertRaises(VectorStoreError):
+            vector_store.add_texts(["a", "b"], ["first", "second"])
+
+        self.assertEqual(vector_store.revision, revision)
+        self.assertEqual(vector_store.query_text("first"), [])
+        vector_store.save()
+        self.assertFalse((self.root / "state" / "failing.json").exists())
+
 class VectorStoreRefreshTests(unittest.TestCase):
     def setUp(self) -> None:
         self.tmpdir = tempfile.TemporaryDirectory()